@@ -0,0 +1,45 @@
+"""Бенчмарки и нагрузочные тесты бота на синтетической базе.
+
+    python -m benchmarks --generate            # создать базу и прогнать бенчмарки хендлеров
+    python -m benchmarks --out results.json    # результат в JSON для сравнения между версиями
+    python -m benchmarks.load --rate 200       # поток обновлений через Dispatcher (benchmarks/load.py)
+
+База по умолчанию — temp/bench/bench.db; настоящая БД бота не используется.
+Модули проекта (config, database, ...) импортируются только после configure_environment.
+"""
+import os
+
+DEFAULT_DB = "temp/bench/bench.db"
+
+
+def configure_environment(db_path: str):
+    # До импорта config: бот работает с базой бенчмарка и без сети
+    os.environ["DB_PATH"] = db_path
+    os.environ["BOT_TOKEN"] = "42:BENCHMARK"
+    os.environ.setdefault("ADMIN_IDS", "1")
+    os.environ.setdefault("DEAN_IDS", "2")
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["PROFILE_ENABLED"] = "0"
+
+
+def add_dataset_arguments(parser):
+    parser.add_argument("--db", default=DEFAULT_DB, help="файл SQLite с синтетическими данными")
+    parser.add_argument("--generate", action="store_true", help="пересоздать базу (иначе — только если её нет)")
+    parser.add_argument("--groups", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--applications", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--roster", type=int, default=5000)
+
+
+def prepare_dataset(args):
+    """Создаёт базу, если её нет или задан --generate; возвращает DatasetSize."""
+    from benchmarks.dataset import DatasetSize, generate
+
+    size = DatasetSize(
+        groups=args.groups, users=args.users, applications=args.applications, events=args.events, roster=args.roster,
+    )
+    if args.generate or not os.path.exists(args.db):
+        print(f"Генерация базы {args.db}...")
+        generate(args.db, size)
+    return size
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+from benchmarks import add_dataset_arguments, configure_environment, prepare_dataset
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Бенчмарки хендлеров бота")
+    add_dataset_arguments(parser)
+    parser.add_argument("--iterations", type=int, help="число прогонов каждого бенчмарка (по умолчанию — своё у каждого)")
+    parser.add_argument("--only", help="через запятую: today_schedule,view_requests,...")
+    parser.add_argument("--excel-groups", type=int, default=200, help="групп в файле для handle_excel_file")
+    parser.add_argument("--out", help="куда записать результат в JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_environment(args.db)
+
+    from aiogram import __version__ as aiogram_version
+    from sqlalchemy import __version__ as sqlalchemy_version
+    from benchmarks.handlers import run
+
+    size = prepare_dataset(args)
+
+    results = asyncio.run(run(
+        vars(size), os.path.join(os.path.dirname(args.db), "files"),
+        only=args.only.split(",") if args.only else None, iterations=args.iterations,
+        excel_groups=args.excel_groups,
+    ))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "aiogram": aiogram_version,
+            "sqlalchemy": sqlalchemy_version,
+            "dataset": vars(size),
+        },
+        "benchmarks": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"Результат: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
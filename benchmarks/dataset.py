@@ -0,0 +1,186 @@
+"""Синтетическая база масштаба университета для бенчмарков и нагрузочного теста.
+
+Все данные пишутся через Core executemany пачками — 50 тыс. пользователей и
+100 тыс. заявок генерируются за секунды. Схема создаётся миграциями.
+"""
+import os
+import random
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+
+import openpyxl
+from sqlalchemy import create_engine, insert
+
+from database.db import (
+    Group, User, Schedule, Application, Event, EventParticipant, AllowedUser, Semester,
+    semester_group_association, allowed_user_key,
+)
+from database.migrate import migration_engine, upgrade
+
+# Telegram id служебных пользователей и первого студента
+ADMIN_ID = 1
+DEAN_ID = 2
+STUDENT_BASE = 10_000_000
+# Telegram id новых студентов в сценариях регистрации (их ФИО — в allowed_users с used=0)
+NEWCOMER_BASE = 20_000_000
+
+BATCH = 5000
+
+SURNAMES = [
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов", "Новиков",
+    "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семёнов", "Егоров", "Павлов", "Козлов",
+    "Степанов", "Николаев", "Орлов", "Андреев", "Макаров", "Никитин", "Захаров", "Зайцев", "Соловьёв",
+]
+NAMES = ["Иван", "Пётр", "Алексей", "Дмитрий", "Сергей", "Андрей", "Михаил", "Никита", "Егор", "Артём", "Кирилл"]
+PATRONYMICS = ["Иванович", "Петрович", "Алексеевич", "Дмитриевич", "Сергеевич", "Андреевич", "Михайлович"]
+DEPARTMENTS = [
+    "СПО-ИСИП", "СПО-ПКС", "БИ", "ПИ", "ИВТ", "ЭК", "МЕН", "ЮР", "ФИЛ", "ИСТ", "МАТ", "ФИЗ", "ХИМ",
+    "БИО", "ПСИ", "ЖУР", "ЛИН", "АРХ", "СТР", "ЭНЕ", "МАШ", "АВТ", "ТЕХ", "МЕД", "ДИЗ",
+]
+DAYS = ["ПОНЕДЕЛЬНИК", "ВТОРНИК", "СРЕДА", "ЧЕТВЕРГ", "ПЯТНИЦА", "СУББОТА"]
+TIMES = ["8:30-10:00", "10:10-11:40", "12:10-13:40", "13:50-15:20", "15:30-17:00"]
+SUBJECTS = [
+    "Математический анализ", "Программирование", "Базы данных", "Физика", "История", "Английский язык",
+    "Экономика", "Философия", "Компьютерные сети", "Операционные системы", "Дискретная математика",
+]
+STATUSES = ["Новая", "Принята", "В процессе", "Отклонена", "Выполнена"]
+
+
+@dataclass
+class DatasetSize:
+    groups: int = 2000
+    users: int = 50_000
+    applications: int = 100_000
+    events: int = 20
+    roster: int = 5000       # участников у самого большого мероприятия
+    newcomers: int = 5000    # записей allowed_users без зарегистрированного пользователя
+    seed: int = 1
+
+
+def group_name(index: int) -> str:
+    year = 21 + index % 4
+    department = DEPARTMENTS[(index // 4) % len(DEPARTMENTS)]
+    number = index // (4 * len(DEPARTMENTS)) + 1
+    return f"{year}-{department}-{number:02d}"
+
+
+def full_name(rng: random.Random) -> str:
+    return f"{rng.choice(SURNAMES)} {rng.choice(NAMES)} {rng.choice(PATRONYMICS)}"
+
+
+def _insert(conn, table, rows):
+    for start in range(0, len(rows), BATCH):
+        conn.execute(insert(table), rows[start:start + BATCH])
+
+
+def lessons(rng: random.Random):
+    # Две недели по 6 дней, 2–4 пары в день
+    for week in (1, 2):
+        for day in DAYS:
+            for time in TIMES[:rng.randint(2, 4)]:
+                yield week, day, time, rng.choice(SUBJECTS), f"{rng.choice(SURNAMES)} {rng.choice(NAMES)[0]}.", str(rng.randint(100, 599))
+
+
+def generate(path: str, size: DatasetSize = DatasetSize(), log=print) -> dict:
+    """Создаёт новую базу в path и заполняет её; возвращает параметры набора."""
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    migrations = migration_engine(f"sqlite:///{path}")
+    upgrade(migrations, log=lambda *_: None)
+    migrations.dispose()
+    engine = create_engine(f"sqlite:///{path}")
+    rng = random.Random(size.seed)
+    today = date.today()
+
+    with engine.begin() as conn:
+        _insert(conn, Group.__table__, [{"id": i + 1, "name": group_name(i)} for i in range(size.groups)])
+
+        schedule, semesters, links = [], [], []
+        for i in range(size.groups):
+            for week, day, time, subject, teacher, room in lessons(rng):
+                schedule.append(dict(
+                    group_id=i + 1, week_number=week, day_of_week=day, time=time,
+                    subject=subject, teacher=teacher, room=room,
+                ))
+            semesters.append(dict(
+                id=i + 1, number=1, group_name=group_name(i),
+                date_start=today - timedelta(days=60), date_end=today + timedelta(days=120),
+            ))
+            links.append({"semester_id": i + 1, "group_id": i + 1})
+        _insert(conn, Schedule.__table__, schedule)
+        _insert(conn, Semester.__table__, semesters)
+        _insert(conn, semester_group_association, links)
+        log(f"Группы: {size.groups}, занятий: {len(schedule)}")
+
+        started = datetime.now() - timedelta(days=180)
+        users = [
+            dict(id=1, telegram_id=ADMIN_ID, full_name="Админ Админ Админович", group_id=None, role="admin", registered_at=started),
+            dict(id=2, telegram_id=DEAN_ID, full_name="Декан Декан Деканович", group_id=None, role="dean", registered_at=started),
+        ]
+        allowed, keys = [], set()
+        for i in range(size.users):
+            name, group_id = full_name(rng), i % size.groups + 1
+            users.append(dict(
+                id=i + 3, telegram_id=STUDENT_BASE + i, full_name=name, group_id=group_id, role="student",
+                registered_at=started + timedelta(seconds=rng.randint(0, 180 * 86400)),
+            ))
+            key = allowed_user_key(name, group_name(group_id - 1))
+            if key not in keys:
+                keys.add(key)
+                allowed.append(dict(full_name=name, group_name=group_name(group_id - 1), used=1, lookup_key=key))
+        registered = len(allowed)
+        while len(allowed) < registered + size.newcomers:
+            name, group = full_name(rng), group_name(rng.randrange(size.groups))
+            key = allowed_user_key(name, group)
+            if key not in keys:
+                keys.add(key)
+                allowed.append(dict(full_name=name, group_name=group, used=0, lookup_key=key))
+        _insert(conn, User.__table__, users)
+        _insert(conn, AllowedUser.__table__, allowed)
+        log(f"Пользователи: {len(users)}, список студентов: {len(allowed)}")
+
+        _insert(conn, Application.__table__, [
+            dict(
+                user_id=rng.randint(3, size.users + 2),
+                content=f"{rng.choice(['Справка об обучении', 'Перенос экзамена', 'Академический отпуск', 'Общежитие'])}: "
+                        f"{rng.choice(SUBJECTS)}",
+                status=rng.choice(STATUSES),
+                created_at=started + timedelta(seconds=rng.randint(0, 180 * 86400)),
+            )
+            for _ in range(size.applications)
+        ])
+        log(f"Заявки: {size.applications}")
+
+        _insert(conn, Event.__table__, [
+            dict(id=i + 1, title=f"Мероприятие {i + 1}", description="Описание мероприятия " * 5,
+                 requirements="Студенческий билет", is_active=1, created_at=started)
+            for i in range(size.events)
+        ])
+        participants = []
+        for i in range(size.events):
+            # Ростеры убывают: от size.roster у первого мероприятия
+            roster = max(10, size.roster // (i + 1))
+            for user_id in rng.sample(range(3, size.users + 3), min(roster, size.users)):
+                participants.append(dict(event_id=i + 1, user_id=user_id, registered_at=started))
+        _insert(conn, EventParticipant.__table__, participants)
+        log(f"Мероприятия: {size.events}, участников: {len(participants)}")
+
+    engine.dispose()
+    return asdict(size)
+
+
+def write_schedule_xlsx(path: str, groups: int, seed: int = 2):
+    """Файл расписания в формате импорта для первых groups групп набора."""
+    rng = random.Random(seed)
+    today = datetime.combine(date.today(), datetime.min.time())
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Группа", "День", "Время", "Предмет", "Преподаватель", "Аудитория", "Неделя", "", "Группа", "Начало", "Конец"])
+    for i in range(groups):
+        for n, (week, day, time, subject, teacher, room) in enumerate(lessons(rng)):
+            row = [group_name(i), day, time, subject, teacher, room, week, None]
+            if n == 0:
+                row += [group_name(i), today - timedelta(days=60), today + timedelta(days=120)]
+            ws.append(row)
+    wb.save(path)
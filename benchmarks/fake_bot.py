@@ -0,0 +1,102 @@
+"""Бот без сети: сессия записывает вызовы Bot API и отвечает правдоподобными объектами."""
+import asyncio
+import itertools
+import os
+from collections import Counter
+from datetime import datetime
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.types import CallbackQuery, Chat, Document, File, Message, Update, User
+
+BOT_ID = 42
+BOT_TOKEN = f"{BOT_ID}:BENCHMARK"
+
+
+class FakeSession(BaseSession):
+    """Вместо запросов к Telegram считает вызовы по методам.
+
+    files: file_id → путь к локальному файлу (для bot.download в handle_excel_file).
+    latency: искусственная задержка ответа (сек), чтобы приблизить сеть.
+    """
+
+    def __init__(self, files: dict | None = None, latency: float = 0.0):
+        super().__init__()
+        self.files = files or {}
+        self.latency = latency
+        self.calls = Counter()
+        self._message_ids = itertools.count(1_000_000)
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        name = type(method).__name__
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if name == "GetMe":
+            return User(id=BOT_ID, is_bot=True, first_name="bench")
+        if name == "GetFile":
+            return File(file_id=method.file_id, file_unique_id=method.file_id, file_path=method.file_id)
+        if method.__returning__ is Message or name.startswith(("Send", "Edit")):
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=getattr(method, "chat_id", None) or 0, type="private"),
+                text=getattr(method, "text", None) or "",
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        # url оканчивается на file_path, который здесь равен file_id
+        path = self.files[url.rsplit("/", 1)[-1]]
+        with open(path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+
+def make_bot(session: FakeSession) -> Bot:
+    return Bot(BOT_TOKEN, session=session, default=DefaultBotProperties(parse_mode="HTML"))
+
+
+_update_ids = itertools.count(1)
+
+
+def _user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name="Студент", language_code="ru")
+
+
+def message_update(user_id: int, text: str | None = None, document_path: str | None = None) -> Update:
+    update_id = next(_update_ids)
+    document = None
+    if document_path:
+        file_id = os.path.basename(document_path)
+        document = Document(file_id=file_id, file_unique_id=file_id, file_name=file_id)
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=_user(user_id),
+        text=text,
+        document=document,
+    ))
+
+
+def callback_update(user_id: int, data: str) -> Update:
+    update_id = next(_update_ids)
+    return Update(update_id=update_id, callback_query=CallbackQuery(
+        id=str(update_id),
+        chat_instance=str(user_id),
+        data=data,
+        from_user=_user(user_id),
+        message=Message(
+            message_id=update_id,
+            date=datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=User(id=BOT_ID, is_bot=True, first_name="bench"),
+            text="Меню",
+        ),
+    ))
@@ -0,0 +1,212 @@
+"""Бенчмарки настоящих хендлеров через Dispatcher.feed_update.
+
+Диспетчер собирается так же, как в bot.py (middleware, хендлеры, прогрев
+кэша расписания), а бот отвечает через FakeSession. Для каждого бенчмарка
+считаются перцентили времени обработки, запросы к БД и вызовы Bot API на
+одно обновление и пиковая память (отдельным прогоном под tracemalloc, чтобы
+он не искажал время).
+"""
+import asyncio
+import os
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from aiogram.types import Update
+
+from benchmarks.dataset import ADMIN_ID, DEAN_ID, STUDENT_BASE, group_name, write_schedule_xlsx
+from benchmarks.fake_bot import FakeSession, make_bot, message_update, callback_update
+from benchmarks.stats import latency_summary
+from utils.metrics import db_queries
+
+
+@dataclass
+class Context:
+    bot: object
+    dp: object
+    session: FakeSession
+    users: int
+    groups: int
+    workdir: str
+    rng: random.Random = field(default_factory=lambda: random.Random(7))
+
+    def student(self) -> int:
+        return STUDENT_BASE + self.rng.randrange(self.users)
+
+    async def set_state(self, user_id: int, state, **data):
+        fsm = self.dp.fsm.get_context(self.bot, chat_id=user_id, user_id=user_id)
+        await fsm.set_state(state)
+        if data:
+            await fsm.update_data(**data)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    make_update: Callable[[Context, int], Update]
+    iterations: int = 200
+    setup: Callable[[Context, int], Awaitable] | None = None
+    # Ожидание фоновой работы после хендлера (импорт Excel); время — в отчёте отдельно
+    finish: Callable[[Context], Awaitable] | None = None
+
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, iterations: int = 200, setup=None, finish=None):
+    def decorator(make_update):
+        BENCHMARKS.append(Benchmark(name, make_update, iterations, setup, finish))
+        return make_update
+    return decorator
+
+
+@benchmark("today_schedule")
+def today_schedule(ctx: Context, i: int) -> Update:
+    return callback_update(ctx.student(), "today_schedule")
+
+
+@benchmark("two_weeks_schedule")
+def two_weeks_schedule(ctx: Context, i: int) -> Update:
+    return callback_update(ctx.student(), "two_weeks_schedule")
+
+
+@benchmark("view_events", iterations=50)
+def view_events(ctx: Context, i: int) -> Update:
+    return callback_update(ctx.student(), "view_events")
+
+
+@benchmark("view_requests")
+def view_requests(ctx: Context, i: int) -> Update:
+    return callback_update(DEAN_ID, "view_requests")
+
+
+@benchmark("admin_stats")
+def admin_stats(ctx: Context, i: int) -> Update:
+    return callback_update(ADMIN_ID, "admin_stats")
+
+
+@benchmark("admin_stats_groups")
+def admin_stats_groups(ctx: Context, i: int) -> Update:
+    from handlers.admin import StatsReport
+    return callback_update(ADMIN_ID, StatsReport(report="groups").pack())
+
+
+async def _find_student_state(ctx: Context, i: int):
+    from handlers.admin import FindStudent
+    await ctx.set_state(ADMIN_ID, FindStudent.query)
+
+
+@benchmark("process_find_student", iterations=30, setup=_find_student_state)
+def process_find_student(ctx: Context, i: int) -> Update:
+    # По очереди: часть фамилии, название группы, telegram id
+    queries = ["Иванов", group_name(ctx.rng.randrange(ctx.groups)).lower(), str(ctx.student())]
+    return message_update(ADMIN_ID, queries[i % len(queries)])
+
+
+async def _excel_state(ctx: Context, i: int):
+    from handlers.admin import UploadExcel
+    await ctx.set_state(ADMIN_ID, UploadExcel.type, file_type="schedule")
+
+
+async def _wait_import(ctx: Context):
+    from utils.import_jobs import import_jobs
+    while import_jobs._tasks:
+        await asyncio.wait(set(import_jobs._tasks))
+
+
+@benchmark("handle_excel_file", iterations=3, setup=_excel_state, finish=_wait_import)
+def handle_excel_file(ctx: Context, i: int) -> Update:
+    return message_update(ADMIN_ID, document_path=os.path.join(ctx.workdir, "schedule.xlsx"))
+
+
+def _queries() -> int:
+    return db_queries.values.get((), 0)
+
+
+async def _feed(ctx: Context, bench: Benchmark, i: int) -> tuple[float, int, int, float | None, bool]:
+    if bench.setup:
+        await bench.setup(ctx, i)
+    update = bench.make_update(ctx, i)
+    queries, calls = _queries(), sum(ctx.session.calls.values())
+
+    started = time.perf_counter()
+    ok = True
+    try:
+        await ctx.dp.feed_update(ctx.bot, update)
+    except Exception:
+        ok = False
+    elapsed = time.perf_counter() - started
+
+    background = None
+    if bench.finish:
+        await bench.finish(ctx)
+        background = time.perf_counter() - started
+    return elapsed, _queries() - queries, sum(ctx.session.calls.values()) - calls, background, ok
+
+
+async def run_benchmark(ctx: Context, bench: Benchmark, iterations: int | None = None, memory_iterations: int = 10) -> dict:
+    iterations = iterations or bench.iterations
+    # Прогрев: кэши пользователей и соединения пула
+    await _feed(ctx, bench, -1)
+
+    latencies, queries, calls, background, errors = [], [], [], [], 0
+    for i in range(iterations):
+        elapsed, q, c, bg, ok = await _feed(ctx, bench, i)
+        latencies.append(elapsed)
+        queries.append(q)
+        calls.append(c)
+        if bg is not None:
+            background.append(bg)
+        errors += not ok
+
+    tracemalloc.start()
+    for i in range(min(iterations, memory_iterations)):
+        await _feed(ctx, bench, i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = latency_summary(latencies)
+    result.update(
+        errors=errors,
+        queries_per_update=round(sum(queries) / len(queries), 2),
+        queries_max=max(queries),
+        api_calls_per_update=round(sum(calls) / len(calls), 2),
+        peak_memory_kb=peak // 1024,
+    )
+    if background:
+        result["with_background"] = latency_summary(background)
+    return result
+
+
+async def run(size: dict, workdir: str, only: list | None = None, iterations: int | None = None,
+              excel_groups: int = 200, log=print) -> dict:
+    from bot import dp, prepare_dispatcher
+    from utils.import_jobs import import_jobs
+
+    os.makedirs(workdir, exist_ok=True)
+    xlsx = os.path.join(workdir, "schedule.xlsx")
+    write_schedule_xlsx(xlsx, min(excel_groups, size["groups"]))
+
+    session = FakeSession(files={"schedule.xlsx": xlsx})
+    bot = make_bot(session)
+    await prepare_dispatcher()
+    ctx = Context(bot=bot, dp=dp, session=session, users=size["users"], groups=size["groups"], workdir=workdir)
+
+    results = {}
+    try:
+        for bench in BENCHMARKS:
+            if only and bench.name not in only:
+                continue
+            results[bench.name] = await run_benchmark(ctx, bench, iterations if bench.name != "handle_excel_file" else None)
+            row = results[bench.name]
+            log(
+                f"{bench.name:<22} p50 {row['p50_ms']:>9.2f} мс  p95 {row['p95_ms']:>9.2f} мс  p99 {row['p99_ms']:>9.2f} мс  "
+                f"SQL/upd {row['queries_per_update']:>7.1f}  API/upd {row['api_calls_per_update']:>6.1f}  "
+                f"память {row['peak_memory_kb']:>7} КБ"
+            )
+    finally:
+        await dp.storage.close()
+        import_jobs.shutdown()
+    return results
@@ -0,0 +1,255 @@
+"""Нагрузочный тест: поток обновлений через Dispatcher.feed_update с заданной частотой.
+
+    python -m benchmarks.load --rate 200 --duration 30 --chats 5000
+    python -m benchmarks.load --record storm.jsonl      # сохранить синтетический поток
+    python -m benchmarks.load --replay storm.jsonl      # воспроизвести записанный
+
+Поток имитирует начало семестра: /start, регистрация новых студентов из
+списка (allowed_users), кнопки расписания и запись на мероприятия — от
+множества чатов одновременно. Обновления подаются по расписанию (открытая
+модель: медленная обработка не снижает частоту подачи), обновления одного чата
+обрабатываются по порядку, как в webhook/polling. Время ответа считается от
+момента, когда обновление должно было прийти, поэтому очередь тоже видна.
+
+Работает без сети: локальная SQLite (benchmarks/dataset.py) и FakeSession.
+Регистрации меняют базу — для сравнимых прогонов используйте --generate.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from benchmarks import add_dataset_arguments, configure_environment, prepare_dataset
+
+# Доли видов обновлений в синтетическом потоке
+MIX = {"start": 0.15, "register": 0.10, "schedule": 0.50, "signup": 0.25}
+
+# Через сколько секунд после /start новый студент присылает ФИО и группу
+THINK_TIME = 2.0
+
+
+@dataclass
+class Arrival:
+    at: float      # секунды от начала теста
+    chat: int
+    kind: str
+    update: object
+
+
+def synthetic_stream(size, newcomers: list, rate: float, duration: float, chats: int, seed: int = 1) -> list:
+    """Синтетический поток на duration секунд с пуассоновскими интервалами при средней частоте rate."""
+    from benchmarks.dataset import STUDENT_BASE
+    from benchmarks.fake_bot import message_update, callback_update
+
+    rng = random.Random(seed)
+    pool = [STUDENT_BASE + rng.randrange(size.users) for _ in range(min(chats, size.users))]
+    newcomers = list(newcomers)
+    kinds, weights = zip(*MIX.items())
+
+    arrivals, at = [], 0.0
+    while True:
+        at += rng.expovariate(rate)
+        if at >= duration:
+            break
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "register" and not newcomers:
+            kind = "schedule"
+        chat = rng.choice(pool)
+
+        if kind == "start":
+            arrivals.append(Arrival(at, chat, kind, message_update(chat, "/start")))
+        elif kind == "register":
+            telegram_id, full_name, group = newcomers.pop()
+            arrivals.append(Arrival(at, telegram_id, "start", message_update(telegram_id, "/start")))
+            arrivals.append(Arrival(
+                at + THINK_TIME, telegram_id, kind, message_update(telegram_id, f"{full_name} {group}")
+            ))
+        elif kind == "schedule":
+            data = "today_schedule" if rng.random() < 0.8 else "two_weeks_schedule"
+            arrivals.append(Arrival(at, chat, kind, callback_update(chat, data)))
+        else:
+            event_id = rng.randint(1, size.events)
+            arrivals.append(Arrival(at, chat, kind, callback_update(chat, f"register_event_{event_id}")))
+
+    arrivals.sort(key=lambda arrival: arrival.at)
+    return arrivals
+
+
+def load_newcomers(limit: int) -> list:
+    # Студенты из списка, ещё не зарегистрированные в боте
+    from sqlalchemy import select
+    from benchmarks.dataset import NEWCOMER_BASE
+    from database.db import AllowedUser, get_db_session
+
+    session = get_db_session()
+    try:
+        rows = session.execute(
+            select(AllowedUser.id, AllowedUser.full_name, AllowedUser.group_name)
+            .filter_by(used=0).order_by(AllowedUser.id).limit(limit)
+        ).all()
+    finally:
+        session.close()
+    return [(NEWCOMER_BASE + row.id, row.full_name, row.group_name) for row in rows]
+
+
+def save_stream(path: str, arrivals: list):
+    with open(path, "w", encoding="utf-8") as f:
+        for arrival in arrivals:
+            f.write(json.dumps({
+                "at": round(arrival.at, 6), "chat": arrival.chat, "kind": arrival.kind,
+                "update": arrival.update.model_dump(mode="json", exclude_none=True),
+            }, ensure_ascii=False) + "\n")
+
+
+def read_stream(path: str) -> list:
+    from aiogram.types import Update
+
+    with open(path, encoding="utf-8") as f:
+        return [
+            Arrival(row["at"], row["chat"], row["kind"], Update.model_validate(row["update"]))
+            for row in map(json.loads, f)
+        ]
+
+
+async def replay(dp, bot, arrivals: list, concurrency: int) -> dict:
+    from aiogram.dispatcher.event.bases import UNHANDLED
+    from benchmarks.stats import latency_summary
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    tails = {}  # чат → задача его последнего обновления
+    response = defaultdict(list)   # вид → время от запланированного прихода до конца обработки
+    service = defaultdict(list)    # вид → время самой обработки
+    outcomes = defaultdict(Counter)
+    errors = Counter()
+    max_lag = 0.0
+
+    async def process(arrival, previous, due):
+        if previous is not None:
+            await asyncio.wait({previous})
+        async with semaphore:
+            started = loop.time()
+            try:
+                result = await dp.feed_update(bot, arrival.update)
+                outcomes[arrival.kind]["unhandled" if result is UNHANDLED else "ok"] += 1
+            except Exception as e:
+                outcomes[arrival.kind]["error"] += 1
+                errors[f"{arrival.kind}: {type(e).__name__}: {str(e)[:80]}"] += 1
+            finished = loop.time()
+        response[arrival.kind].append(finished - due)
+        service[arrival.kind].append(finished - started)
+
+    start = loop.time() + 0.1
+    for arrival in arrivals:
+        due = start + arrival.at
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            # Генератор не успевает — значит, цикл событий перегружен
+            max_lag = max(max_lag, -delay)
+        task = asyncio.create_task(process(arrival, tails.get(arrival.chat), due))
+        tails[arrival.chat] = task
+    await asyncio.gather(*tails.values())
+    elapsed = loop.time() - start
+
+    total = sum(sum(counter.values()) for counter in outcomes.values())
+    failed = sum(counter["error"] for counter in outcomes.values())
+    all_response = [value for values in response.values() for value in values]
+    report = {
+        "updates": total,
+        "duration_s": round(elapsed, 3),
+        "offered_rate": round(len(arrivals) / arrivals[-1].at, 2) if arrivals and arrivals[-1].at else 0.0,
+        "throughput": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "max_dispatch_lag_ms": round(max_lag * 1000, 3),
+        "latency": latency_summary(all_response),
+        "by_kind": {
+            kind: {
+                **dict(outcomes[kind]),
+                "error_rate": round(outcomes[kind]["error"] / sum(outcomes[kind].values()), 4),
+                "latency": latency_summary(response[kind]),
+                "service": latency_summary(service[kind]),
+            }
+            for kind in sorted(outcomes)
+        },
+        "errors": dict(errors.most_common(20)),
+    }
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description="Нагрузочный тест диспетчера")
+    add_dataset_arguments(parser)
+    parser.add_argument("--rate", type=float, default=100, help="обновлений в секунду")
+    parser.add_argument("--duration", type=float, default=30, help="длительность потока, сек")
+    parser.add_argument("--chats", type=int, default=5000, help="сколько разных студентов шлют обновления")
+    parser.add_argument("--concurrency", type=int, default=50, help="обновлений в обработке одновременно")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка ответа Bot API, сек")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--record", help="сохранить синтетический поток в JSONL и выйти")
+    parser.add_argument("--replay", help="воспроизвести поток из JSONL вместо синтетического")
+    parser.add_argument("--out", help="куда записать отчёт в JSON")
+    return parser.parse_args(argv)
+
+
+async def run(args, size) -> dict:
+    from bot import dp, prepare_dispatcher
+    from benchmarks.fake_bot import FakeSession, make_bot
+
+    if args.replay:
+        arrivals = read_stream(args.replay)
+    else:
+        newcomers = load_newcomers(int(args.rate * args.duration * MIX["register"] * 2) + 10)
+        arrivals = synthetic_stream(size, newcomers, args.rate, args.duration, args.chats, args.seed)
+    if args.record:
+        save_stream(args.record, arrivals)
+        print(f"Поток ({len(arrivals)} обновлений): {args.record}")
+        return {}
+
+    session = FakeSession(latency=args.api_latency)
+    bot = make_bot(session)
+    await prepare_dispatcher()
+    print(f"Подача {len(arrivals)} обновлений...")
+    try:
+        report = await replay(dp, bot, arrivals, args.concurrency)
+    finally:
+        await dp.storage.close()
+    report["api_calls"] = dict(session.calls)
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_environment(args.db)
+    size = prepare_dataset(args)
+    report = asyncio.run(run(args, size))
+    if not report:
+        return 0
+
+    latency = report["latency"]
+    print(
+        f"Обновлений: {report['updates']} за {report['duration_s']} с · "
+        f"поток {report['offered_rate']}/с · обработано {report['throughput']}/с · ошибок {report['error_rate']:.2%}"
+    )
+    print(f"Время ответа: p50 {latency['p50_ms']} мс · p95 {latency['p95_ms']} мс · p99 {latency['p99_ms']} мс")
+    for kind, row in report["by_kind"].items():
+        print(
+            f"  {kind:<9} {row['latency']['count']:>6}  p50 {row['latency']['p50_ms']:>9.2f} мс  "
+            f"p99 {row['latency']['p99_ms']:>9.2f} мс  ошибок {row['error_rate']:.2%}"
+        )
+    for error, count in report["errors"].items():
+        print(f"  ! {count} × {error}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"Отчёт: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,26 @@ import logging
 import asyncio
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
-from config import BOT_TOKEN
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from config import BOT_TOKEN, SCHEDULE_CACHE_WARMUP, BOT_MODE, BOT_WORKERS, TELEGRAM_API_URL, MORNING_PUSH_ENABLED, METRICS_PORT
 
-# Импортируем регистрацию хендлеров
+# Импортируем регистрацию хендлеров и middleware
 from handlers import register_handlers
+from middlewares import register_middlewares
+from utils.schedule_cache import schedule_cache
+from utils.sender import flood_control
+from utils.import_jobs import import_jobs
+from utils import export
+from utils.webhook import run_webhook
+from utils.cluster import run_cluster
+from utils.morning_push import morning_push_loop
+from utils.broadcast import broadcasts
+from utils.outbox import outbox_loop
+from utils.metrics import ApiMetrics, instrument_engine, start_metrics_server
+from database.db import engine, async_engine
+from database.fsm_storage import SQLiteStorage
+from database.migrate import check_schema
 
 # Включаем логгирование
 logging.basicConfig(level=logging.INFO)
@@ -13,19 +29,73 @@ logging.basicConfig(level=logging.INFO)
 # Создаём объект бота
 bot = Bot(
     token=BOT_TOKEN,
+    session=AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)) if TELEGRAM_API_URL else None,
     default=DefaultBotProperties(parse_mode="HTML")  # HTML разметка в сообщениях
 )
 
-# Создаём объект диспетчера
-dp = Dispatcher()
+# Все запросы к Bot API проходят через лимиты Telegram (очередь с приоритетами и повтор после 429)
+bot.session.middleware(flood_control)
+# Считаем каждый запрос к Bot API (внутри лимитов — с учётом повторов)
+bot.session.middleware(ApiMetrics())
 
-async def main():
-    # Регистрируем все хендлеры
+# Число и время запросов к БД — для метрик (utils/metrics.py)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# Создаём объект диспетчера; состояния диалогов хранятся в БД и переживают перезапуск
+dp = Dispatcher(storage=SQLiteStorage())
+
+async def prepare_dispatcher():
+    # Регистрируем middleware и все хендлеры
+    register_middlewares(dp)
     register_handlers(dp)
 
-    print("Бот запущен...")
-    # Запускаем бота
-    await dp.start_polling(bot)
+    # Рендерим расписание всех групп заранее, чтобы первые нажатия не шли в БД
+    if SCHEDULE_CACHE_WARMUP:
+        await schedule_cache.warm()
+
+# Фоновые задачи бота (рассылки); в многопроцессном режиме запускаются в одном процессе
+background_tasks = set()
+
+def start_background_tasks(bot):
+    if MORNING_PUSH_ENABLED:
+        background_tasks.add(asyncio.create_task(morning_push_loop(bot)))
+    # Рассылки, прерванные перезапуском, продолжаются с сохранённого курсора
+    background_tasks.add(asyncio.create_task(broadcasts.resume(bot)))
+    # Уведомления из outbox (смена статуса заявки и т.п.)
+    background_tasks.add(asyncio.create_task(outbox_loop(bot)))
+
+async def main():
+    # Проверяем, что миграции применены (сама схема при старте не меняется)
+    check_schema(engine)
+
+    # Импорты, прерванные прошлой остановкой бота, помечаем как неудавшиеся
+    await import_jobs.recover()
+
+    # /metrics на METRICS_PORT; в многопроцессном режиме у обработчиков свои порты
+    await start_metrics_server(METRICS_PORT)
+
+    if BOT_WORKERS > 1:
+        # Обновления обрабатываются в BOT_WORKERS процессах (см. utils/cluster.py)
+        print(f"Бот запущен ({BOT_MODE}, процессов: {BOT_WORKERS})...")
+        await run_cluster(bot, BOT_WORKERS)
+        return
+
+    await prepare_dispatcher()
+    start_background_tasks(bot)
+
+    print(f"Бот запущен ({BOT_MODE})...")
+    # Запускаем бота: webhook за балансировщиком или long polling для разработки
+    try:
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            # getUpdates не работает, пока у бота установлен webhook
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
+    finally:
+        import_jobs.shutdown()
+        export.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -7,4 +7,103 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 
 # Получаем ID из .env и преобразуем их в список int
 ADMIN_IDS = list(map(int, os.getenv("ADMIN_IDS", "").split(",")))
-DEAN_IDS = list(map(int, os.getenv("DEAN_IDS", "").split(",")))
\ No newline at end of file
+DEAN_IDS = list(map(int, os.getenv("DEAN_IDS", "").split(",")))
+
+# Путь к файлу SQLite-базы
+DB_PATH = os.getenv("DB_PATH", "database/bot_database.db")
+
+# Сколько секунд ждать освобождения блокировки SQLite
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "30"))
+
+# Кэш пользователей: максимальное число записей и время жизни (сек)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+
+# Прогревать кэш расписания при запуске бота (1/0)
+SCHEDULE_CACHE_WARMUP = os.getenv("SCHEDULE_CACHE_WARMUP", "1") == "1"
+
+# Лимиты исходящих сообщений (flood control Telegram)
+FLOOD_GLOBAL_RATE = float(os.getenv("FLOOD_GLOBAL_RATE", "30"))              # запросов в секунду на бота
+FLOOD_CHAT_RATE = float(os.getenv("FLOOD_CHAT_RATE", "1"))                  # сообщений в секунду в личный чат
+FLOOD_GROUP_RATE_PER_MIN = float(os.getenv("FLOOD_GROUP_RATE_PER_MIN", "20"))  # сообщений в минуту в группу
+FLOOD_MAX_RETRIES = int(os.getenv("FLOOD_MAX_RETRIES", "3"))                # повторов после retry_after
+
+# Размер страницы в списках (заявки, пользователи, мероприятия, участники)
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "10"))
+
+# Сколько номеров мероприятий показывать в карусели для быстрого перехода
+EVENTS_JUMP_BUTTONS = int(os.getenv("EVENTS_JUMP_BUTTONS", "10"))
+
+# Как часто (в строках) обновлять сообщение о ходе импорта Excel
+IMPORT_PROGRESS_EVERY = int(os.getenv("IMPORT_PROGRESS_EVERY", "2000"))
+
+# Число процессов для импорта Excel
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+
+# Режим получения обновлений: polling (для разработки) или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+
+# Webhook: внешний адрес бота (пусто — setWebhook не вызывается, удобно для локальной проверки),
+# путь, секрет для заголовка X-Telegram-Bot-Api-Secret-Token и адрес встроенного сервера
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+
+# Сколько обновлений обрабатывать одновременно и сколько соединений разрешить Telegram
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "50"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+# FSM-состояния в БД: через сколько секунд бездействия незаконченный диалог сбрасывается,
+# задержка (сек), за которую изменения состояний копятся перед записью, и размер кэша в памяти
+FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", str(7 * 24 * 3600)))
+FSM_FLUSH_DELAY = float(os.getenv("FSM_FLUSH_DELAY", "0.5"))
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", "10000"))
+
+# Число процессов-обработчиков обновлений (1 — всё в одном процессе).
+# При > 1 главный процесс только получает обновления и раздаёт их по chat.id
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "1"))
+# Сколько обновлений (разных чатов) один процесс обрабатывает одновременно
+BOT_WORKER_CONCURRENCY = int(os.getenv("BOT_WORKER_CONCURRENCY", "50"))
+
+# Адрес Bot API (пусто — api.telegram.org); для локального Bot API сервера или стенда
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
+# Утренняя рассылка расписания подписчикам: включена ли (1/0), время начала (ЧЧ:ММ, время сервера)
+# и окно (сек), за которое рассылка равномерно растягивается
+MORNING_PUSH_ENABLED = os.getenv("MORNING_PUSH_ENABLED", "1") == "1"
+MORNING_PUSH_TIME = os.getenv("MORNING_PUSH_TIME", "07:00")
+MORNING_PUSH_WINDOW = int(os.getenv("MORNING_PUSH_WINDOW", "1800"))
+
+# Очередь уведомлений (outbox): сколько сообщений отправлять за раз, как часто (сек) проверять очередь,
+# сколько попыток делать, задержка (сек) перед первой повторной попыткой (дальше удваивается)
+# и сколько дней хранить обработанные сообщения
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "50"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_RETRY_DELAY = int(os.getenv("OUTBOX_RETRY_DELAY", "5"))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+
+# Метрики в формате Prometheus: адрес и порт (0 — выключены).
+# В многопроцессном режиме обработчик N слушает METRICS_PORT + 1 + N
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Профилирование медленных обновлений (1 — включено): доля профилируемых обновлений,
+# порог (сек), начиная с которого профиль и SQL-запросы сохраняются, папка и сколько последних дампов хранить
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+PROFILE_THRESHOLD = float(os.getenv("PROFILE_THRESHOLD", "1.0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "temp/profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
+# Отчёты админ-панели: как часто (сек) перестраивать снимок отчётов,
+# за сколько дней показывать регистрации и сколько строк (групп, мероприятий) в отчёте
+STATS_REFRESH_INTERVAL = int(os.getenv("STATS_REFRESH_INTERVAL", "300"))
+STATS_DAYS = int(os.getenv("STATS_DAYS", "14"))
+STATS_REPORT_ROWS = int(os.getenv("STATS_REPORT_ROWS", "15"))
+
+# Выгрузка в Excel/CSV: сколько строк читать из БД за раз и число процессов для выгрузок
+EXPORT_BATCH = int(os.getenv("EXPORT_BATCH", "1000"))
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "1"))
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, DateTime
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, DateTime, Index, select, and_, update
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker, selectinload
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from datetime import datetime
 from datetime import date
-from sqlalchemy import Date
+import hashlib
+from sqlalchemy import Date, text as sql_text, case, delete, func, literal, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from config import DB_PATH, DB_BUSY_TIMEOUT
 
 # Базовый класс для моделей SQLAlchemy
 Base = declarative_base()
@@ -34,11 +38,20 @@ class User(Base):
     full_name = Column(String(100))             # ФИО
     group_id = Column(Integer, ForeignKey('groups.id'))  # Внешний ключ на группу
     role = Column(String(20), default="student")
+    morning_push = Column(Integer, default=0)         # 1 — присылать расписание по утрам
+    morning_push_sent = Column(Date, nullable=True)   # день последней утренней рассылки
+    registered_at = Column(DateTime, default=datetime.utcnow)  # у зарегистрированных до миграции 12 — NULL
 
 
     group = relationship("Group", back_populates="users")  # Связь: пользователь → группа
     applications = relationship("Application", back_populates="user")
 
+    __table_args__ = (
+        Index("ix_users_morning_push", "morning_push", "morning_push_sent"),
+        Index("ix_users_role_group", "role", "group_id"),
+        Index("ix_users_registered_at", "registered_at"),
+    )
+
 # Модель расписания
 class Schedule(Base):
     __tablename__ = 'schedule'
@@ -53,6 +66,10 @@ class Schedule(Base):
 
     group = relationship("Group", back_populates="schedule")
 
+    __table_args__ = (
+        Index("ix_schedule_group_week_day", "group_id", "week_number", "day_of_week"),
+    )
+
 # Модель заявки в декан
 class Application(Base):
     __tablename__ = "applications"
@@ -65,6 +82,11 @@ class Application(Base):
 
     user = relationship("User", back_populates="applications")
 
+    __table_args__ = (
+        Index("ix_applications_user_id", "user_id"),
+        Index("ix_applications_status_created", "status", "created_at"),
+    )
+
     User.applications = relationship("Application", back_populates="user")
 
 # Модель мероприятия
@@ -77,6 +99,8 @@ class Event(Base):
     requirements = Column(Text, nullable=True)
     is_active = Column(Integer, default=1)  # 1 — активно, 0 — удалено/завершено
     created_at = Column(DateTime, default=datetime.utcnow)
+    capacity = Column(Integer, nullable=True)  # лимит мест; NULL — без ограничения
+    participants_count = Column(Integer, nullable=False, default=0)  # записанные без листа ожидания; ведут триггеры БД
 
     participants = relationship("EventParticipant", back_populates="event")
 
@@ -88,10 +112,27 @@ class EventParticipant(Base):
     event_id = Column(Integer, ForeignKey("events.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
     registered_at = Column(DateTime, default=datetime.utcnow)
+    status = Column(String(20), nullable=False, default="registered")  # registered / waitlist
 
     event = relationship("Event", back_populates="participants")
     user = relationship("User")  # связь с таблицей users
 
+    __table_args__ = (
+        Index("ux_event_participants_user_event", "user_id", "event_id", unique=True),
+        Index("ix_event_participants_event_status", "event_id", "status", "id"),
+    )
+
+def normalize_text(value) -> str:
+    # Регистр, ё/е и лишние пробелы не должны мешать сверке со списком студентов
+    return " ".join(str(value).split()).lower().replace("ё", "е")
+
+
+def allowed_user_key(full_name, group_name) -> str:
+    # Ключ записи в списке студентов: хэш нормализованных ФИО и группы
+    normalized = f"{normalize_text(full_name)}|{normalize_text(group_name)}"
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
 # Модель разрешённых пользователей (для предварительного списка)
 class AllowedUser(Base):
     __tablename__ = "allowed_users"
@@ -100,6 +141,11 @@ class AllowedUser(Base):
     full_name = Column(String(100), nullable=False)
     group_name = Column(String(50), nullable=False)
     used = Column(Integer, default=0)  # 0 — не использован, 1 — использован
+    lookup_key = Column(String(40), nullable=False)  # allowed_user_key(full_name, group_name)
+
+    __table_args__ = (
+        Index("ux_allowed_users_lookup_key", "lookup_key", unique=True),
+    )
 
 
 #Модель семестров
@@ -114,58 +160,195 @@ class Semester(Base):
 
     groups = relationship("Group", secondary=semester_group_association, back_populates="semesters")
 
+    __table_args__ = (
+        Index("ix_semesters_group_dates", "group_name", "date_start", "date_end"),
+    )
+
+
+# Модель задачи импорта Excel (выполняется в отдельном процессе)
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)           # schedule / students
+    file_name = Column(String(200))
+    status = Column(String(20), default="queued")       # queued / running / done / failed
+    rows_processed = Column(Integer, default=0)
+    result = Column(Text, nullable=True)                # итог импорта для админа
+    errors = Column(Text, nullable=True)
+    created_by = Column(Integer)                        # telegram_id загрузившего
+    chat_id = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+# Рассылка (объявление о мероприятии) и её получатели
+class Broadcast(Base):
+    __tablename__ = "broadcasts"
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=True)
+    text = Column(Text, nullable=False)
+    target = Column(String(200))                      # «Все студенты» или список групп
+    status = Column(String(20), default="running")    # running / done
+    total = Column(Integer, default=0)
+    sent = Column(Integer, default=0)
+    blocked = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    cursor = Column(Integer, default=0)               # id последнего обработанного получателя
+    created_by = Column(Integer)
+    chat_id = Column(Integer)                         # куда присылать прогресс
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class BroadcastRecipient(Base):
+    __tablename__ = "broadcast_recipients"
+
+    id = Column(Integer, primary_key=True)
+    broadcast_id = Column(Integer, ForeignKey("broadcasts.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    telegram_id = Column(Integer)
+    status = Column(String(20), default="pending")    # pending / sent / blocked / failed
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_broadcast_recipients_broadcast", "broadcast_id", "id"),
+    )
+
+
+# Состояние FSM (незаконченный диалог) пользователя в чате
+class FsmRecord(Base):
+    __tablename__ = "fsm_states"
+
+    id = Column(Integer, primary_key=True)
+    bot_id = Column(Integer, nullable=False)
+    chat_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    thread_id = Column(Integer, nullable=False, default=0)
+    destiny = Column(String(50), nullable=False, default="default")
+    state = Column(String(100), nullable=True)
+    data = Column(Text, nullable=True)  # JSON
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ux_fsm_states_key", "bot_id", "chat_id", "user_id", "thread_id", "destiny", unique=True),
+        Index("ix_fsm_states_updated", "updated_at"),
+    )
+
+
+# Исходящее уведомление (transactional outbox): пишется в той же транзакции,
+# что и изменение, о котором оно сообщает, а отправляет его фоновая задача
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    chat_id = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+    dedup_key = Column(String(100), nullable=True)    # например "application:15"
+    status = Column(String(20), default="pending")    # pending / sent / failed
+    revision = Column(Integer, default=0)             # растёт, когда текст ждущего сообщения заменён
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_status_next", "status", "next_attempt_at"),
+        # Среди ждущих отправки — одно сообщение на ключ
+        Index("ux_outbox_pending_dedup", "dedup_key", unique=True, sqlite_where=sql_text("status = 'pending'")),
+    )
+
+
+# Счётчик статистики: число пользователей, заявок по статусам, мероприятий и т. п.
+# Поддерживается триггерами БД (миграция 12) в тех же транзакциях, что и изменения
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    name = Column(String(100), primary_key=True)  # "users", "users:student", "applications:Новая", ...
+    value = Column(Integer, nullable=False, default=0)
+
 
 # Подключение к SQLite-базе
-engine = create_engine('sqlite:///database/bot_database.db')
+# timeout — сколько ждать освобождения блокировки записи (импорт держит её на время транзакции)
+engine = create_engine(f'sqlite:///{DB_PATH}', connect_args={"timeout": DB_BUSY_TIMEOUT})
+
+# Асинхронный движок на том же файле (aiosqlite) — для хендлеров,
+# чтобы запросы к БД не блокировали цикл событий aiogram
+async_engine = create_async_engine(f'sqlite+aiosqlite:///{DB_PATH}', connect_args={"timeout": DB_BUSY_TIMEOUT})
 
-# Создание таблиц, если они ещё не существуют
-Base.metadata.create_all(engine)
+# Схема БД создаётся и обновляется миграциями: python -m database.migrate
 
 # Создание сессии для работы с БД
 Session = sessionmaker(bind=engine)
 
+# Асинхронные сессии. expire_on_commit=False — объекты остаются доступны после commit
+async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
 def get_db_session():
     return Session()
 
+def get_async_session():
+    return async_session()
+
+# Ставит уведомление в outbox; выполняется в сессии, которая делает само изменение.
+# Если сообщение с тем же dedup_key ещё не отправлено, вместо второго
+# сообщения заменяется текст первого — пользователь получит последнее состояние
+def enqueue_notification_stmt(chat_id: int, message_text: str, dedup_key: str | None = None):
+    stmt = sqlite_insert(OutboxMessage).values(chat_id=chat_id, text=message_text, dedup_key=dedup_key)
+    return stmt.on_conflict_do_update(
+        index_elements=["dedup_key"],
+        index_where=sql_text("status = 'pending'"),
+        set_={
+            "chat_id": stmt.excluded.chat_id,
+            "text": stmt.excluded.text,
+            "revision": OutboxMessage.revision + 1,
+            "attempts": 0,
+            "next_attempt_at": stmt.excluded.next_attempt_at,
+        },
+    )
+
+# Запись на мероприятие одним INSERT ... SELECT: есть ли место, решается по счётчику
+# participants_count в том же операторе, повторную запись отсекает уникальный индекс
+# (user_id, event_id), а счётчик увеличивает триггер (миграция 13). SQLite выполняет
+# запись под блокировкой БД, поэтому одновременные нажатия не превысят лимит.
+# Возвращает статус новой записи; нет строки — мероприятие не активно или запись уже есть
+def register_for_event_stmt(user_id: int, event_id: int):
+    has_seat = or_(Event.capacity.is_(None), Event.participants_count < Event.capacity)
+    stmt = sqlite_insert(EventParticipant).from_select(
+        ["event_id", "user_id", "status", "registered_at"],
+        select(
+            Event.id,
+            literal(user_id),
+            case((has_seat, "registered"), else_="waitlist"),
+            literal(datetime.utcnow(), DateTime),
+        ).where(Event.id == event_id, Event.is_active == 1),
+    )
+    return stmt.on_conflict_do_nothing(index_elements=["user_id", "event_id"]).returning(EventParticipant.status)
+
+# Отмечает запись списка студентов использованной одним UPDATE по уникальному ключу:
+# поиск — точечное чтение индекса, а две одновременные регистрации не получат одну запись
+def claim_allowed_user_stmt(full_name, group_name):
+    return (
+        update(AllowedUser)
+        .where(AllowedUser.lookup_key == allowed_user_key(full_name, group_name), AllowedUser.used == 0)
+        .values(used=1)
+    )
+
 #проверка на разрешенного пользователя
 def validate_allowed_user(full_name, group_name):
     session = get_db_session()
-    from sqlalchemy import and_
-    from database.db import AllowedUser  
-
-    user = session.query(AllowedUser).filter(
-        and_(
-            AllowedUser.full_name == full_name,
-            AllowedUser.group_name == group_name,
-            AllowedUser.used == False
-        )
-    ).first()
-
-    if user:
-        user.used = True  # помечаем как использованного
-        session.commit()
-        session.close()
-        return True
+    claimed = session.execute(claim_allowed_user_stmt(full_name, group_name)).rowcount
+    session.commit()
     session.close()
-    return False
+    return claimed > 0
 
 
 def get_today_schedule(group_name: str):
     session = Session()
 
-    # Сопоставление английских названий с русскими
-    days_map = {
-        'MONDAY': 'ПОНЕДЕЛЬНИК',
-        'TUESDAY': 'ВТОРНИК',
-        'WEDNESDAY': 'СРЕДА',
-        'THURSDAY': 'ЧЕТВЕРГ',
-        'FRIDAY': 'ПЯТНИЦА',
-        'SATURDAY': 'СУББОТА',
-        'SUNDAY': 'ВОСКРЕСЕНЬЕ'
-    }
-
-    today_eng = datetime.today().strftime('%A').upper()
-    today_rus = days_map.get(today_eng)
+    today_rus = get_today_day_name()
     current_week = get_current_week_number()
 
     today_schedule = session.query(Schedule).join(Group).filter(
@@ -178,15 +361,7 @@ def get_today_schedule(group_name: str):
         session.close()
         return None
 
-    result = {
-        today_rus: [{
-            'time': item.time,
-            'subject': item.subject,
-            'auditorium': item.room,
-            'teacher': item.teacher,
-            'week_number': item.week_number
-        } for item in today_schedule]
-    }
+    result = build_today_schedule(today_rus, today_schedule)
 
     session.close()
     return result if today_schedule else "❌ На сегодня нет занятий."
@@ -194,17 +369,6 @@ def get_today_schedule(group_name: str):
 def get_two_weeks_schedule(group_name: str):
     session = Session()
 
-    
-    day_order = {
-        'ПОНЕДЕЛЬНИК': 1,
-        'ВТОРНИК': 2,
-        'СРЕДА': 3,
-        'ЧЕТВЕРГ': 4,
-        'ПЯТНИЦА': 5,
-        'СУББОТА': 6,
-        'ВОСКРЕСЕНЬЕ': 7
-    }
-
     schedule = session.query(Schedule).join(Group).filter(
         Group.name == group_name
     ).all()
@@ -213,8 +377,53 @@ def get_two_weeks_schedule(group_name: str):
         session.close()
         return None
 
+    result = build_two_weeks_schedule(schedule)
+
+    session.close()
+    return result
+
+# Сопоставление английских названий дней с русскими
+DAYS_MAP = {
+    'MONDAY': 'ПОНЕДЕЛЬНИК',
+    'TUESDAY': 'ВТОРНИК',
+    'WEDNESDAY': 'СРЕДА',
+    'THURSDAY': 'ЧЕТВЕРГ',
+    'FRIDAY': 'ПЯТНИЦА',
+    'SATURDAY': 'СУББОТА',
+    'SUNDAY': 'ВОСКРЕСЕНЬЕ'
+}
+
+# Порядок дней недели для сортировки расписания
+DAY_ORDER = {
+    'ПОНЕДЕЛЬНИК': 1,
+    'ВТОРНИК': 2,
+    'СРЕДА': 3,
+    'ЧЕТВЕРГ': 4,
+    'ПЯТНИЦА': 5,
+    'СУББОТА': 6,
+    'ВОСКРЕСЕНЬЕ': 7
+}
+
+def get_today_day_name():
+    today_eng = datetime.today().strftime('%A').upper()
+    return DAYS_MAP.get(today_eng)
+
+# Сборка словаря расписания на день из строк Schedule
+def build_today_schedule(day_name, items):
+    return {
+        day_name: [{
+            'time': item.time,
+            'subject': item.subject,
+            'auditorium': item.room,
+            'teacher': item.teacher,
+            'week_number': item.week_number
+        } for item in items]
+    }
+
+# Сборка словаря расписания на две недели: неделя → день → список пар
+def build_two_weeks_schedule(items):
     result = {}
-    for item in schedule:
+    for item in items:
         week_key = f"Неделя {item.week_number}"
         if week_key not in result:
             result[week_key] = {}
@@ -227,10 +436,8 @@ def get_two_weeks_schedule(group_name: str):
             'subject': item.subject,
             'auditorium': item.room,
             'teacher': item.teacher,
-            'day_order': day_order.get(item.day_of_week, 8)
+            'day_order': DAY_ORDER.get(item.day_of_week, 8)
         })
-
-    session.close()
     return result
 
 def get_current_week_number():
@@ -297,18 +504,194 @@ def create_event(title: str, description: str, requirements: str):
 def register_for_event(user_id: int, event_id: int):
     session = get_db_session()
     try:
-        # Проверка: не записан ли уже
-        existing = session.query(EventParticipant).filter_by(user_id=user_id, event_id=event_id).first()
-        if existing:
-            return False
-
-        new_participant = EventParticipant(user_id=user_id, event_id=event_id)
-        session.add(new_participant)
+        status = session.scalar(register_for_event_stmt(user_id, event_id))
         session.commit()
-        return True
+        return status is not None
     except Exception as e:
         print("Ошибка при записи на мероприятие:", e)
         session.rollback()
         return False
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+# Асинхронные версии функций для хендлеров (через async_session)
+
+async def validate_allowed_user_async(full_name, group_name):
+    async with async_session() as session:
+        claimed = (await session.execute(claim_allowed_user_stmt(full_name, group_name))).rowcount
+        await session.commit()
+        return claimed > 0
+
+async def get_today_schedule_async(group_name: str):
+    today_rus = get_today_day_name()
+    current_week = get_current_week_number()
+
+    async with async_session() as session:
+        today_schedule = (await session.scalars(
+            select(Schedule).join(Group).where(
+                Group.name == group_name,
+                Schedule.day_of_week == today_rus,
+                Schedule.week_number == current_week
+            )
+        )).all()
+
+    if not today_schedule:
+        return None
+    return build_today_schedule(today_rus, today_schedule)
+
+async def get_two_weeks_schedule_async(group_name: str):
+    async with async_session() as session:
+        schedule = (await session.scalars(
+            select(Schedule).join(Group).where(Group.name == group_name)
+        )).all()
+
+    if not schedule:
+        return None
+    return build_two_weeks_schedule(schedule)
+
+async def get_current_semester_async(session, group_name: str):
+    today = date.today()
+    return await session.scalar(
+        select(Semester).where(
+            Semester.group_name == group_name,
+            Semester.date_start <= today,
+            Semester.date_end >= today
+        ).limit(1)
+    )
+
+async def get_or_create_group_async(session, group_name: str):
+    group_name = group_name.upper()
+    group = await session.scalar(select(Group).filter_by(name=group_name))
+    if not group:
+        group = Group(name=group_name)
+        session.add(group)
+        await session.flush()  # получаем id без отдельного commit
+    return group
+
+async def get_user_async(session, telegram_id: int):
+    # Пользователь вместе с группой — ленивые связи в async-сессии недоступны
+    return await session.scalar(
+        select(User).options(selectinload(User.group)).filter_by(telegram_id=telegram_id)
+    )
+
+async def register_user_async(telegram_id: int, full_name: str, group_name: str):
+    group_name = group_name.upper()
+    async with async_session() as session:
+        try:
+            group = await get_or_create_group_async(session, group_name)
+            user = User(
+                telegram_id=telegram_id,
+                full_name=full_name,
+                group_id=group.id
+            )
+            session.add(user)
+            await session.commit()
+            return True
+        except Exception as e:
+            await session.rollback()
+            print(f"Ошибка регистрации: {e}")
+            return False
+
+async def create_event_async(title: str, description: str, requirements: str, capacity: int | None = None):
+    async with async_session() as session:
+        try:
+            new_event = Event(
+                title=title,
+                description=description,
+                requirements=requirements,
+                capacity=capacity
+            )
+            session.add(new_event)
+            await session.commit()
+            return new_event
+        except Exception as e:
+            print("Ошибка при создании мероприятия:", e)
+            await session.rollback()
+            return None
+
+async def register_for_event_async(user_id: int, event_id: int) -> tuple[str | None, bool]:
+    """Записывает на мероприятие. Возвращает (статус, новая ли запись):
+    статус "registered" или "waitlist"; None — мероприятие не найдено или завершено."""
+    async with async_session() as session:
+        status = await session.scalar(register_for_event_stmt(user_id, event_id))
+        await session.commit()
+        if status is not None:
+            return status, True
+        # Уже записан или в листе ожидания — сработал уникальный индекс
+        status = await session.scalar(
+            select(EventParticipant.status).filter_by(user_id=user_id, event_id=event_id)
+        )
+        return status, False
+
+async def cancel_event_registration_async(user_id: int, event_id: int) -> tuple[str | None, int]:
+    """Отменяет запись или место в листе ожидания. Возвращает (прежний статус, сколько
+    человек переведено из листа ожидания); статус None — записи не было."""
+    async with async_session() as session:
+        status = await session.scalar(
+            delete(EventParticipant).filter_by(user_id=user_id, event_id=event_id)
+            .returning(EventParticipant.status)
+        )
+        promoted = await promote_waitlist(session, event_id) if status == "registered" else 0
+        await session.commit()
+    return status, promoted
+
+async def set_event_capacity_async(event_id: int, capacity: int | None) -> int | None:
+    """Меняет лимит мест и переводит из листа ожидания на освободившиеся места.
+    Возвращает число переведённых; None — мероприятие не найдено."""
+    async with async_session() as session:
+        found = (await session.execute(update(Event).filter_by(id=event_id).values(capacity=capacity))).rowcount
+        if not found:
+            return None
+        promoted = await promote_waitlist(session, event_id)
+        await session.commit()
+    return promoted
+
+async def release_user_events(session, user_id: int) -> int:
+    # Удаляет записи пользователя на мероприятия (при удалении аккаунта) и отдаёт места листу ожидания
+    rows = (await session.execute(
+        delete(EventParticipant).filter_by(user_id=user_id)
+        .returning(EventParticipant.event_id, EventParticipant.status)
+    )).all()
+    promoted = 0
+    for event_id, status in rows:
+        if status == "registered":
+            promoted += await promote_waitlist(session, event_id)
+    return promoted
+
+async def promote_waitlist(session, event_id: int) -> int:
+    """Переводит первых из листа ожидания на свободные места одним UPDATE и ставит им
+    уведомления в outbox — в транзакции вызывающего. Возвращает число переведённых."""
+    free = (
+        select(case(
+            (Event.capacity.is_(None), -1),  # LIMIT -1 — без ограничения
+            else_=func.max(Event.capacity - Event.participants_count, 0),
+        ))
+        .where(Event.id == event_id, Event.is_active == 1)
+        .scalar_subquery()
+    )
+    waiting = (
+        select(EventParticipant.id)
+        .where(EventParticipant.event_id == event_id, EventParticipant.status == "waitlist")
+        .order_by(EventParticipant.id)
+        .limit(func.coalesce(free, 0))
+    )
+    user_ids = (await session.scalars(
+        update(EventParticipant)
+        .where(EventParticipant.id.in_(waiting))
+        .values(status="registered")
+        .returning(EventParticipant.user_id)
+        .execution_options(synchronize_session=False)
+    )).all()
+    if not user_ids:
+        return 0
+
+    title = await session.scalar(select(Event.title).filter_by(id=event_id))
+    telegram_ids = (await session.scalars(select(User.telegram_id).where(User.id.in_(user_ids)))).all()
+    for telegram_id in telegram_ids:
+        await session.execute(enqueue_notification_stmt(
+            telegram_id,
+            f"🎉 Освободилось место! Вы записаны на мероприятие <b>{title}</b>.",
+            dedup_key=f"waitlist:{event_id}:{telegram_id}",
+        ))
+    return len(user_ids)
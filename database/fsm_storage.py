@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from config import FSM_STATE_TTL, FSM_FLUSH_DELAY, FSM_CACHE_SIZE
+from database.db import async_session, FsmRecord
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Как часто (сек) удалять из БД устаревшие состояния
+PURGE_INTERVAL = 3600
+
+
+@dataclass
+class _Entry:
+    state: str | None = None
+    data: dict = field(default_factory=dict)
+
+
+def _key(key: StorageKey) -> tuple:
+    return key.bot_id, key.chat_id, key.user_id, key.thread_id or 0, key.destiny
+
+
+# FSM-хранилище в SQLite: незаконченные диалоги переживают перезапуск бота.
+# Чтения идут из кэша в памяти; изменения копятся FSM_FLUSH_DELAY секунд
+# и записываются одной транзакцией, поэтому серия update_data — это одна запись в БД.
+# Состояния без изменений дольше FSM_STATE_TTL считаются сброшенными.
+class SQLiteStorage(BaseStorage):
+    def __init__(self, ttl: int = FSM_STATE_TTL, flush_delay: float = FSM_FLUSH_DELAY):
+        self.ttl = ttl
+        self.flush_delay = flush_delay
+        self._cache = TTLCache(FSM_CACHE_SIZE, ttl)
+        self._dirty = {}  # ключ → _Entry, ещё не записанные в БД
+        self._flush_task = None
+        self._purged_at = 0.0
+
+    async def _entry(self, key: StorageKey) -> _Entry:
+        k = _key(key)
+        entry = self._dirty.get(k) or self._cache.get(k)
+        if entry is None:
+            entry = await self._load(k)
+            # Пока шла загрузка, запись могла измениться
+            entry = self._dirty.get(k) or entry
+            self._cache.set(k, entry)
+        return entry
+
+    async def _load(self, k: tuple) -> _Entry:
+        bot_id, chat_id, user_id, thread_id, destiny = k
+        async with async_session() as session:
+            row = (await session.execute(
+                select(FsmRecord.state, FsmRecord.data, FsmRecord.updated_at).filter_by(
+                    bot_id=bot_id, chat_id=chat_id, user_id=user_id, thread_id=thread_id, destiny=destiny
+                )
+            )).first()
+        if row is None or row.updated_at < datetime.utcnow() - timedelta(seconds=self.ttl):
+            return _Entry()
+        return _Entry(state=row.state, data=json.loads(row.data) if row.data else {})
+
+    def _mark_dirty(self, key: StorageKey, entry: _Entry):
+        k = _key(key)
+        self._dirty[k] = entry
+        self._cache.set(k, entry)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        # Изменения, пришедшие во время записи, уходят следующей порцией
+        while self._dirty:
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("FSM storage flush failed")
+
+    async def flush(self):
+        """Записывает накопленные изменения одной транзакцией."""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        now = datetime.utcnow()
+
+        upserts, removed = [], []
+        for (bot_id, chat_id, user_id, thread_id, destiny), entry in dirty.items():
+            values = dict(bot_id=bot_id, chat_id=chat_id, user_id=user_id, thread_id=thread_id, destiny=destiny)
+            if entry.state is None and not entry.data:
+                removed.append(values)
+            else:
+                upserts.append(dict(
+                    values, state=entry.state, data=json.dumps(entry.data, ensure_ascii=False), updated_at=now
+                ))
+
+        try:
+            async with async_session() as session:
+                if upserts:
+                    stmt = insert(FsmRecord)
+                    await session.execute(
+                        stmt.on_conflict_do_update(
+                            index_elements=["bot_id", "chat_id", "user_id", "thread_id", "destiny"],
+                            set_={"state": stmt.excluded.state, "data": stmt.excluded.data, "updated_at": stmt.excluded.updated_at},
+                        ),
+                        upserts,
+                    )
+                for values in removed:
+                    await session.execute(delete(FsmRecord).filter_by(**values))
+                if time.monotonic() - self._purged_at > PURGE_INTERVAL:
+                    await session.execute(
+                        delete(FsmRecord).where(FsmRecord.updated_at < now - timedelta(seconds=self.ttl))
+                    )
+                    self._purged_at = time.monotonic()
+                await session.commit()
+        except BaseException:
+            # Не теряем изменения: вернём их в очередь (более новые поверх)
+            self._dirty = {**dirty, **self._dirty}
+            raise
+
+    async def set_state(self, key: StorageKey, state=None) -> None:
+        entry = await self._entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key, entry)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._entry(key)).state
+
+    async def set_data(self, key: StorageKey, data: dict) -> None:
+        entry = await self._entry(key)
+        entry.data = dict(data)
+        self._mark_dirty(key, entry)
+
+    async def get_data(self, key: StorageKey) -> dict:
+        return dict((await self._entry(key)).data)
+
+    async def close(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
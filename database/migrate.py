@@ -0,0 +1,122 @@
+"""Применение миграций схемы БД.
+
+Запуск: python -m database.migrate [--status]
+"""
+import importlib
+import pkgutil
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, inspect, text
+
+from database import migrations
+
+
+def load_migrations():
+    # Все модули database/migrations/mNNNN_*.py, отсортированные по версии
+    result = []
+    for module_info in pkgutil.iter_modules(migrations.__path__):
+        if not module_info.name.startswith("m"):
+            continue
+        module = importlib.import_module(f"{migrations.__name__}.{module_info.name}")
+        result.append(module)
+    result.sort(key=lambda m: m.VERSION)
+
+    versions = [m.VERSION for m in result]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Повторяющиеся версии миграций: {versions}")
+    return result
+
+
+def migration_engine(url, **kwargs):
+    # pysqlite сам открывает транзакцию только перед INSERT/UPDATE/DELETE, а DDL
+    # (CREATE, ALTER) выполняет вне её — откат не отменил бы уже применённую
+    # часть миграции. Отключаем его управление транзакциями и начинаем их сами.
+    engine = create_engine(url, **kwargs)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def ensure_version_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER NOT NULL,
+            description VARCHAR(200),
+            applied_at DATETIME,
+            PRIMARY KEY (version)
+        )
+    """))
+
+
+def get_current_version(conn) -> int:
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+
+def pending_migrations(engine):
+    with engine.begin() as conn:
+        current = get_current_version(conn)
+    return [m for m in load_migrations() if m.VERSION > current]
+
+
+def upgrade(engine, log=print):
+    # Каждая миграция — в своей транзакции вместе с записью о версии,
+    # поэтому упавшая миграция не оставляет схему в промежуточном состоянии.
+    # engine должен быть создан migration_engine(), иначе DDL не откатывается.
+    with engine.begin() as conn:
+        ensure_version_table(conn)
+
+    applied = 0
+    for migration in pending_migrations(engine):
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": migration.VERSION, "d": migration.DESCRIPTION, "t": datetime.utcnow()},
+            )
+        log(f"Применена миграция {migration.VERSION}: {migration.DESCRIPTION}")
+        applied += 1
+    return applied
+
+
+def check_schema(engine):
+    # Вызывается при старте бота: схему не меняем, только проверяем версию
+    pending = pending_migrations(engine)
+    if pending:
+        versions = ", ".join(str(m.VERSION) for m in pending)
+        raise RuntimeError(
+            f"Схема БД устарела (не применены миграции: {versions}). "
+            f"Выполните: python -m database.migrate"
+        )
+
+
+def main(argv):
+    from config import DB_PATH, DB_BUSY_TIMEOUT
+
+    engine = migration_engine(f"sqlite:///{DB_PATH}", connect_args={"timeout": DB_BUSY_TIMEOUT})
+
+    if "--status" in argv:
+        with engine.begin() as conn:
+            current = get_current_version(conn)
+        pending = [m for m in load_migrations() if m.VERSION > current]
+        print(f"Текущая версия схемы: {current}")
+        for migration in pending:
+            print(f"  ожидает: {migration.VERSION} — {migration.DESCRIPTION}")
+        return
+
+    applied = upgrade(engine)
+    if not applied:
+        print("Схема БД актуальна.")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
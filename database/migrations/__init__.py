@@ -0,0 +1,3 @@
+# Версионированные миграции схемы БД.
+# Каждый модуль mNNNN_<name>.py содержит VERSION, DESCRIPTION и upgrade(conn),
+# где conn — синхронное соединение SQLAlchemy внутри открытой транзакции.
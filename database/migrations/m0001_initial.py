@@ -0,0 +1,108 @@
+from sqlalchemy import text
+
+VERSION = 1
+DESCRIPTION = "Базовая схема: таблицы бота"
+
+# IF NOT EXISTS — чтобы миграция прошла и на базах, созданных до появления
+# миграций (тогда таблицы создавал Base.metadata.create_all при импорте)
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS groups (
+        id INTEGER NOT NULL,
+        name VARCHAR(50),
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER NOT NULL,
+        title VARCHAR(200) NOT NULL,
+        description TEXT,
+        requirements TEXT,
+        is_active INTEGER,
+        created_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS allowed_users (
+        id INTEGER NOT NULL,
+        full_name VARCHAR(100) NOT NULL,
+        group_name VARCHAR(50) NOT NULL,
+        used INTEGER,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS semesters (
+        id INTEGER NOT NULL,
+        number INTEGER NOT NULL,
+        group_name VARCHAR NOT NULL,
+        date_start DATE NOT NULL,
+        date_end DATE NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS semester_group_association (
+        semester_id INTEGER,
+        group_id INTEGER,
+        FOREIGN KEY(semester_id) REFERENCES semesters (id),
+        FOREIGN KEY(group_id) REFERENCES groups (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER NOT NULL,
+        telegram_id INTEGER,
+        full_name VARCHAR(100),
+        group_id INTEGER,
+        role VARCHAR(20),
+        PRIMARY KEY (id),
+        UNIQUE (telegram_id),
+        FOREIGN KEY(group_id) REFERENCES groups (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS schedule (
+        id INTEGER NOT NULL,
+        group_id INTEGER,
+        subject VARCHAR(100),
+        teacher VARCHAR(100),
+        day_of_week VARCHAR(20),
+        time VARCHAR(20),
+        room VARCHAR(50),
+        week_number INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(group_id) REFERENCES groups (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER NOT NULL,
+        user_id INTEGER,
+        content TEXT NOT NULL,
+        status VARCHAR,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS event_participants (
+        id INTEGER NOT NULL,
+        event_id INTEGER,
+        user_id INTEGER,
+        registered_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(event_id) REFERENCES events (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
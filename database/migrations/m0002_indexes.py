@@ -0,0 +1,21 @@
+from sqlalchemy import text
+
+VERSION = 2
+DESCRIPTION = "Составные индексы под частые фильтры"
+
+STATEMENTS = [
+    # Расписание группы на конкретный день недели
+    "CREATE INDEX IF NOT EXISTS ix_schedule_group_week_day ON schedule (group_id, week_number, day_of_week)",
+    # Проверка по списку разрешённых пользователей при регистрации
+    "CREATE INDEX IF NOT EXISTS ix_allowed_users_name_group_used ON allowed_users (full_name, group_name, used)",
+    # Заявки студента и список заявок деканата
+    "CREATE INDEX IF NOT EXISTS ix_applications_user_id ON applications (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_applications_status_created ON applications (status, created_at)",
+    # Поиск текущего семестра группы
+    "CREATE INDEX IF NOT EXISTS ix_semesters_group_dates ON semesters (group_name, date_start, date_end)",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
@@ -0,0 +1,19 @@
+from sqlalchemy import text
+
+VERSION = 3
+DESCRIPTION = "Уникальная запись пользователя на мероприятие"
+
+
+def upgrade(conn):
+    # Убираем дубли, которые могли появиться при двойных нажатиях,
+    # иначе уникальный индекс не создастся
+    conn.execute(text("""
+        DELETE FROM event_participants
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM event_participants GROUP BY user_id, event_id
+        )
+    """))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_event_participants_user_event "
+        "ON event_participants (user_id, event_id)"
+    ))
@@ -0,0 +1,12 @@
+from sqlalchemy import text
+
+VERSION = 4
+DESCRIPTION = "Индекс участников по мероприятию для постраничного списка"
+
+
+def upgrade(conn):
+    # В SQLite к индексу неявно добавляется rowid (id), поэтому
+    # выборка «участники мероприятия после id=N» идёт целиком по индексу
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_event_participants_event ON event_participants (event_id)"
+    ))
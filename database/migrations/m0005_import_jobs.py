@@ -0,0 +1,23 @@
+from sqlalchemy import text
+
+VERSION = 5
+DESCRIPTION = "Таблица задач импорта Excel"
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS import_jobs (
+            id INTEGER NOT NULL,
+            kind VARCHAR(20) NOT NULL,
+            file_name VARCHAR(200),
+            status VARCHAR(20),
+            rows_processed INTEGER,
+            result TEXT,
+            errors TEXT,
+            created_by INTEGER,
+            chat_id INTEGER,
+            created_at DATETIME,
+            finished_at DATETIME,
+            PRIMARY KEY (id)
+        )
+    """))
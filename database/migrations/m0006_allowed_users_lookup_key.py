@@ -0,0 +1,49 @@
+import hashlib
+
+from sqlalchemy import text
+
+VERSION = 6
+DESCRIPTION = "Нормализованный ключ списка студентов"
+
+
+# Копия database.db.allowed_user_key на момент миграции: миграция не должна
+# меняться вместе с кодом бота, иначе новые базы получили бы другие ключи
+def normalize_text(value) -> str:
+    return " ".join(str(value).split()).lower().replace("ё", "е")
+
+
+def allowed_user_key(full_name, group_name) -> str:
+    normalized = f"{normalize_text(full_name)}|{normalize_text(group_name)}"
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE allowed_users ADD COLUMN lookup_key VARCHAR(40) NOT NULL DEFAULT ''"))
+
+    # Заполняем ключ для уже загруженных записей. Записи, совпавшие после
+    # нормализации, сливаются в одну; если хоть одна была использована — итоговая тоже
+    kept = {}  # ключ → (id, used)
+    duplicates = []
+    rows = conn.execute(text("SELECT id, full_name, group_name, used FROM allowed_users ORDER BY id"))
+    for row_id, full_name, group_name, used in rows.all():
+        key = allowed_user_key(full_name, group_name)
+        if key in kept:
+            kept_id, kept_used = kept[key]
+            kept[key] = (kept_id, max(kept_used or 0, used or 0))
+            duplicates.append({"id": row_id})
+        else:
+            kept[key] = (row_id, used or 0)
+
+    if duplicates:
+        conn.execute(text("DELETE FROM allowed_users WHERE id = :id"), duplicates)
+    if kept:
+        conn.execute(
+            text("UPDATE allowed_users SET lookup_key = :key, used = :used WHERE id = :id"),
+            [{"key": key, "id": row_id, "used": used} for key, (row_id, used) in kept.items()],
+        )
+
+    # Поиск по ФИО и группе больше не нужен — проверка идёт по ключу
+    conn.execute(text("DROP INDEX IF EXISTS ix_allowed_users_name_group_used"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_allowed_users_lookup_key ON allowed_users (lookup_key)"
+    ))
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+VERSION = 7
+DESCRIPTION = "Хранилище FSM-состояний"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS fsm_states (
+        id INTEGER NOT NULL,
+        bot_id INTEGER NOT NULL,
+        chat_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        thread_id INTEGER NOT NULL DEFAULT 0,
+        destiny VARCHAR(50) NOT NULL DEFAULT 'default',
+        state VARCHAR(100),
+        data TEXT,
+        updated_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_fsm_states_key ON fsm_states (bot_id, chat_id, user_id, thread_id, destiny)",
+    # Очистка устаревших состояний
+    "CREATE INDEX IF NOT EXISTS ix_fsm_states_updated ON fsm_states (updated_at)",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
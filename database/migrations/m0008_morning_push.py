@@ -0,0 +1,16 @@
+from sqlalchemy import text
+
+VERSION = 8
+DESCRIPTION = "Подписка на утреннее расписание"
+
+STATEMENTS = [
+    "ALTER TABLE users ADD COLUMN morning_push INTEGER DEFAULT 0",
+    "ALTER TABLE users ADD COLUMN morning_push_sent DATE",
+    # Выбор подписчиков, которым сегодня ещё не отправляли
+    "CREATE INDEX IF NOT EXISTS ix_users_morning_push ON users (morning_push, morning_push_sent)",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
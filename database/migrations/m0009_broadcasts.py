@@ -0,0 +1,49 @@
+from sqlalchemy import text
+
+VERSION = 9
+DESCRIPTION = "Рассылки объявлений"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS broadcasts (
+        id INTEGER NOT NULL,
+        event_id INTEGER,
+        text TEXT NOT NULL,
+        target VARCHAR(200),
+        status VARCHAR(20),
+        total INTEGER,
+        sent INTEGER,
+        blocked INTEGER,
+        failed INTEGER,
+        cursor INTEGER,
+        created_by INTEGER,
+        chat_id INTEGER,
+        created_at DATETIME,
+        finished_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(event_id) REFERENCES events (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS broadcast_recipients (
+        id INTEGER NOT NULL,
+        broadcast_id INTEGER NOT NULL,
+        user_id INTEGER,
+        telegram_id INTEGER,
+        status VARCHAR(20),
+        error TEXT,
+        PRIMARY KEY (id),
+        FOREIGN KEY(broadcast_id) REFERENCES broadcasts (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    # Получатели рассылки по порядку (курсор)
+    "CREATE INDEX IF NOT EXISTS ix_broadcast_recipients_broadcast ON broadcast_recipients (broadcast_id, id)",
+    # Выбор студентов всех или отдельных групп
+    "CREATE INDEX IF NOT EXISTS ix_users_role_group ON users (role, group_id)",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
@@ -0,0 +1,32 @@
+from sqlalchemy import text
+
+VERSION = 10
+DESCRIPTION = "Очередь исходящих уведомлений (outbox)"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER NOT NULL,
+        chat_id INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        dedup_key VARCHAR(100),
+        status VARCHAR(20),
+        revision INTEGER,
+        attempts INTEGER,
+        next_attempt_at DATETIME,
+        last_error TEXT,
+        created_at DATETIME,
+        sent_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    # Выбор сообщений, которые пора отправить
+    "CREATE INDEX IF NOT EXISTS ix_outbox_status_next ON outbox (status, next_attempt_at)",
+    # Одно ждущее сообщение на ключ (повторные изменения заменяют текст)
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_outbox_pending_dedup ON outbox (dedup_key) WHERE status = 'pending'",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
@@ -0,0 +1,50 @@
+from sqlalchemy import text
+
+VERSION = 11
+DESCRIPTION = "Полнотекстовый поиск пользователей (FTS5)"
+
+# ФИО хранится с ё → е (регистр FTS5 сворачивает сам, букву ё — нет)
+FULL_NAME = "replace(replace({}.full_name, 'ё', 'е'), 'Ё', 'Е')"
+GROUP_NAME = "(SELECT name FROM groups WHERE id = {}.group_id)"
+
+INSERT_NEW = (
+    "INSERT INTO users_fts (rowid, full_name, group_name, role) "
+    f"VALUES (new.id, {FULL_NAME.format('new')}, {GROUP_NAME.format('new')}, new.role);"
+)
+
+# Индекс поддерживается триггерами — в синхроне при регистрации, удалении,
+# смене роли и группы, какой бы код ни менял таблицу users
+STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(full_name, group_name, role UNINDEXED, tokenize='unicode61')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        {INSERT_NEW}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF full_name, group_id, role ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = old.id;
+        {INSERT_NEW}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_group_rename AFTER UPDATE OF name ON groups BEGIN
+        UPDATE users_fts SET group_name = new.name WHERE rowid IN (SELECT id FROM users WHERE group_id = new.id);
+    END
+    """,
+    "DELETE FROM users_fts",
+    f"""
+    INSERT INTO users_fts (rowid, full_name, group_name, role)
+    SELECT users.id, {FULL_NAME.format('users')}, {GROUP_NAME.format('users')}, users.role FROM users
+    """,
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
@@ -0,0 +1,115 @@
+from sqlalchemy import text
+
+VERSION = 12
+DESCRIPTION = "Счётчики статистики и дата регистрации пользователя"
+
+
+def bump(name: str, delta: str) -> str:
+    # Изменение счётчика name (SQL-выражение) на delta
+    return (
+        f"INSERT INTO stat_counters (name, value) VALUES ({name}, {delta}) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+USER_ROLE = "'users:' || COALESCE({}.role, '')"
+APPLICATION_STATUS = "'applications:' || COALESCE({}.status, '')"
+EVENT_ACTIVE = "COALESCE({}.is_active, 0)"
+
+# Счётчики меняются триггерами — в той же транзакции, что и регистрация,
+# заявка, смена статуса или мероприятие, какой бы код ни менял таблицы
+STATEMENTS = [
+    "ALTER TABLE users ADD COLUMN registered_at DATETIME",
+    # Регистрации по дням
+    "CREATE INDEX IF NOT EXISTS ix_users_registered_at ON users (registered_at)",
+    """
+    CREATE TABLE IF NOT EXISTS stat_counters (
+        name VARCHAR(100) NOT NULL,
+        value INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (name)
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_users_insert AFTER INSERT ON users BEGIN
+        {bump("'users'", "1")}
+        {bump(USER_ROLE.format('new'), "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_users_delete AFTER DELETE ON users BEGIN
+        {bump("'users'", "-1")}
+        {bump(USER_ROLE.format('old'), "-1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_users_role AFTER UPDATE OF role ON users
+    WHEN old.role IS NOT new.role BEGIN
+        {bump(USER_ROLE.format('old'), "-1")}
+        {bump(USER_ROLE.format('new'), "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_applications_insert AFTER INSERT ON applications BEGIN
+        {bump("'applications'", "1")}
+        {bump(APPLICATION_STATUS.format('new'), "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_applications_delete AFTER DELETE ON applications BEGIN
+        {bump("'applications'", "-1")}
+        {bump(APPLICATION_STATUS.format('old'), "-1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_applications_status AFTER UPDATE OF status ON applications
+    WHEN old.status IS NOT new.status BEGIN
+        {bump(APPLICATION_STATUS.format('old'), "-1")}
+        {bump(APPLICATION_STATUS.format('new'), "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_events_insert AFTER INSERT ON events BEGIN
+        {bump("'events'", "1")}
+        {bump("'events:active'", EVENT_ACTIVE.format('new'))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_events_delete AFTER DELETE ON events BEGIN
+        {bump("'events'", "-1")}
+        {bump("'events:active'", "-" + EVENT_ACTIVE.format('old'))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_events_active AFTER UPDATE OF is_active ON events
+    WHEN old.is_active IS NOT new.is_active BEGIN
+        {bump("'events:active'", f"{EVENT_ACTIVE.format('new')} - {EVENT_ACTIVE.format('old')}")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_event_participants_insert AFTER INSERT ON event_participants BEGIN
+        {bump("'event_participants'", "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_event_participants_delete AFTER DELETE ON event_participants BEGIN
+        {bump("'event_participants'", "-1")}
+    END
+    """,
+    # Начальные значения по существующим данным
+    "DELETE FROM stat_counters",
+    "INSERT INTO stat_counters (name, value) SELECT 'users', count(*) FROM users",
+    f"INSERT INTO stat_counters (name, value) SELECT {USER_ROLE.format('users')}, count(*) FROM users GROUP BY 1",
+    "INSERT INTO stat_counters (name, value) SELECT 'applications', count(*) FROM applications",
+    f"""
+    INSERT INTO stat_counters (name, value)
+    SELECT {APPLICATION_STATUS.format('applications')}, count(*) FROM applications GROUP BY 1
+    """,
+    "INSERT INTO stat_counters (name, value) SELECT 'events', count(*) FROM events",
+    f"INSERT INTO stat_counters (name, value) SELECT 'events:active', COALESCE(sum({EVENT_ACTIVE.format('events')}), 0) FROM events",
+    "INSERT INTO stat_counters (name, value) SELECT 'event_participants', count(*) FROM event_participants",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
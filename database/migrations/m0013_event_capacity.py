@@ -0,0 +1,76 @@
+from sqlalchemy import text
+
+VERSION = 13
+DESCRIPTION = "Лимит мест на мероприятии и лист ожидания"
+
+
+def bump(name: str, delta: str) -> str:
+    # Изменение счётчика статистики (см. миграцию 12)
+    return (
+        f"INSERT INTO stat_counters (name, value) VALUES ('{name}', {delta}) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+# participants_count — число записанных (без листа ожидания); его меняют триггеры
+# в том же операторе, что добавляет, удаляет или переводит запись из листа ожидания
+STATEMENTS = [
+    "ALTER TABLE events ADD COLUMN capacity INTEGER",
+    "ALTER TABLE events ADD COLUMN participants_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE event_participants ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'registered'",
+    # Участники мероприятия и очередь листа ожидания; заменяет индекс по одному event_id
+    "CREATE INDEX IF NOT EXISTS ix_event_participants_event_status ON event_participants (event_id, status, id)",
+    "DROP INDEX IF EXISTS ix_event_participants_event",
+    """
+    CREATE TRIGGER IF NOT EXISTS event_participants_count_insert AFTER INSERT ON event_participants
+    WHEN new.status = 'registered' BEGIN
+        UPDATE events SET participants_count = participants_count + 1 WHERE id = new.event_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_participants_count_delete AFTER DELETE ON event_participants
+    WHEN old.status = 'registered' BEGIN
+        UPDATE events SET participants_count = participants_count - 1 WHERE id = old.event_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_participants_count_status AFTER UPDATE OF status ON event_participants
+    WHEN old.status IS NOT new.status BEGIN
+        UPDATE events SET participants_count = participants_count
+            + (new.status = 'registered') - (old.status = 'registered')
+        WHERE id = new.event_id;
+    END
+    """,
+    """
+    UPDATE events SET participants_count = (
+        SELECT count(*) FROM event_participants
+        WHERE event_participants.event_id = events.id AND event_participants.status = 'registered'
+    )
+    """,
+    # Счётчик статистики «записей на мероприятия» — теперь без листа ожидания
+    "DROP TRIGGER IF EXISTS stat_event_participants_insert",
+    "DROP TRIGGER IF EXISTS stat_event_participants_delete",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_event_participants_insert AFTER INSERT ON event_participants
+    WHEN new.status = 'registered' BEGIN
+        {bump('event_participants', '1')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_event_participants_delete AFTER DELETE ON event_participants
+    WHEN old.status = 'registered' BEGIN
+        {bump('event_participants', '-1')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stat_event_participants_status AFTER UPDATE OF status ON event_participants
+    WHEN old.status IS NOT new.status BEGIN
+        {bump('event_participants', "(new.status = 'registered') - (old.status = 'registered')")}
+    END
+    """,
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
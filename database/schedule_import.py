@@ -0,0 +1,246 @@
+"""Потоковый импорт расписания из Excel.
+
+Формат строк (первая строка — заголовки):
+Группа | День недели | Время | Предмет | Преподаватель | Аудитория | Неделя | — | Семестр: группа | начало | конец
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import openpyxl
+from sqlalchemy import bindparam, delete, insert, select, update
+
+from database.db import engine, Group, Schedule, Semester, semester_group_association
+
+# Сколько строк вставлять одним executemany
+BATCH_SIZE = 1000
+
+# Колонок в строке файла (короткие строки дополняются None)
+ROW_WIDTH = 11
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0             # прочитано строк файла
+    skipped: int = 0          # пропущено неполных строк
+    inserted: int = 0         # новых занятий
+    updated: int = 0          # занятий, у которых изменились предмет, преподаватель или аудитория
+    removed: int = 0          # занятий, которых больше нет в файле
+    unchanged: int = 0
+    groups_created: int = 0
+    semesters_created: int = 0
+    semesters_updated: int = 0
+    changed_groups: list = field(default_factory=list)  # группы, у которых изменилось расписание или семестр
+
+
+# Поля занятия в порядке сравнения; первые три — «место» занятия в сетке
+FIELDS = ("week_number", "day_of_week", "time", "subject", "teacher", "room")
+SLOT_SIZE = 3
+
+
+@dataclass
+class ScheduleDiff:
+    inserts: list = field(default_factory=list)   # [values, ...]
+    updates: list = field(default_factory=list)   # [(id, values), ...]
+    removes: list = field(default_factory=list)   # [id, ...]
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserts or self.updates or self.removes)
+
+
+def iter_rows(file_path):
+    # read_only + values_only: openpyxl читает лист потоково, не загружая ячейки в память
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in wb.active.iter_rows(min_row=2, values_only=True):
+            yield tuple(row) + (None,) * (ROW_WIDTH - len(row))
+    finally:
+        wb.close()
+
+
+def parse_row(row):
+    """Возвращает (группа, значения в порядке FIELDS)."""
+    group_name = str(row[0]).strip()
+    week = int(str(row[6]).strip()) if str(row[6]).strip() in ['1', '2'] else 1
+    return group_name, (
+        week,
+        str(row[1]).strip().upper(),
+        str(row[2]).strip(),
+        str(row[3]).strip(),
+        str(row[4]).strip(),
+        str(row[5]).strip(),
+    )
+
+
+def parse_semester(row):
+    # Семестр указывается в колонках 9–11 произвольной строки
+    sem_group = str(row[8]).strip() if row[8] else None
+    start_date, end_date = row[9], row[10]
+    if sem_group and isinstance(start_date, datetime) and isinstance(end_date, datetime):
+        return sem_group, (start_date.date(), end_date.date())
+    return None
+
+
+def diff_group(old_rows, new_rows) -> ScheduleDiff:
+    """Сравнивает занятия группы в БД (id, *FIELDS) с занятиями из файла.
+
+    Совпадающие строки не трогаются; строка, у которой совпало только «место»
+    (неделя, день, время), обновляется; остальные вставляются или удаляются.
+    Повторяющиеся строки учитываются по количеству.
+    """
+    diff = ScheduleDiff()
+
+    old_by_values = defaultdict(list)
+    for row_id, *values in old_rows:
+        old_by_values[tuple(values)].append(row_id)
+
+    added = []
+    for values in new_rows:
+        ids = old_by_values.get(values)
+        if ids:
+            ids.pop()
+            diff.unchanged += 1
+        else:
+            added.append(values)
+
+    old_by_slot = defaultdict(list)
+    for values, ids in old_by_values.items():
+        old_by_slot[values[:SLOT_SIZE]].extend(ids)
+
+    for values in added:
+        ids = old_by_slot.get(values[:SLOT_SIZE])
+        if ids:
+            diff.updates.append((ids.pop(), values))
+        else:
+            diff.inserts.append(values)
+
+    diff.removes = [row_id for ids in old_by_slot.values() for row_id in ids]
+    return diff
+
+
+class GroupMap:
+    """Название группы (в верхнем регистре) → id; новые группы создаются в той же транзакции."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.ids = {name: group_id for group_id, name in conn.execute(select(Group.id, Group.name))}
+        self.created = 0
+
+    def get_id(self, group_name: str) -> int:
+        name = group_name.upper()
+        group_id = self.ids.get(name)
+        if group_id is None:
+            group_id = self.conn.execute(insert(Group).values(name=name)).inserted_primary_key[0]
+            self.ids[name] = group_id
+            self.created += 1
+        return group_id
+
+
+def apply_diff(conn, group_id: int, diff: ScheduleDiff):
+    if diff.inserts:
+        for start in range(0, len(diff.inserts), BATCH_SIZE):
+            conn.execute(insert(Schedule), [
+                dict(zip(FIELDS, values), group_id=group_id)
+                for values in diff.inserts[start:start + BATCH_SIZE]
+            ])
+    if diff.updates:
+        conn.execute(
+            update(Schedule).where(Schedule.id == bindparam("row_id")).values(
+                {name: bindparam(f"new_{name}") for name in FIELDS}
+            ),
+            [
+                {"row_id": row_id, **{f"new_{name}": value for name, value in zip(FIELDS, values)}}
+                for row_id, values in diff.updates
+            ],
+        )
+    for start in range(0, len(diff.removes), BATCH_SIZE):
+        conn.execute(delete(Schedule).where(Schedule.id.in_(diff.removes[start:start + BATCH_SIZE])))
+
+
+def save_semesters(conn, groups: GroupMap, semester_dates, imported_groups, result: ImportResult):
+    # Семестр группы из файла создаётся, а если уже есть — обновляются его даты
+    for sem_group, (start_date, end_date) in semester_dates.items():
+        if sem_group.upper() not in imported_groups:
+            continue
+        group_id = groups.get_id(sem_group)
+        existing = conn.execute(
+            select(Semester.id, Semester.date_start, Semester.date_end)
+            .join(semester_group_association, semester_group_association.c.semester_id == Semester.id)
+            .where(semester_group_association.c.group_id == group_id)
+            .order_by(Semester.id.desc())
+            .limit(1)
+        ).first()
+
+        if existing is None:
+            semester_id = conn.execute(insert(Semester).values(
+                number=1, date_start=start_date, date_end=end_date, group_name=sem_group
+            )).inserted_primary_key[0]
+            conn.execute(insert(semester_group_association).values(semester_id=semester_id, group_id=group_id))
+            result.semesters_created += 1
+        elif (existing.date_start, existing.date_end) != (start_date, end_date):
+            conn.execute(
+                update(Semester).where(Semester.id == existing.id).values(date_start=start_date, date_end=end_date)
+            )
+            result.semesters_updated += 1
+        else:
+            continue
+
+        name = sem_group.upper()
+        if name not in result.changed_groups:
+            result.changed_groups.append(name)
+
+
+def import_schedule(file_path, progress=None, progress_every=2000) -> ImportResult:
+    """Приводит расписание групп из файла к содержимому файла.
+
+    Для каждой группы из файла считается разница с БД (новые, изменённые,
+    удалённые занятия), и вся разница применяется одной транзакцией — читатели
+    видят либо старое расписание, либо новое. Повторный импорт того же файла
+    ничего не меняет. Группы, которых нет в файле, не затрагиваются.
+
+    progress(rows) вызывается каждые progress_every прочитанных строк.
+    Синхронная функция — вызывать из потока или процесса, не из цикла событий.
+    """
+    result = ImportResult()
+    semester_dates = {}
+    by_group = defaultdict(list)  # группа из файла (в верхнем регистре) → [значения занятий]
+
+    # Чтение файла — до начала транзакции, чтобы не держать блокировку записи дольше нужного
+    for rows_read, row in enumerate(iter_rows(file_path), start=1):
+        result.rows = rows_read
+        semester = parse_semester(row)
+        if semester:
+            semester_dates[semester[0]] = semester[1]
+
+        if not all(row[:7]):
+            result.skipped += 1
+        else:
+            group_name, values = parse_row(row)
+            by_group[group_name.upper()].append(values)
+
+        if progress and rows_read % progress_every == 0:
+            progress(rows_read)
+
+    with engine.begin() as conn:
+        groups = GroupMap(conn)
+        old_columns = [Schedule.id] + [getattr(Schedule, name) for name in FIELDS]
+
+        for group_name, new_rows in by_group.items():
+            group_id = groups.get_id(group_name)
+            old_rows = conn.execute(select(*old_columns).where(Schedule.group_id == group_id)).all()
+            diff = diff_group(old_rows, new_rows)
+            apply_diff(conn, group_id, diff)
+
+            result.inserted += len(diff.inserts)
+            result.updated += len(diff.updates)
+            result.removed += len(diff.removes)
+            result.unchanged += diff.unchanged
+            if diff.changed:
+                result.changed_groups.append(group_name)
+
+        save_semesters(conn, groups, semester_dates, set(by_group), result)
+        result.groups_created = groups.created
+
+    return result
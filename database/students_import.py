@@ -0,0 +1,85 @@
+"""Импорт списка студентов (allowed_users) из Excel.
+
+Формат строк (первая строка — заголовки):
+ФИО | Группа
+"""
+from dataclasses import dataclass
+
+import openpyxl
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from database.db import engine, AllowedUser, allowed_user_key
+
+# Сколько записей проверять и вставлять за раз (в SQLite до 999 параметров в IN)
+BATCH_SIZE = 500
+
+
+@dataclass
+class StudentsImportResult:
+    rows: int = 0         # прочитано строк файла
+    added: int = 0        # новых студентов в списке
+    existing: int = 0     # уже были в списке
+    duplicates: int = 0   # повторы внутри файла
+    skipped: int = 0      # строки без ФИО или группы
+
+
+def iter_students(file_path):
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in wb.active.iter_rows(min_row=2, max_col=2, values_only=True):
+            yield tuple(row) + (None,) * (2 - len(row))
+    finally:
+        wb.close()
+
+
+def save_batch(conn, batch: dict, result: StudentsImportResult):
+    # batch: ключ → {"full_name", "group_name", "lookup_key"}
+    existing = set(conn.scalars(select(AllowedUser.lookup_key).where(AllowedUser.lookup_key.in_(batch))))
+    result.existing += len(existing)
+
+    new_rows = [values for key, values in batch.items() if key not in existing]
+    if new_rows:
+        # ON CONFLICT на случай параллельной регистрации/импорта: существующая запись
+        # (и её отметка used) не перезаписывается
+        conn.execute(insert(AllowedUser).on_conflict_do_nothing(index_elements=["lookup_key"]), new_rows)
+        result.added += len(new_rows)
+
+
+def import_students(file_path, progress=None, progress_every=2000) -> StudentsImportResult:
+    """Добавляет студентов из файла в список разрешённых пользователей.
+
+    ФИО и группа сравниваются без учёта регистра, ё/е и лишних пробелов;
+    повторный импорт того же файла ничего не добавляет. Всё — одной транзакцией.
+    progress(rows) вызывается каждые progress_every прочитанных строк.
+    """
+    result = StudentsImportResult()
+    seen = set()
+    batch = {}
+
+    with engine.begin() as conn:
+        for rows_read, (full_name, group_name) in enumerate(iter_students(file_path), start=1):
+            result.rows = rows_read
+            full_name = " ".join(str(full_name or "").split())
+            group_name = " ".join(str(group_name or "").split())
+
+            if not full_name or not group_name:
+                result.skipped += 1
+            else:
+                key = allowed_user_key(full_name, group_name)
+                if key in seen:
+                    result.duplicates += 1
+                else:
+                    seen.add(key)
+                    batch[key] = {"full_name": full_name, "group_name": group_name, "lookup_key": key, "used": 0}
+                    if len(batch) >= BATCH_SIZE:
+                        save_batch(conn, batch, result)
+                        batch = {}
+
+            if progress and rows_read % progress_every == 0:
+                progress(rows_read)
+
+        if batch:
+            save_batch(conn, batch, result)
+
+    return result
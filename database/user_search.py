@@ -0,0 +1,57 @@
+import re
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import selectinload
+
+from database.db import User, normalize_text
+
+_TOKEN = re.compile(r"\w+")
+
+# Совпадение в ФИО весит больше, чем в названии группы
+_RANK = "bm25(users_fts, 2.0, 1.0)"
+
+
+def match_expression(query: str) -> str | None:
+    """Запрос FTS5: каждое слово — префикс, все слова обязательны.
+
+    "иван 21-спо" → "иван"* "21"* "спо"*
+    """
+    tokens = _TOKEN.findall(normalize_text(query))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+async def search_users(session, query: str, limit: int, offset: int = 0) -> tuple[int, list]:
+    """Возвращает (всего найдено, пользователи страницы) — лучшие совпадения первыми.
+
+    Поиск по индексу users_fts (миграция 11); строка из цифр сначала
+    проверяется как Telegram ID.
+    """
+    query = query.strip()
+    if query.isdigit():
+        user = await session.scalar(
+            select(User).options(selectinload(User.group)).filter_by(telegram_id=int(query))
+        )
+        if user:
+            return 1, [user] if offset == 0 else []
+
+    expression = match_expression(query)
+    if expression is None:
+        return 0, []
+
+    total = await session.scalar(
+        text("SELECT count(*) FROM users_fts WHERE users_fts MATCH :q"), {"q": expression}
+    )
+    if not total:
+        return 0, []
+    ids = (await session.scalars(
+        text(f"SELECT rowid FROM users_fts WHERE users_fts MATCH :q ORDER BY {_RANK} LIMIT :limit OFFSET :offset"),
+        {"q": expression, "limit": limit, "offset": offset},
+    )).all()
+
+    users = (await session.scalars(
+        select(User).options(selectinload(User.group)).where(User.id.in_(ids))
+    )).all()
+    by_id = {user.id: user for user in users}
+    return total, [by_id[user_id] for user_id in ids if user_id in by_id]
@@ -0,0 +1 @@
+from .role import RoleFilter
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from aiogram.filters import BaseFilter
+from aiogram.types import TelegramObject
+
+
+# Пропускает апдейт, только если роль пользователя (из UserMiddleware) входит в список
+class RoleFilter(BaseFilter):
+    def __init__(self, *roles: str):
+        self.roles = roles
+
+    async def __call__(self, event: TelegramObject, role: Optional[str] = None) -> bool:
+        return role in self.roles
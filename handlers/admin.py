@@ -1,24 +1,36 @@
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, CallbackQuery, Document
+from aiogram.filters.callback_data import CallbackData
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message, CallbackQuery, Document, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
-from database.db import get_db_session, User, Application, Event, AllowedUser, get_or_create_group, Group, Semester
+from database.db import async_session, User, Application, Event, AllowedUser, Group, Semester, Schedule, ImportJob, release_user_events
+from sqlalchemy import select, func, delete
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
-import openpyxl
 import io
 import os
-import openpyxl
 from datetime import datetime
+from html import escape
 from aiogram.types import ContentType, Message
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 
-from config import ADMIN_IDS
+from config import PAGE_SIZE
+from database.user_search import search_users
+from filters import RoleFilter
+from middlewares.user import invalidate_user
+from utils.import_jobs import import_jobs, JOB_KIND_NAMES, JOB_STATUS_NAMES
+from utils.pagination import ListView, PageCallback, ItemCallback, render_page, back_button
+from utils import outbox
+from utils.stats import stats_cache, read_counters, statuses_from_counters, order_statuses
 
 router = Router()
+# Кнопки админ-панели доступны только администраторам
+router.callback_query.filter(RoleFilter("admin"))
 
 class UploadExcel(StatesGroup):
     type = State()
@@ -42,6 +54,8 @@ async def show_admin_menu(message: Message):
     kb.button(text="🧹 Очистить заявки", callback_data="admin_clear_apps")
     kb.button(text="📅 Импорт расписания (Excel)", callback_data="admin_upload_schedule")
     kb.button(text="📤 Импорт списка студентов (Excel)", callback_data="admin_upload_excel")
+    kb.button(text="⚙ Задачи импорта", callback_data="admin_import_jobs")
+    kb.button(text="📤 Выгрузка (Excel/CSV)", callback_data="export_help")
     
     kb.adjust(1)
     await message.answer("🛠 <b>Админ-панель</b>", reply_markup=kb.as_markup())
@@ -50,8 +64,8 @@ async def show_admin_menu(message: Message):
 
 # Вход в админ-панель
 @router.message(Command("admin"))
-async def admin_panel_cmd(message: Message):
-    if message.from_user.id not in ADMIN_IDS:
+async def admin_panel_cmd(message: Message, role: str | None):
+    if role != "admin":
         await message.answer("❌ У вас нет прав администратора.")
         return
     await show_admin_menu(message)
@@ -59,26 +73,93 @@ async def admin_panel_cmd(message: Message):
 
 
 # Просмотр списка пользователей
+def render_user(user: User) -> str:
+    return (
+        f"👤 <b>{user.full_name}</b> — <a href='tg://user?id={user.telegram_id}'>[написать]</a>\n"
+        f"🏫 Группа: {user.group.name if user.group else '—'}\n"
+        f"🆔 Telegram ID: <code>{user.telegram_id}</code>"
+    )
+
+USERS_VIEW = ListView(
+    name="users",
+    key=User.id,
+    query=lambda arg: select(User),
+    options=(selectinload(User.group),),
+    header="📋 <b>Пользователи</b>",
+    empty_text="Пользователи не найдены.",
+    render_item=lambda user: (
+        f"👤 <b>{user.full_name}</b> · {user.group.name if user.group else '—'} · "
+        f"<code>{user.telegram_id}</code>"
+    ),
+    item_button=lambda user: f"👤 {user.full_name}"[:60],
+)
+
 @router.callback_query(F.data == "admin_users")
 async def admin_users(callback: CallbackQuery):
-    session = get_db_session()
-    users = session.query(User).order_by(User.id).all()
-    if not users:
-        await callback.answer("Пользователи не найдены.")
-        session.close()
-        return
+    async with async_session() as session:
+        text, markup = await render_page(session, USERS_VIEW, PageCallback(view=USERS_VIEW.name))
+    await callback.message.answer(text, reply_markup=markup)
+    await callback.answer()
+
+@router.callback_query(PageCallback.filter(F.view == USERS_VIEW.name))
+async def admin_users_page(callback: CallbackQuery, callback_data: PageCallback):
+    async with async_session() as session:
+        text, markup = await render_page(session, USERS_VIEW, callback_data)
+    await callback.message.edit_text(text, reply_markup=markup)
+    await callback.answer()
 
-    for user in users[:50]:
-        kb = InlineKeyboardBuilder()
-        kb.button(text="❌ Удалить", callback_data=f"admin_delete_user_{user.id}")
-        await callback.message.answer(
-            f"👤 <b>{user.full_name}</b> — <a href='tg://user?id={user.telegram_id}'>[написать]</a>\n"
-            f"🏫 Группа: {user.group.name if user.group else '—'}\n"
-            f"🆔 Telegram ID: <code>{user.telegram_id}</code>",
-            reply_markup=kb.as_markup()
+# Карточка пользователя с кнопкой удаления
+@router.callback_query(ItemCallback.filter(F.view == USERS_VIEW.name))
+async def admin_user_card(callback: CallbackQuery, callback_data: ItemCallback):
+    async with async_session() as session:
+        user = await session.scalar(
+            select(User).options(selectinload(User.group)).filter_by(id=callback_data.id)
         )
-    await callback.answer("✅ Список пользователей отправлен.")
-    session.close()
+    if not user:
+        await callback.answer("❌ Пользователь не найден.")
+        return
+
+    kb = InlineKeyboardBuilder()
+    kb.button(text="❌ Удалить", callback_data=f"admin_delete_user_{user.id}")
+    kb.row(back_button(callback_data))
+    await callback.message.edit_text(render_user(user), reply_markup=kb.as_markup())
+    await callback.answer()
+
+# Задачи импорта: идущие и завершённые
+def render_job(job: ImportJob) -> str:
+    text = (
+        f"<b>#{job.id}</b> {JOB_KIND_NAMES.get(job.kind, job.kind)} · {JOB_STATUS_NAMES.get(job.status, job.status)}\n"
+        f"📄 {job.file_name} · строк: {import_jobs.rows_processed(job)} · {job.created_at:%d.%m %H:%M}"
+    )
+    if job.status == "done" and job.result:
+        text += f"\n{job.result}"
+    elif job.status == "failed" and job.errors:
+        text += f"\n⚠ {job.errors[:200]}"
+    return text
+
+JOBS_VIEW = ListView(
+    name="jobs",
+    key=ImportJob.id,
+    query=lambda arg: select(ImportJob),
+    header="⚙ <b>Задачи импорта</b>",
+    empty_text="Импортов ещё не было.",
+    descending=True,
+    render_item=render_job,
+)
+
+@router.callback_query(F.data == "admin_import_jobs")
+async def admin_import_jobs(callback: CallbackQuery):
+    async with async_session() as session:
+        text, markup = await render_page(session, JOBS_VIEW, PageCallback(view=JOBS_VIEW.name))
+    await callback.message.answer(text, reply_markup=markup)
+    await callback.answer()
+
+@router.callback_query(PageCallback.filter(F.view == JOBS_VIEW.name))
+async def admin_import_jobs_page(callback: CallbackQuery, callback_data: PageCallback):
+    async with async_session() as session:
+        text, markup = await render_page(session, JOBS_VIEW, callback_data)
+    await callback.message.edit_text(text, reply_markup=markup)
+    await callback.answer()
 
 @router.callback_query(F.data == "admin_find_user")
 async def admin_find_user(callback: CallbackQuery, state: FSMContext):
@@ -94,73 +175,178 @@ async def prompt_schedule_upload(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.message(FindStudent.query)
-async def process_find_student(message: Message, state: FSMContext):
-    text = message.text.strip()
-    session = get_db_session()
+SEARCH_ROLE_NAMES = {"student": "студент", "dean": "деканат", "admin": "админ"}
 
-    results = session.query(User).filter(
-        (User.full_name.ilike(f"%{text}%")) |
-        (User.telegram_id == text if text.isdigit() else False) |
-        (User.group.has(name=text.upper()))
-    ).all()
 
-    if not results:
-        await message.answer("❌ Пользователь не найден.")
-    else:
-        for user in results[:10]:  
-            kb = InlineKeyboardBuilder()
-            kb.button(text="❌ Удалить", callback_data=f"admin_delete_user_{user.id}")
-            await message.answer(
-                f"👤 <b>{user.full_name}</b> — <a href='tg://user?id={user.telegram_id}'>[написать]</a>\n"
-                f"🏫 Группа: {user.group.name if user.group else '—'}\n"
-                f"🆔 Telegram ID: <code>{user.telegram_id}</code>",
-                reply_markup=kb.as_markup()
-            )
+# Результаты поиска одной страницей; запрос хранится в данных FSM админа
+class SearchPage(CallbackData, prefix="fs"):
+    page: int
 
-    await state.clear()
-    session.close()
 
+async def render_search(query: str, page: int):
+    async with async_session() as session:
+        total, users = await search_users(session, query, PAGE_SIZE, page * PAGE_SIZE)
+
+    if not users:
+        return "❌ Пользователь не найден.", None
+
+    pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+    lines = [f"🔎 <b>{escape(query)}</b> — найдено {total}" + (f", стр. {page + 1}/{pages}" if pages > 1 else "")]
+    kb = InlineKeyboardBuilder()
+    for number, user in enumerate(users, start=page * PAGE_SIZE + 1):
+        lines.append(
+            f"{number}. <b>{user.full_name}</b> · {user.group.name if user.group else '—'} · "
+            f"<code>{user.telegram_id}</code> · {SEARCH_ROLE_NAMES.get(user.role, user.role)}"
+        )
+        kb.button(text=str(number), callback_data=ItemCallback(view=USERS_VIEW.name, id=user.id))
+    kb.adjust(5)
+
+    nav = []
+    if page > 0:
+        nav.append(InlineKeyboardButton(text="◀", callback_data=SearchPage(page=page - 1).pack()))
+    if page + 1 < pages:
+        nav.append(InlineKeyboardButton(text="▶", callback_data=SearchPage(page=page + 1).pack()))
+    if nav:
+        kb.row(*nav)
+    return "\n".join(lines), kb.as_markup()
+
+
+@router.message(FindStudent.query, RoleFilter("admin"))
+async def process_find_student(message: Message, state: FSMContext):
+    query = (message.text or "").strip()
+    # Диалог закончен, но запрос остаётся в данных — для перелистывания
+    await state.set_state(None)
+    await state.update_data(search_query=query)
+
+    text, markup = await render_search(query, 0)
+    await message.answer(text, reply_markup=markup)
+
+
+@router.callback_query(SearchPage.filter())
+async def find_student_page(callback: CallbackQuery, callback_data: SearchPage, state: FSMContext):
+    query = (await state.get_data()).get("search_query")
+    if not query:
+        await callback.answer("❌ Поиск устарел, повторите его.", show_alert=True)
+        return
+    text, markup = await render_search(query, callback_data.page)
+    await callback.message.edit_text(text, reply_markup=markup)
+    await callback.answer()
 
 
 # Удаление пользователя
 @router.callback_query(F.data.startswith("admin_delete_user_"))
 async def admin_delete_user(callback: CallbackQuery):
     user_id = int(callback.data.split("_")[-1])
-    session = get_db_session()
-    user = session.query(User).filter_by(id=user_id).first()
+    async with async_session() as session:
+        user = await session.scalar(select(User).filter_by(id=user_id))
+        if user:
+            # Удаляем связанные заявки и записи на мероприятия перед удалением пользователя;
+            # освободившиеся места получает лист ожидания
+            await session.execute(delete(Application).filter_by(user_id=user.id))
+            promoted = await release_user_events(session, user.id)
+            await session.execute(delete(User).filter_by(id=user.id))
+            await session.commit()
+            invalidate_user(user.telegram_id)
+            if promoted:
+                outbox.wake()
+
     if user:
-        # Удаляем связанные заявки перед удалением пользователя
-        session.query(Application).filter_by(user_id=user.id).delete()
-        session.delete(user)
-        session.commit()
         await callback.answer("✅ Пользователь удалён.", show_alert=True)
         await callback.message.edit_text("❌ Пользователь удалён.")
     else:
         await callback.answer("❌ Пользователь не найден.")
-    session.close()
 
 
 
 # Статистика проекта
+# Отчёты: итоги — из счётчиков (одно чтение маленькой таблицы), разрезы — из снимка stats_cache
+STATUS_ICONS = {"Новая": "🆕", "Принята": "✅", "В процессе": "🚧", "Отклонена": "❌", "Выполнена": "🏁"}
+
+class StatsReport(CallbackData, prefix="st"):
+    report: str  # main / groups / days / events / refresh
+
+def stats_keyboard(report: str):
+    kb = InlineKeyboardBuilder()
+    kb.button(text="🏫 Заявки по группам", callback_data=StatsReport(report="groups"))
+    kb.button(text="📈 Регистрации по дням", callback_data=StatsReport(report="days"))
+    kb.button(text="🎉 Участие в мероприятиях", callback_data=StatsReport(report="events"))
+    kb.button(text="🔄 Обновить", callback_data=StatsReport(report="refresh"))
+    if report != "main":
+        kb.button(text="⬅ Назад", callback_data=StatsReport(report="main"))
+    kb.adjust(1)
+    return kb.as_markup()
+
+def render_stats_main(counters: dict) -> str:
+    statuses = statuses_from_counters(counters)
+    lines = [
+        "📊 <b>Статистика проекта</b>\n",
+        f"👥 Пользователей: <b>{counters.get('users', 0)}</b> (студентов: {counters.get('users:student', 0)})",
+        f"✉ Подано заявок: <b>{counters.get('applications', 0)}</b>",
+    ]
+    if statuses:
+        lines.append("   " + " · ".join(f"{STATUS_ICONS.get(status, '•')} {status}: {count}" for status, count in statuses))
+    lines += [
+        f"🎉 Всего мероприятий: <b>{counters.get('events', 0)}</b>, активных: <b>{counters.get('events:active', 0)}</b>",
+        f"🙋 Записей на мероприятия: <b>{counters.get('event_participants', 0)}</b>",
+    ]
+    return "\n".join(lines)
+
+def render_stats_report(report: str, snapshot, counters: dict) -> str:
+    footer = f"\n\n<i>Данные на {snapshot.built_at:%d.%m %H:%M}</i>"
+    if report == "groups":
+        if not snapshot.by_group:
+            return "🏫 Заявок пока нет." + footer
+        lines = [
+            f"🏫 <b>Заявки по группам</b> (топ {len(snapshot.by_group)} из {snapshot.groups_total})\n",
+            " · ".join(f"{icon} {status}" for status, icon in STATUS_ICONS.items()) + "\n",
+        ]
+        for name, total, statuses in snapshot.by_group:
+            parts = " · ".join(f"{STATUS_ICONS.get(status, '•')} {count}" for status, count in order_statuses(statuses))
+            lines.append(f"<b>{escape(name)}</b> — {total}: {parts}")
+        return "\n".join(lines) + footer
+
+    if report == "days":
+        peak = max((count for _, count in snapshot.registrations), default=0) or 1
+        lines = [f"📈 <b>Регистрации за {len(snapshot.registrations)} дн.</b>: {sum(c for _, c in snapshot.registrations)}\n"]
+        for day, count in snapshot.registrations:
+            lines.append(f"<code>{day:%d.%m} {'▇' * round(count / peak * 12):<12} {count}</code>")
+        return "\n".join(lines) + footer
+
+    students = counters.get("users:student", 0)
+    if not snapshot.participation:
+        return "🎉 Активных мероприятий нет." + footer
+    lines = [f"🎉 <b>Участие в активных мероприятиях</b> (доля от {students} студентов)\n"]
+    for title, participants, capacity in snapshot.participation:
+        share = f"{participants / students:.1%}" if students else "—"
+        seats = f", мест занято {participants}/{capacity}" if capacity else ""
+        lines.append(f"<b>{escape(title)}</b> — {participants} ({share}{seats})")
+    return "\n".join(lines) + footer
+
 @router.callback_query(F.data == "admin_stats")
 async def admin_stats(callback: CallbackQuery):
-    session = get_db_session()
-    total_users = session.query(User).count()
-    total_apps = session.query(Application).count()
-    total_events = session.query(Event).count()
-    active_events = session.query(Event).filter_by(is_active=1).count()
+    async with async_session() as session:
+        counters = await read_counters(session)
+    await callback.message.answer(render_stats_main(counters), reply_markup=stats_keyboard("main"))
+    await callback.answer()
 
-    text = (
-        "📊 <b>Статистика проекта</b>\n\n"
-        f"👨‍🎓 Зарегистрировано студентов: <b>{total_users}</b>\n"
-        f"✉ Подано заявок: <b>{total_apps}</b>\n"
-        f"🎉 Всего мероприятий: <b>{total_events}</b>\n"
-        f"🟢 Активных мероприятий: <b>{active_events}</b>"
-    )
-    await callback.message.answer(text)
+@router.callback_query(StatsReport.filter())
+async def admin_stats_report(callback: CallbackQuery, callback_data: StatsReport):
+    report = callback_data.report
+    async with async_session() as session:
+        counters = await read_counters(session)
+    if report in ("main", "refresh"):
+        if report == "refresh":
+            await stats_cache.get(force=True)
+        text = render_stats_main(counters)
+        report = "main"
+    else:
+        text = render_stats_report(report, await stats_cache.get(), counters)
+
+    try:
+        await callback.message.edit_text(text, reply_markup=stats_keyboard(report))
+    except TelegramBadRequest:
+        pass  # «message is not modified» — данные не изменились
     await callback.answer()
-    session.close()
 
 
 
@@ -181,10 +367,9 @@ async def admin_clear_cancel(callback: CallbackQuery):
 
 @router.callback_query(F.data == "admin_clear_confirm")
 async def admin_clear_confirm(callback: CallbackQuery):
-    session = get_db_session()
-    deleted = session.query(Application).delete()
-    session.commit()
-    session.close()
+    async with async_session() as session:
+        deleted = (await session.execute(delete(Application))).rowcount
+        await session.commit()
     await callback.answer(f"✅ Удалено заявок: {deleted}", show_alert=True)
     await show_admin_menu(callback.message)
 
@@ -193,8 +378,8 @@ async def admin_clear_confirm(callback: CallbackQuery):
 # Сброс всех FSM состояний /admin_reset_all_fsm
 
 @router.message(Command("admin_reset_all_fsm"))
-async def admin_reset_all_fsm(message: Message, state: FSMContext):
-    if message.from_user.id not in ADMIN_IDS:
+async def admin_reset_all_fsm(message: Message, state: FSMContext, role: str | None):
+    if role != "admin":
         await message.answer("❌ У вас нет прав администратора.")
         return
 
@@ -203,11 +388,14 @@ async def admin_reset_all_fsm(message: Message, state: FSMContext):
 
 # Назначение роли /set_role
 @router.message(Command("set_role"))
-async def cmd_set_role(message: Message, state: FSMContext):
+async def cmd_set_role(message: Message, state: FSMContext, role: str | None):
+    if role != "admin":
+        await message.answer("❌ У вас нет прав администратора.")
+        return
     await message.answer("Введите Telegram ID пользователя, которому нужно назначить роль:")
     await state.set_state(SetRole.waiting_for_telegram_id)
 
-@router.message(SetRole.waiting_for_telegram_id)
+@router.message(SetRole.waiting_for_telegram_id, RoleFilter("admin"))
 async def process_telegram_id(message: Message, state: FSMContext):
     telegram_id = message.text.strip()
     if not telegram_id.isdigit():
@@ -217,7 +405,7 @@ async def process_telegram_id(message: Message, state: FSMContext):
     await message.answer("Введите новую роль для пользователя: student / dean / admin")
     await state.set_state(SetRole.waiting_for_role)
 
-@router.message(SetRole.waiting_for_role)
+@router.message(SetRole.waiting_for_role, RoleFilter("admin"))
 async def process_new_role(message: Message, state: FSMContext):
     role = message.text.strip().lower()
     if role not in ["student", "dean", "admin"]:
@@ -227,17 +415,19 @@ async def process_new_role(message: Message, state: FSMContext):
     data = await state.get_data()
     telegram_id = data["telegram_id"]
 
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=telegram_id).first()
+    async with async_session() as session:
+        user = await session.scalar(select(User).filter_by(telegram_id=telegram_id))
+        if user:
+            user.role = role
+            await session.commit()
+            invalidate_user(telegram_id)
+
     if not user:
         await message.answer("❌ Пользователь не найден.")
     else:
-        user.role = role
-        session.commit()
         await message.answer(f"✅ Роль пользователя <b>{user.full_name}</b> обновлена на <b>{role}</b>.")
 
     await state.clear()
-    session.close()
 
 # Обработчик кнопки загрузки excel
 @router.callback_query(F.data == "admin_upload_excel")
@@ -249,84 +439,26 @@ async def prompt_excel_upload(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 #Обработка excel
-@router.message(F.content_type == ContentType.DOCUMENT, StateFilter(UploadExcel.type))
+@router.message(F.content_type == ContentType.DOCUMENT, StateFilter(UploadExcel.type), RoleFilter("admin"))
 async def handle_excel_file(message: Message, state: FSMContext):
     os.makedirs("temp", exist_ok=True) # Убедимся, что папка temp существует
     document = message.document
-    file_path = f"temp/{document.file_name}"
+    # file_unique_id в имени — два одновременных импорта не перезапишут файлы друг друга
+    file_path = f"temp/{document.file_unique_id}_{document.file_name}"
     await message.bot.download(document, destination=file_path)
 
-    wb = openpyxl.load_workbook(file_path)
-    sheet = wb.active
-
-    session = get_db_session()
-    added = 0 # Счетчик записей
-
     file_type = (await state.get_data()).get("file_type")
 
-    if file_type == "schedule":
-        from database.db import Schedule, get_or_create_group, Semester, Group
-        from datetime import datetime
-
-        semester_dates = {}
-        for row in sheet.iter_rows(min_row=2, values_only=True): # Первый проход начиня со второй стр
-            sem_group = str(row[8]).strip() if row[8] else None # Семестр из 9 колонки
-            start_date = row[9] # 10 колонка 
-            end_date = row[10] # 11
-            if sem_group and isinstance(start_date, datetime) and isinstance(end_date, datetime):
-                semester_dates[sem_group] = (start_date.date(), end_date.date())
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if not all(row[:7]):
-                continue
-
-            print(f"Импортируем строку: {row}")
-
-            group_name = str(row[0]).strip()
-            day = str(row[1]).strip()
-            time = str(row[2]).strip()
-            subject = str(row[3]).strip()
-            teacher = str(row[4]).strip()
-            room = str(row[5]).strip()
-            week = int(str(row[6]).strip()) if str(row[6]).strip() in ['1', '2'] else 1
-
-            group = get_or_create_group(session, group_name)
-
-            if group_name in semester_dates:
-                start_date, end_date = semester_dates[group_name]
-
-                existing_semester = (
-                    session.query(Semester)
-                    .join(Semester.groups)
-                    .filter(Group.id == group.id)
-                    .first()
-                )
-                if not existing_semester:
-                    semester = Semester(
-                        number=1,
-                        date_start=start_date,
-                        date_end=end_date,
-                        group_name=group_name,
-                        groups=[group]
-                    )
-                    session.add(semester)
-
-            new_schedule = Schedule(
-                group_id=group.id,
-                day_of_week=day.upper(),
-                time=time,
-                subject=subject,
-                teacher=teacher,
-                room=room,
-                week_number=week
-            )
-            session.add(new_schedule)
-            added += 1
-
-        await message.answer(f"✅ Импорт расписания завершён. Добавлено {added} записей.")
-
-    session.commit()
-    session.close()
+    if file_type in ("schedule", "students"):
+        # Импорт идёт в отдельном процессе; итог придёт сообщением, когда задача завершится
+        job = await import_jobs.submit(
+            message.bot, file_type, file_path, document.file_name, message.from_user.id, message.chat.id
+        )
+        await message.answer(
+            f"📥 Файл принят, задача импорта #{job.id} поставлена в очередь.\n"
+            "Ход выполнения — в меню «⚙ Задачи импорта»."
+        )
+
     await state.clear()
 
 
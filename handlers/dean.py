@@ -1,20 +1,39 @@
 # handlers/dean.py
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.fsm.context import FSMContext
-from database.db import get_db_session, Event, Application, EventParticipant, User, create_event
-
-DEAN_SENT_MSGS: dict[int, list[int]] = {}
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from database.db import async_session, Event, Application, EventParticipant, User, Group, Broadcast, create_event_async, enqueue_notification_stmt, set_event_capacity_async
+from filters import RoleFilter
+from utils.pagination import ListView, PageCallback, ItemCallback, render_page, back_button
+from utils.broadcast import broadcasts, BROADCAST_STATUS_NAMES
+from utils import outbox
+from utils.events_cache import events_cache
+from utils.export import ExportRequest, EXPORT_HELP, MAX_DOCUMENT_SIZE, parse_export_request, export_file
 
 router = Router()
+# Все хендлеры деканата доступны только деканату и администраторам
+router.message.filter(RoleFilter("dean", "admin"))
+router.callback_query.filter(RoleFilter("dean", "admin"))
 
 # Сценарий добавления мероприятия
 class EventCreation(StatesGroup):
     title = State()
     description = State()
     requirements = State()
+    capacity = State()
+
+# Изменение лимита мест мероприятия
+class EventCapacity(StatesGroup):
+    value = State()
+
+# Объявление о мероприятии выбранным группам
+class AnnounceGroups(StatesGroup):
+    names = State()
 
 def get_status_buttons(app_id: int):
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -33,51 +52,145 @@ async def show_dean_menu(message: Message):
     builder.button(text="📥 Заявки студентов", callback_data="view_requests")
     builder.button(text="📣 Добавить мероприятие", callback_data="add_event")
     builder.button(text="🎉 Мероприятия", callback_data="admin_events")
+    builder.button(text="📢 Рассылки", callback_data="view_broadcasts")
+    builder.button(text="📤 Выгрузка (Excel/CSV)", callback_data="export_help")
     builder.adjust(1)
     await message.answer("📋 Главное меню (Деканат)", reply_markup=builder.as_markup())
 
+# Списки деканата: заявки (сначала новые), мероприятия и участники мероприятия
+def render_application(app: Application) -> str:
+    user = app.user
+    # Студент мог удалить аккаунт — заявка остаётся без пользователя
+    author = (
+        f"👤 <b>{user.full_name}</b> — <a href='tg://user?id={user.telegram_id}'>[написать]</a>"
+        if user else "👤 <i>удалённый пользователь</i>"
+    )
+    return (
+        f"{author}\n"
+        f"📄 Заявка: {app.content}\n"
+        f"📅 Дата: {app.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"📊 Статус: {app.status}"
+    )
+
+def render_event(event: Event) -> str:
+    status = "🟢 Активно" if event.is_active else "⚪ Завершено"
+    return (
+        f"🎉 <b>{event.title}</b>\n"
+        f"📝 <b>Описание:</b> {event.description}\n"
+        f"📎 <b>Требования:</b> {event.requirements}\n"
+        f"📅 <b>Создано:</b> {event.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"👥 <b>Записались:</b> {event.participants_count}"
+        f"{f' из {event.capacity}' if event.capacity is not None else ' (без лимита)'}\n"
+        f"{status}"
+    )
+
+def parse_capacity(value: str) -> int | None:
+    # «-» — без ограничения; иначе положительное число, ValueError — если не число
+    value = value.strip()
+    if value == "-":
+        return None
+    capacity = int(value)
+    if capacity <= 0:
+        raise ValueError(value)
+    return capacity
+
+async def participants_header(session, event_id: int) -> str:
+    title = await session.scalar(select(Event.title).filter_by(id=event_id))
+    return f"👥 Участники мероприятия: <b>{title}</b>"
+
+APPLICATIONS_VIEW = ListView(
+    name="applications",
+    key=Application.id,
+    query=lambda arg: select(Application),
+    options=(selectinload(Application.user),),
+    descending=True,
+    header="📥 <b>Заявки студентов</b>",
+    empty_text="❌ Нет заявок.",
+    render_item=lambda app: (
+        f"<b>#{app.id}</b> · 📊 {app.status}\n"
+        f"👤 {app.user.full_name if app.user else '—'} · 📅 {app.created_at.strftime('%Y-%m-%d %H:%M')}"
+    ),
+    item_button=lambda app: f"📄 #{app.id} {app.user.full_name if app.user else ''}"[:60],
+)
+
+EVENTS_VIEW = ListView(
+    name="events",
+    key=Event.id,
+    query=lambda arg: select(Event),
+    descending=True,
+    header="🎉 <b>Мероприятия</b>",
+    empty_text="❌ Мероприятий нет.",
+    render_item=lambda event: (
+        f"{'🟢' if event.is_active else '⚪'} <b>{event.title}</b>\n"
+        f"📅 {event.created_at.strftime('%Y-%m-%d %H:%M')}"
+    ),
+    item_button=lambda event: f"🎉 {event.title}"[:60],
+)
+
+PARTICIPANTS_VIEW = ListView(
+    name="participants",
+    key=EventParticipant.id,
+    query=lambda event_id: select(EventParticipant).filter_by(event_id=event_id),
+    options=(selectinload(EventParticipant.user).selectinload(User.group),),
+    header=participants_header,
+    empty_text="❌ Пока никто не записался.",
+    render_item=lambda p: (
+        f"{'🕓 ' if p.status == 'waitlist' else ''}"
+        f"👤 <b>{p.user.full_name}</b> — <a href='tg://user?id={p.user.telegram_id}'>[написать]</a>\n"
+        f"🏫 Группа: {p.user.group.name if p.user.group else '—'} · "
+        f"📅 Записан: {p.registered_at.strftime('%Y-%m-%d %H:%M')}"
+    ),
+)
+
+BROADCASTS_VIEW = ListView(
+    name="broadcasts",
+    key=Broadcast.id,
+    query=lambda arg: select(Broadcast),
+    descending=True,
+    header="📢 <b>Рассылки</b>",
+    empty_text="❌ Рассылок ещё не было.",
+    render_item=lambda b: (
+        f"<b>#{b.id}</b> · {b.target} · {BROADCAST_STATUS_NAMES.get(b.status, b.status)}\n"
+        f"✉ {b.sent} из {b.total} · 🚫 {b.blocked} · ⚠ {b.failed} · 📅 {b.created_at.strftime('%Y-%m-%d %H:%M')}"
+    ),
+)
+
+DEAN_VIEWS = {view.name: view for view in (APPLICATIONS_VIEW, EVENTS_VIEW, PARTICIPANTS_VIEW, BROADCASTS_VIEW)}
+
+# Перелистывание страниц — одно сообщение редактируется на месте
+@router.callback_query(PageCallback.filter(F.view.in_(DEAN_VIEWS.keys())))
+async def show_page(callback: CallbackQuery, callback_data: PageCallback):
+    async with async_session() as session:
+        text, markup = await render_page(session, DEAN_VIEWS[callback_data.view], callback_data)
+    await callback.message.edit_text(text, reply_markup=markup)
+    await callback.answer()
+
 @router.callback_query(F.data == "view_requests")
 async def view_requests(callback: CallbackQuery):
-    chat_id = callback.message.chat.id
-    dean_id = callback.from_user.id
-
-    old_ids = DEAN_SENT_MSGS.get(dean_id, [])
-    for mid in old_ids:
-        try:
-            await callback.bot.delete_message(chat_id=chat_id, message_id=mid)
-        except Exception:
-            pass
-    DEAN_SENT_MSGS[dean_id] = []
-
-    session = get_db_session()
-    apps = session.query(Application).all()
-
-    if not apps:
-        await callback.message.edit_text("❌ Нет заявок.")
-        await show_dean_menu(callback.message)
-        session.close()
-        return
+    async with async_session() as session:
+        text, markup = await render_page(session, APPLICATIONS_VIEW, PageCallback(view=APPLICATIONS_VIEW.name))
+    await callback.message.edit_text(text, reply_markup=markup)
+    await show_dean_menu(callback.message)
 
-    for app in apps:
-        user = app.user
-        msg = await callback.message.answer(
-            text=(
-                f"👤 <b>{user.full_name}</b> — "
-                f"<a href='tg://user?id={user.telegram_id}'>[написать]</a>\n"
-                f"📄 Заявка: {app.content}\n"
-                f"📅 Дата: {app.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"📊 Статус: {app.status}"
-            ),
-            reply_markup=get_status_buttons(app.id)
+# Карточка заявки с кнопками смены статуса
+@router.callback_query(ItemCallback.filter(F.view == APPLICATIONS_VIEW.name))
+async def show_application(callback: CallbackQuery, callback_data: ItemCallback):
+    async with async_session() as session:
+        app = await session.scalar(
+            select(Application).options(selectinload(Application.user)).filter_by(id=callback_data.id)
         )
-        DEAN_SENT_MSGS[dean_id].append(msg.message_id)
+    if not app:
+        await callback.answer("❌ Заявка не найдена")
+        return
 
-    await show_dean_menu(callback.message)
-    session.close()
+    markup = get_status_buttons(app.id)
+    markup.inline_keyboard.append([back_button(callback_data)])
+    await callback.message.edit_text(render_application(app), reply_markup=markup)
+    await callback.answer()
 
 @router.callback_query(F.data.startswith("status_"))
 async def change_status(callback: CallbackQuery):
-    session = get_db_session()
+    session = async_session()
     try:
         _, action, app_id = callback.data.split("_")
         app_id = int(app_id)
@@ -92,100 +205,98 @@ async def change_status(callback: CallbackQuery):
             await callback.answer("❌ Неизвестный статус")
             return
 
-        app = session.query(Application).filter_by(id=app_id).first()
+        app = await session.scalar(
+            select(Application).options(selectinload(Application.user)).filter_by(id=app_id)
+        )
         if not app:
             await callback.answer("❌ Заявка не найдена")
             return
 
+        changed = app.status != new_status
         app.status = new_status
-        session.commit()
-        await callback.answer(f"✅ Статус изменён на «{new_status}»")
-
-        await callback.bot.send_message(
-            chat_id=app.user.telegram_id,
-            text=(
+        # Студент мог удалить аккаунт — тогда статус меняется без уведомления
+        notify = changed and app.user is not None
+        if notify:
+            # Уведомление студенту пишется в той же транзакции, а отправляется в фоне
+            await session.execute(enqueue_notification_stmt(
+                app.user.telegram_id,
                 f"📢 Ваша заявка обновлена!\n\n"
                 f"{app.content}\n\n"
-                f"📊 Новый статус: <b>{new_status}</b>"
-            )
-        )
+                f"📊 Новый статус: <b>{new_status}</b>",
+                dedup_key=f"application:{app.id}",
+            ))
+        await session.commit()
+        if notify:
+            outbox.wake()
+        await callback.answer(f"✅ Статус изменён на «{new_status}»")
+        if changed:
+            # Обновляем карточку заявки, кнопки оставляем прежними
+            await callback.message.edit_text(render_application(app), reply_markup=callback.message.reply_markup)
     except Exception as e:
         print("Ошибка при изменении статуса:", e)
         await callback.answer("❌ Ошибка изменения статуса")
     finally:
-        session.close()
+        await session.close()
 
 @router.callback_query(F.data == "admin_events")
 async def admin_events(callback: CallbackQuery):
-    session = get_db_session()
-    events = session.query(Event).order_by(Event.created_at.desc()).all()
+    async with async_session() as session:
+        text, markup = await render_page(session, EVENTS_VIEW, PageCallback(view=EVENTS_VIEW.name))
+    await callback.message.edit_text(text, reply_markup=markup)
+    await show_dean_menu(callback.message)
 
-    if not events:
-        await callback.message.edit_text("❌ Мероприятий нет.")
-        await show_dean_menu(callback.message)
-        session.close()
+# Карточка мероприятия: участники и удаление
+@router.callback_query(ItemCallback.filter(F.view == EVENTS_VIEW.name))
+async def show_event(callback: CallbackQuery, callback_data: ItemCallback):
+    async with async_session() as session:
+        event = await session.scalar(select(Event).filter_by(id=callback_data.id))
+    if not event:
+        await callback.answer("❌ Мероприятие не найдено.")
         return
 
-    await callback.message.delete()
-
-    for event in events:
-        status = "🟢 Активно" if event.is_active else "⚪ Завершено"
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📋 Участники", callback_data=f"event_participants_{event.id}")
-        if event.is_active:
-            builder.button(text="🗑 Удалить", callback_data=f"delete_event_{event.id}")
-
-        await callback.message.answer(
-            text=(
-                f"🎉 <b>{event.title}</b>\n"
-                f"📝 <b>Описание:</b> {event.description}\n"
-                f"📎 <b>Требования:</b> {event.requirements}\n"
-                f"📅 <b>Создано:</b> {event.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"{status}"
-            ),
-            reply_markup=builder.as_markup()
-        )
-
-    await show_dean_menu(callback.message)
-    session.close()
+    builder = InlineKeyboardBuilder()
+    builder.button(text="📋 Участники", callback_data=f"event_participants_{event.id}")
+    builder.button(text="📥 Участники в Excel", callback_data=f"export_event_{event.id}")
+    if event.is_active:
+        builder.button(text="👥 Лимит мест", callback_data=f"event_capacity_{event.id}")
+        builder.button(text="📢 Объявить", callback_data=f"announce_event_{event.id}")
+        builder.button(text="🗑 Удалить", callback_data=f"delete_event_{event.id}")
+    builder.adjust(1)
+    builder.row(back_button(callback_data))
+    await callback.message.edit_text(render_event(event), reply_markup=builder.as_markup())
+    await callback.answer()
 
 @router.callback_query(F.data.startswith("delete_event_"))
 async def delete_event(callback: CallbackQuery):
     event_id = int(callback.data.split("_")[-1])
-    session = get_db_session()
+    async with async_session() as session:
+        event = await session.scalar(select(Event).filter_by(id=event_id))
+        if event:
+            event.is_active = 0
+            await session.commit()
+            events_cache.invalidate()
 
-    event = session.query(Event).filter_by(id=event_id).first()
     if not event:
         await callback.answer("❌ Мероприятие не найдено.")
     else:
-        event.is_active = 0
-        session.commit()
         await callback.answer("✅ Мероприятие завершено (удалено).")
         await callback.message.edit_reply_markup(reply_markup=None)
-    session.close()
 
 @router.callback_query(F.data.startswith("event_participants_"))
 async def show_event_participants(callback: CallbackQuery):
     event_id = int(callback.data.split("_")[-1])
-    session = get_db_session()
-    event = session.query(Event).filter_by(id=event_id).first()
-    participants = session.query(EventParticipant).filter_by(event_id=event_id).all()
-
-    if not participants:
-        await callback.answer("❌ Пока никто не записался.")
-        session.close()
-        return
-
-    await callback.message.answer(f"👥 Участники мероприятия: <b>{event.title}</b>")
-    for p in participants:
-        user = p.user
-        await callback.message.answer(
-            f"👤 <b>{user.full_name}</b>\n"
-            f"🏫 Группа: {user.group.name if user.group else '—'}\n"
-            f"📅 Записан: {p.registered_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
-            f"<a href='tg://user?id={user.telegram_id}'>[написать]</a>"
+    async with async_session() as session:
+        has_participants = await session.scalar(
+            select(EventParticipant.id).filter_by(event_id=event_id).limit(1)
         )
-    session.close()
+        if not has_participants:
+            await callback.answer("❌ Пока никто не записался.")
+            return
+        text, markup = await render_page(
+            session, PARTICIPANTS_VIEW, PageCallback(view=PARTICIPANTS_VIEW.name, arg=event_id)
+        )
+    await callback.message.answer(text, reply_markup=markup)
+    await callback.answer()
 
 @router.callback_query(F.data == "add_event")
 async def start_event_creation(callback: CallbackQuery, state: FSMContext):
@@ -206,16 +317,191 @@ async def get_event_description(message: Message, state: FSMContext):
 
 @router.message(EventCreation.requirements)
 async def get_event_requirements(message: Message, state: FSMContext):
-    data = await state.get_data()
-    title = data.get("title")
-    description = data.get("description")
-    requirements = message.text if message.text.strip() != "-" else "—"
+    await state.update_data(requirements=message.text if message.text.strip() != "-" else "—")
+    await message.answer("👥 Введите <b>число мест</b> или '-' без ограничения:")
+    await state.set_state(EventCreation.capacity)
+
+@router.message(EventCreation.capacity)
+async def get_event_capacity(message: Message, state: FSMContext):
+    try:
+        capacity = parse_capacity(message.text or "")
+    except ValueError:
+        await message.answer("❌ Введите положительное число или '-':")
+        return
 
-    result = create_event(title, description, requirements)
+    data = await state.get_data()
+    result = await create_event_async(data.get("title"), data.get("description"), data.get("requirements"), capacity)
     if result:
-        await message.answer("✅ Мероприятие успешно создано и доступно студентам.")
+        events_cache.invalidate()
+        await message.answer(
+            "✅ Мероприятие успешно создано и доступно студентам.\nОбъявить о нём?",
+            reply_markup=announce_buttons(result.id),
+        )
     else:
         await message.answer("❌ Ошибка при создании мероприятия.")
 
     await state.clear()
     await show_dean_menu(message)
+
+@router.callback_query(F.data.startswith("event_capacity_"))
+async def ask_event_capacity(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(EventCapacity.value)
+    await state.update_data(event_id=int(callback.data.split("_")[-1]))
+    await callback.message.answer("👥 Введите новое <b>число мест</b> или '-' без ограничения:")
+    await callback.answer()
+
+# Увеличение лимита сразу переводит первых из листа ожидания на свободные места
+@router.message(EventCapacity.value)
+async def set_event_capacity(message: Message, state: FSMContext):
+    try:
+        capacity = parse_capacity(message.text or "")
+    except ValueError:
+        await message.answer("❌ Введите положительное число или '-':")
+        return
+
+    event_id = (await state.get_data()).get("event_id")
+    await state.clear()
+    promoted = await set_event_capacity_async(event_id, capacity)
+    if promoted is None:
+        await message.answer("❌ Мероприятие не найдено.")
+        return
+    events_cache.invalidate()  # лимит мест показывается в карусели студентов
+    if promoted:
+        outbox.wake()
+
+    text = f"✅ Лимит мест: {capacity if capacity is not None else 'без ограничения'}."
+    if promoted:
+        text += f"\n🎉 Из листа ожидания записано: {promoted}."
+    await message.answer(text)
+
+
+# Объявление о мероприятии: рассылка всем студентам или выбранным группам
+
+def announce_buttons(event_id: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📢 Всем студентам", callback_data=f"announce_all_{event_id}")],
+        [InlineKeyboardButton(text="🎯 Выбранным группам", callback_data=f"announce_groups_{event_id}")],
+    ])
+
+def render_announcement(event: Event) -> str:
+    return (
+        f"📣 <b>Новое мероприятие!</b>\n\n"
+        f"🎉 <b>{event.title}</b>\n"
+        f"📝 <b>Описание:</b> {event.description}\n"
+        f"📎 <b>Требования:</b> {event.requirements}"
+    )
+
+async def start_announcement(bot, chat_id: int, user_id: int, event_id: int, group_ids=None, target="Все студенты"):
+    async with async_session() as session:
+        event = await session.scalar(select(Event).filter_by(id=event_id, is_active=1))
+    if not event:
+        return None
+    return await broadcasts.start(
+        bot, render_announcement(event), target, created_by=user_id, chat_id=chat_id,
+        event_id=event.id, group_ids=group_ids,
+    )
+
+@router.callback_query(F.data.startswith("announce_event_"))
+async def choose_announcement(callback: CallbackQuery):
+    event_id = int(callback.data.split("_")[-1])
+    await callback.message.answer("📢 Кому отправить объявление?", reply_markup=announce_buttons(event_id))
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("announce_all_"))
+async def announce_all(callback: CallbackQuery):
+    event_id = int(callback.data.split("_")[-1])
+    broadcast = await start_announcement(callback.bot, callback.message.chat.id, callback.from_user.id, event_id)
+    if not broadcast:
+        await callback.answer("❌ Мероприятие не найдено.")
+        return
+    await callback.answer(f"✅ Рассылка #{broadcast.id} запущена: {broadcast.total} получателей.")
+    await callback.message.edit_reply_markup(reply_markup=None)
+
+@router.callback_query(F.data.startswith("announce_groups_"))
+async def announce_groups(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(AnnounceGroups.names)
+    await state.update_data(event_id=int(callback.data.split("_")[-1]))
+    await callback.message.answer("🎯 Введите названия групп через запятую:")
+    await callback.answer()
+
+@router.message(AnnounceGroups.names)
+async def get_announce_groups(message: Message, state: FSMContext):
+    names = {name.strip().upper() for name in message.text.split(",") if name.strip()}
+    # Сравниваем в Python: upper() в SQLite не работает с кириллицей, а групп немного
+    async with async_session() as session:
+        groups = [
+            (group_id, name) for group_id, name in await session.execute(select(Group.id, Group.name))
+            if name.upper() in names
+        ]
+
+    if not groups:
+        await message.answer("❌ Группы не найдены. Введите названия ещё раз:")
+        return
+
+    found = {name.upper() for _, name in groups}
+    missing = names - found
+    event_id = (await state.get_data()).get("event_id")
+    await state.clear()
+
+    target = "Группы: " + ", ".join(sorted(name for _, name in groups))
+    broadcast = await start_announcement(
+        message.bot, message.chat.id, message.from_user.id, event_id,
+        group_ids=[group_id for group_id, _ in groups], target=target[:200],
+    )
+    if not broadcast:
+        await message.answer("❌ Мероприятие не найдено.")
+        return
+
+    text = f"✅ Рассылка #{broadcast.id} запущена: {broadcast.total} получателей."
+    if missing:
+        text += f"\n⚠ Не найдены группы: {', '.join(sorted(missing))}"
+    await message.answer(text)
+
+@router.callback_query(F.data == "view_broadcasts")
+async def view_broadcasts(callback: CallbackQuery):
+    async with async_session() as session:
+        text, markup = await render_page(session, BROADCASTS_VIEW, PageCallback(view=BROADCASTS_VIEW.name))
+    await callback.message.answer(text, reply_markup=markup)
+    await callback.answer()
+
+
+# Выгрузка заявок, пользователей и участников мероприятия одним файлом
+async def send_export(message: Message, request: ExportRequest):
+    progress = await message.answer("⏳ Готовлю файл, большие выгрузки занимают до минуты…")
+    try:
+        result = await export_file(request)
+    finally:
+        await progress.delete()
+    if result is None:
+        await message.answer("❌ Мероприятие не найдено.")
+        return
+
+    file_name, data, rows = result
+    if not rows:
+        await message.answer("❌ По этим фильтрам ничего не найдено.")
+    elif len(data) > MAX_DOCUMENT_SIZE:
+        await message.answer("❌ Файл больше 50 МБ — сузьте период или выберите группы.")
+    else:
+        await message.answer_document(BufferedInputFile(data, file_name), caption=f"📤 Выгрузка: {rows} строк")
+
+@router.message(Command("export"))
+async def export_cmd(message: Message, command: CommandObject, role: str | None):
+    try:
+        request = parse_export_request(command.args or "")
+    except ValueError as e:
+        await message.answer(f"❌ {e}\n\n{EXPORT_HELP}")
+        return
+    if request.kind == "users" and role != "admin":
+        await message.answer("❌ Выгрузка пользователей доступна только администратору.")
+        return
+    await send_export(message, request)
+
+@router.callback_query(F.data == "export_help")
+async def export_help(callback: CallbackQuery):
+    await callback.message.answer(EXPORT_HELP)
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("export_event_"))
+async def export_event(callback: CallbackQuery):
+    await callback.answer()
+    await send_export(callback.message, ExportRequest(kind="event", event_id=int(callback.data.split("_")[-1])))
@@ -4,8 +4,14 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from database.db import get_db_session, register_user, User, get_today_schedule, get_two_weeks_schedule, Application, validate_allowed_user, AllowedUser, get_current_semester, get_or_create_group
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
+from database.db import async_session, register_user_async, User, Application, validate_allowed_user_async, get_current_week_number, get_today_day_name, release_user_events
 from handlers.dean import show_dean_menu
+from middlewares.user import CachedUser, invalidate_user
+from utils.schedule_cache import schedule_cache
+from utils.sender import bulk_sending
+from config import MORNING_PUSH_TIME
 
 router = Router()
 # Состояния подачи заявки. subject — для темы заявки; description — для описания.
@@ -15,7 +21,7 @@ class ApplicationForm(StatesGroup):
 
 # Команда /start — регистрация или приветствие
 @router.message(Command("start"))
-async def start_handler(message: Message):
+async def start_handler(message: Message, user: CachedUser | None, role: str | None):
     bot = message.bot  # получаем объект бота
 
     # Удаляем последние 20 сообщений (по возможности)
@@ -25,14 +31,11 @@ async def start_handler(message: Message):
         except:
             continue
 
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=message.from_user.id).first()
-
     if user:
         await message.answer(f"С возвращением, {user.full_name}!")
-        if user.role == "dean":
+        if role == "dean":
             await show_dean_menu(message)
-        elif user.role == "admin":
+        elif role == "admin":
             await show_dean_menu(message)
         else:
             await show_main_menu(message)
@@ -44,8 +47,6 @@ async def start_handler(message: Message):
             "<i>Иванов Иван Иванович 21-СПО-ИСиП-02</i>"
         )
 
-    session.close()
-
 # Проверка перед регистрацией
 @router.message(F.text.regexp(r'^[А-ЯЁа-яё-]+\s[А-ЯЁа-яё-]+\s[А-ЯЁа-яё-]+\s[\dА-ЯЁа-яё-]+$'))
 async def register_user_handler(message: Message):
@@ -58,34 +59,30 @@ async def register_user_handler(message: Message):
     group_name = " ".join(parts[3:])
 
     # Проверка в таблице allowed_users
-    if not validate_allowed_user(full_name, group_name):
+    if not await validate_allowed_user_async(full_name, group_name):
         await message.answer("❌ Регистрация отклонена. Ваши данные не найдены в списке студентов.")
         return
 
     # Регистрация, если данные прошли проверку
-    if register_user(message.from_user.id, full_name, group_name):
-        # Получаем только что зарегистрированного пользователя
-        session = get_db_session()
-        user = session.query(User).filter_by(telegram_id=message.from_user.id).first()
-
+    if await register_user_async(message.from_user.id, full_name, group_name):
+        invalidate_user(message.from_user.id)
         await message.answer(
             f"✅ Регистрация успешна!\n"
             f"ФИО: {full_name}\n"
             f"Группа: {group_name}"
         )
         await show_main_menu(message)
-
-        session.close()
     else:
         await message.answer("❌ Ошибка регистрации. Возможно, вы уже зарегистрированы.")
 
 
 # Главное меню для студента
-async def show_main_menu(message: Message):
+def main_menu_markup():
     builder = InlineKeyboardBuilder()
 
     builder.button(text="📅 Сегодня", callback_data="today_schedule")
     builder.button(text="📅 Расписание на 2 недели", callback_data="two_weeks_schedule")
+    builder.button(text="🔔 Расписание по утрам", callback_data="toggle_morning_push")
     builder.button(text="🎉 Мероприятия", callback_data="view_events")
     builder.button(text="✉ Заявка в деканат", callback_data="dean_application")
     builder.button(text="📥 Мои заявки", callback_data="my_requests")
@@ -93,8 +90,15 @@ async def show_main_menu(message: Message):
 
     # Расположение кнопок 
     builder.adjust(1)
+    return builder.as_markup()
+
+async def show_main_menu(message: Message):
+    await message.answer("📋 Главное меню", reply_markup=main_menu_markup())
 
-    await message.answer("📋 Главное меню", reply_markup=builder.as_markup())
+# Возврат в меню из карусели мероприятий — тем же сообщением
+@router.callback_query(F.data == "main_menu")
+async def back_to_main_menu(callback: CallbackQuery):
+    await callback.message.edit_text("📋 Главное меню", reply_markup=main_menu_markup())
 
 # Заявка в деканат студент
 @router.callback_query(F.data == "dean_application")
@@ -111,23 +115,18 @@ async def receive_subject(message: Message, state: FSMContext):
 
 # Получаем описание заявки и сохраняем в БД
 @router.message(ApplicationForm.description)
-async def receive_description(message: Message, state: FSMContext):
+async def receive_description(message: Message, state: FSMContext, user: CachedUser | None):
     data = await state.get_data()
     subject = data.get("subject")
     description = message.text if message.text.strip() != "-" else ""
 
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=message.from_user.id).first()
-
     if not user:
         await message.answer("❌ Вы не зарегистрированы. Пожалуйста, введите свои ФИО и группу.")
         await state.clear()
-        session.close()
         return  # ⛔ не продолжаем выполнение
 
-    from database.db import Application
     full_name = user.full_name
-    group = user.group.name if user.group else "Группа не указана"
+    group = user.group_name or "Группа не указана"
 
     content = (
         f"📩 <b>Новая заявка от студента</b>\n"
@@ -138,16 +137,16 @@ async def receive_description(message: Message, state: FSMContext):
     )
 
     # Создаём заявку в таблице Application
-    new_app = Application(
-        user_id=user.id,
-        content=content
-    )
-    session.add(new_app)
-    session.commit()
+    async with async_session() as session:
+        new_app = Application(
+            user_id=user.id,
+            content=content
+        )
+        session.add(new_app)
+        await session.commit()
     await message.answer("✅ Ваша заявка была отправлена в деканат.")
 
     await state.clear()
-    session.close()
 
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
@@ -165,111 +164,221 @@ def get_status_buttons(app_id: int):
     ])
 
 #Просмотр мероприятий студентом
-from database.db import get_db_session, Event, EventParticipant, register_for_event
-
-@router.callback_query(F.data == "view_events")
-async def view_events(callback: CallbackQuery):
-    session = get_db_session()
-    events = session.query(Event).filter_by(is_active=1).all()
-    user = session.query(User).filter_by(telegram_id=callback.from_user.id).first()
-
-    if not events:
-        await callback.message.edit_text("❌ Сейчас нет активных мероприятий.")
-        session.close()
-        return
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters.callback_data import CallbackData
+from database.db import register_for_event_async, cancel_event_registration_async
+from utils import outbox
+from utils.events_cache import events_cache
+from config import EVENTS_JUMP_BUTTONS
+
+STATUS_MARKS = {"registered": "✅", "waitlist": "🕓"}
+
+# Карусель мероприятий — одно сообщение, которое редактируется при переходах.
+# event_id=0 — первое мероприятие; action: view — показать, join — записаться, leave — отменить запись
+class EventsCarousel(CallbackData, prefix="evc"):
+    event_id: int = 0
+    action: str = "view"
+
+def seats_line(participants_count: int, capacity: int | None) -> str:
+    if capacity is None:
+        return f"👥 Записались: {participants_count}"
+    return f"👥 Мест: {participants_count} из {capacity}"
+
+def registration_notice(status: str | None, created: bool) -> tuple[str, bool]:
+    # (текст ответа на нажатие, показать ли окном)
+    if status is None:
+        return "❌ Мероприятие завершено.", True
+    if status == "registered":
+        return ("✅ Вы успешно записались!" if created else "Вы уже записаны на это мероприятие."), False
+    return (
+        "🕓 Мест нет — вы в листе ожидания. Напишем, если место освободится."
+        if created else "Вы уже в листе ожидания."
+    ), True
+
+def cancellation_notice(status: str | None) -> str:
+    if status is None:
+        return "Вы не были записаны на это мероприятие."
+    if status == "registered":
+        return "✅ Запись отменена."
+    return "✅ Вы вышли из листа ожидания."
+
+def event_buttons(event_id: int, status: str | None):
+    # Кнопка записи или отмены в зависимости от статуса студента (сообщения до карусели)
+    builder = InlineKeyboardBuilder()
+    if status == "registered":
+        builder.button(text="❌ Отменить запись", callback_data=f"cancel_event_{event_id}")
+    elif status == "waitlist":
+        builder.button(text="❌ Выйти из листа ожидания", callback_data=f"cancel_event_{event_id}")
+    else:
+        builder.button(text="📥 Записаться", callback_data=f"register_event_{event_id}")
+    return builder.as_markup()
+
+def render_events(views: list, event_id: int):
+    # Текст и клавиатура карусели: карточка текущего мероприятия, кнопка записи,
+    # номера соседних мероприятий (✅/🕓 — статус студента), ◀ ▶ и возврат в меню
+    index = next((i for i, view in enumerate(views) if view.event.id == event_id), 0)
+    current = views[index]
+    event = current.event
+
+    header = f"🎉 <b>Мероприятия</b> · {index + 1} из {len(views)}"
+    joined = sum(view.status == "registered" for view in views)
+    if joined:
+        header += f" · вы записаны: {joined}"
+    mark = {"registered": "\n✅ Вы записаны", "waitlist": "\n🕓 Вы в листе ожидания"}.get(current.status, "")
+    text = (
+        f"{header}\n\n"
+        f"<b>{event.title}</b>\n"
+        f"📝 <b>Описание:</b> {event.description or '—'}\n"
+        f"📎 <b>Требования:</b> {event.requirements or '—'}\n"
+        f"{seats_line(current.participants_count, event.capacity)}{mark}"
+    )
 
-    await callback.message.delete()  # очищаем меню
+    builder = InlineKeyboardBuilder()
+    if current.status == "registered":
+        action = InlineKeyboardButton(text="❌ Отменить запись", callback_data=EventsCarousel(event_id=event.id, action="leave").pack())
+    elif current.status == "waitlist":
+        action = InlineKeyboardButton(text="❌ Выйти из листа ожидания", callback_data=EventsCarousel(event_id=event.id, action="leave").pack())
+    else:
+        action = InlineKeyboardButton(text="📥 Записаться", callback_data=EventsCarousel(event_id=event.id, action="join").pack())
+    builder.row(action)
+
+    if len(views) > 1:
+        start = index - index % EVENTS_JUMP_BUTTONS
+        builder.row(*(
+            InlineKeyboardButton(
+                text=f"·{number}·" if view is current else f"{number}{STATUS_MARKS.get(view.status, '')}",
+                callback_data=EventsCarousel(event_id=view.event.id).pack(),
+            )
+            for number, view in enumerate(views[start:start + EVENTS_JUMP_BUTTONS], start=start + 1)
+        ), width=5)
+        builder.row(
+            InlineKeyboardButton(text="◀", callback_data=EventsCarousel(event_id=views[index - 1].event.id).pack()),
+            InlineKeyboardButton(text="▶", callback_data=EventsCarousel(event_id=views[(index + 1) % len(views)].event.id).pack()),
+        )
+    builder.row(InlineKeyboardButton(text="⬅ В меню", callback_data="main_menu"))
+    return text, builder.as_markup()
 
-    for event in events:
-        # Проверка: записан ли пользователь
-        already_registered = session.query(EventParticipant).filter_by(
-            user_id=user.id, event_id=event.id
-        ).first()
+# Мероприятия и статусы студента — один SQL-запрос, ответ — одно редактирование сообщения
+async def show_events(callback: CallbackQuery, user: CachedUser | None, card: EventsCarousel):
+    if not user:
+        await callback.answer("❌ Вы не зарегистрированы.", show_alert=True)
+        return
 
-        button_text = "✅ Вы уже записаны" if already_registered else "📥 Записаться"
-        button_state = "disabled" if already_registered else f"register_event_{event.id}"
+    notice = None
+    if card.action == "join":
+        # Проверка места, запись и счётчик — одна операция в БД
+        status, created = await register_for_event_async(user.id, card.event_id)
+        notice = registration_notice(status, created)
+    elif card.action == "leave":
+        status, promoted = await cancel_event_registration_async(user.id, card.event_id)
+        if promoted:
+            outbox.wake()
+        notice = (cancellation_notice(status), False)
+
+    async with async_session() as session:
+        views = await events_cache.for_user(session, user.id)
+
+    if views:
+        text, markup = render_events(views, card.event_id)
+    else:
+        text = "❌ Сейчас нет активных мероприятий."
+        markup = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="⬅ В меню", callback_data="main_menu")]])
+    try:
+        await callback.message.edit_text(text, reply_markup=markup)
+    except TelegramBadRequest:
+        pass  # нажали на текущее мероприятие — сообщение не изменилось
 
-        builder = InlineKeyboardBuilder()
-        if not already_registered:
-            builder.button(text=button_text, callback_data=button_state)
+    if notice:
+        await callback.answer(notice[0], show_alert=notice[1])
 
-        await callback.message.answer(
-            text=(
-                f"🎉 <b>{event.title}</b>\n"
-                f"📝 <b>Описание:</b> {event.description}\n"
-                f"📎 <b>Требования:</b> {event.requirements}"
-            ),
-            reply_markup=builder.as_markup() if not already_registered else None
-        )
+@router.callback_query(F.data == "view_events")
+async def view_events(callback: CallbackQuery, user: CachedUser | None):
+    await show_events(callback, user, EventsCarousel())
 
-    await show_main_menu(callback.message)
-    session.close()
+@router.callback_query(EventsCarousel.filter())
+async def events_carousel(callback: CallbackQuery, callback_data: EventsCarousel, user: CachedUser | None):
+    await show_events(callback, user, callback_data)
 
-#Записаться на мероприятие студенту
+#Записаться на мероприятие студенту (кнопки в сообщениях до карусели)
 @router.callback_query(F.data.startswith("register_event_"))
-async def register_event(callback: CallbackQuery):
-    event_id = int(callback.data.split("_")[-1])
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=callback.from_user.id).first()
-
-    # уже записан?
-    already = session.query(EventParticipant).filter_by(user_id=user.id, event_id=event_id).first()
-    if already:
-        await callback.answer("Вы уже записаны на это мероприятие.")
-        session.close()
+async def register_event(callback: CallbackQuery, user: CachedUser | None):
+    if not user:
+        await callback.answer("❌ Вы не зарегистрированы.", show_alert=True)
         return
+    event_id = int(callback.data.split("_")[-1])
 
-    # Пытаемся зарегистрировать
-    success = register_for_event(user.id, event_id) # INSERT в EventParticipant
-    if success:
-        await callback.answer("✅ Вы успешно записались!")
-        await callback.message.edit_reply_markup(reply_markup=None)
-    else:
-        await callback.answer("❌ Не удалось записаться.")
+    status, created = await register_for_event_async(user.id, event_id)
+    text, alert = registration_notice(status, created)
+    await callback.answer(text, show_alert=alert)
+    await callback.message.edit_reply_markup(reply_markup=event_buttons(event_id, status) if status else None)
 
-    session.close()
+# Отмена записи: место сразу получает первый из листа ожидания
+@router.callback_query(F.data.startswith("cancel_event_"))
+async def cancel_event(callback: CallbackQuery, user: CachedUser | None):
+    if not user:
+        await callback.answer("❌ Вы не зарегистрированы.", show_alert=True)
+        return
+    event_id = int(callback.data.split("_")[-1])
+
+    status, promoted = await cancel_event_registration_async(user.id, event_id)
+    if promoted:
+        outbox.wake()
+    await callback.answer(cancellation_notice(status))
+    await callback.message.edit_reply_markup(reply_markup=event_buttons(event_id, None))
 
 # Обработка кнопки "Сегодня"
 @router.callback_query(F.data == "today_schedule")
-async def today_schedule(callback: CallbackQuery):
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=callback.from_user.id).first()
-
+async def today_schedule(callback: CallbackQuery, user: CachedUser | None):
     if user:
-        # Получаем расписание на сегодня через связанную группу
-        schedule = get_today_schedule(user.group.name)  # Используем user.group.name
-        print("Тип schedule ДО форматирования:", type(schedule))
-        if schedule:
-            formatted = format_schedule(schedule)
-            print("Тип schedule ПОСЛЕ форматирования:", type(formatted))
+        # Готовый текст расписания на сегодня из кэша группы
+        formatted = await schedule_cache.get_day(
+            user.group_name, get_current_week_number(), get_today_day_name()
+        )
+        if formatted:
             await callback.message.edit_text(f"📅 <b>Расписание на сегодня:</b>\n{formatted}")  # возвращает форматированный текст
         else:
             await callback.message.edit_text("❌ На сегодня нет занятий.")
     await show_main_menu(callback.message)
-    session.close()
 
-@router.callback_query(F.data == "two_weeks_schedule")
-async def two_weeks_schedule(callback: CallbackQuery):
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=callback.from_user.id).first()
+# Подписка на утреннюю рассылку расписания (вкл/выкл)
+@router.callback_query(F.data == "toggle_morning_push")
+async def toggle_morning_push(callback: CallbackQuery, user: CachedUser | None):
+    if not user:
+        await callback.answer("❌ Вы не зарегистрированы.", show_alert=True)
+        return
 
+    async with async_session() as session:
+        enabled = await session.scalar(
+            update(User).filter_by(id=user.id)
+            .values(morning_push=1 - User.morning_push)
+            .returning(User.morning_push)
+        )
+        await session.commit()
+
+    if enabled:
+        await callback.answer(f"🔔 Расписание будет приходить каждое утро в {MORNING_PUSH_TIME}.", show_alert=True)
+    else:
+        await callback.answer("🔕 Утренняя рассылка расписания отключена.", show_alert=True)
+
+@router.callback_query(F.data == "two_weeks_schedule")
+async def two_weeks_schedule(callback: CallbackQuery, user: CachedUser | None):
     if user:
-        schedule = get_two_weeks_schedule(user.group.name)
+        group_schedule = await schedule_cache.get(user.group_name)
 
         # Получаем семестр для текущей группы
-        group = get_or_create_group(session, user.group.name)
-        semester = get_current_semester(session, group)
+        semester = group_schedule.current_semester()
 
         semester_info = ""
         if semester:
+            date_start, date_end = semester
             semester_info = (
                 f"📘 <b>Семестр:</b>\n"
-                f"Начало: <code>{semester.date_start.strftime('%d.%m.%Y')}</code>\n"
-                f"Окончание: <code>{semester.date_end.strftime('%d.%m.%Y')}</code>\n\n"
+                f"Начало: <code>{date_start.strftime('%d.%m.%Y')}</code>\n"
+                f"Окончание: <code>{date_end.strftime('%d.%m.%Y')}</code>\n\n"
             )
 
-        if schedule:
-            formatted = semester_info + format_schedule(schedule, two_weeks=True)
+        if group_schedule.two_weeks:
+            formatted = semester_info + group_schedule.two_weeks
             
             # Разбиваем длинное сообщение на части
             if len(formatted) > 4000:
@@ -282,94 +391,34 @@ async def two_weeks_schedule(callback: CallbackQuery):
             await callback.message.edit_text("❌ Расписание на две недели не найдено.")
 
     await show_main_menu(callback.message)
-    session.close()
 
 # Просмотр собственных заявок студентом
 @router.callback_query(F.data == "my_requests")
-async def my_requests(callback: CallbackQuery):
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=callback.from_user.id).first()
-
+async def my_requests(callback: CallbackQuery, user: CachedUser | None):
     if not user:
         await callback.message.edit_text("❌ Пользователь не найден.")
-        session.close()
         return
 
-    applications = session.query(Application).filter_by(user_id=user.id).all()
+    async with async_session() as session:
+        applications = (await session.scalars(select(Application).filter_by(user_id=user.id))).all()
 
     if not applications:
         await callback.message.edit_text("❌ У вас пока нет заявок.")
     else:
         # вывод зявок каждым сообщением
-        for app in applications:
-            await callback.message.answer(
-                text=(
-                    f"📄 Заявка: {app.content}\n"
-                    f"📅 Дата: {app.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                    f"📊 Статус: {app.status}"
+        with bulk_sending():
+            for app in applications:
+                await callback.message.answer(
+                    text=(
+                        f"📄 Заявка: {app.content}\n"
+                        f"📅 Дата: {app.created_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                        f"📊 Статус: {app.status}"
+                    )
                 )
-            )
 
     # Возвращаемся в меню
     await show_main_menu(callback.message)
-    session.close()
-
-
-# Функция для формирования расписания в текстовом формате
-def format_schedule(schedule, two_weeks=False):
-    if not schedule:
-        return "Расписание не найдено"
-    
-    formatted_schedule = ""
-    
-    if two_weeks:
-        # Определяем порядок дней недели
-        day_order = {
-            'MONDAY': 1,
-            'TUESDAY': 2,
-            'WEDNESDAY': 3,
-            'THURSDAY': 4,
-            'FRIDAY': 5,
-            'SATURDAY': 6,
-            'SUNDAY': 7
-        }
-        
-        day_names = {
-            'MONDAY': 'Понедельник',
-            'TUESDAY': 'Вторник',
-            'WEDNESDAY': 'Среда',
-            'THURSDAY': 'Четверг',
-            'FRIDAY': 'Пятница',
-            'SATURDAY': 'Суббота',
-            'SUNDAY': 'Воскресенье'
-        }
-
-        # Форматирование для двух недель
-        for week, days in schedule.items():
-            formatted_schedule += f"\n📌 <b>{week}:</b>\n"
-            
-            # Сортируем дни по порядку
-            sorted_days = sorted(days.items(), key=lambda x: x[1][0]['day_order'])
-            
-            for day, classes in sorted_days:
-                day_name = day_names.get(day, day)
-                formatted_schedule += f"\n<b>📅 {day_name}:</b>\n"
-                for class_info in classes:
-                    formatted_schedule += (
-                        f"🕒 {class_info['time']} - {class_info['subject']}\n"
-                        f"   🏫 {class_info['auditorium']} | 👨‍🏫 {class_info['teacher']}\n"
-                    )
-    else:
-        # Форматирование для одного дня 
-        for day, classes in schedule.items():
-            formatted_schedule += f"\n<b>📅 {day}:</b>\n"
-            for class_info in classes:
-                formatted_schedule += (
-                    f"🕒 {class_info['time']} - {class_info['subject']}\n"
-                    f"   🏫 {class_info['auditorium']} | 👨‍🏫 {class_info['teacher']}\n"
-                )
 
-    return formatted_schedule
 
 # Обработка кнопки "Удалить аккаунт"
 @router.callback_query(F.data == "delete_account")
@@ -388,18 +437,25 @@ async def cancel_delete(callback: CallbackQuery):
 # Подтверждение удаления — удаляем пользователя из базы
 @router.callback_query(F.data == "confirm_delete")
 async def delete_user(callback: CallbackQuery):
-    session = get_db_session()
-    user = session.query(User).filter_by(telegram_id=callback.from_user.id).first()
+    async with async_session() as session:
+        user = await session.scalar(
+            select(User).options(selectinload(User.applications)).filter_by(telegram_id=callback.from_user.id)
+        )
+
+        if user:
+            # Места пользователя на мероприятиях переходят к листу ожидания
+            promoted = await release_user_events(session, user.id)
+            await session.delete(user)
+            await session.commit()
+            invalidate_user(callback.from_user.id)
+            if promoted:
+                outbox.wake()
 
     if user:
-        session.delete(user)
-        session.commit()
         await callback.message.edit_text("✅ Ваш аккаунт был удалён.")
     else:
         await callback.message.edit_text("❌ Аккаунт не найден.")
 
-    session.close()
-
 # Функция для регистрации этого router в основном боте
 def register(dp):
     dp.include_router(router)
\ No newline at end of file
@@ -0,0 +1,11 @@
+from config import PROFILE_ENABLED
+from .metrics import MetricsMiddleware
+from .profiler import ProfilerMiddleware
+from .user import UserMiddleware
+
+def register_middlewares(dp):
+    dp.update.outer_middleware(MetricsMiddleware())
+    # Профилировщик подключается только по PROFILE_ENABLED, иначе накладных расходов нет
+    if PROFILE_ENABLED:
+        dp.update.outer_middleware(ProfilerMiddleware())
+    dp.update.outer_middleware(UserMiddleware())
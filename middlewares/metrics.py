@@ -0,0 +1,58 @@
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from utils.metrics import (
+    current_update, UpdateStats, handler_latency, handler_errors, update_db_queries, update_db_time,
+)
+
+# Числа в конце callback_data (id заявки, мероприятия) в ключ не входят
+_TRAILING_IDS = re.compile(r"(_-?\d+)+$")
+
+
+def handler_key(update: Update, data: Dict[str, Any]) -> str:
+    """Ключ для метрик: префикс callback_data, команда, состояние FSM или тип обновления."""
+    if update.callback_query:
+        callback_data = update.callback_query.data or ""
+        if ":" in callback_data:
+            # CallbackData-фабрика: "pg:applications:120:next:10:0" → "cb:pg:applications"
+            prefix, _, rest = callback_data.partition(":")
+            view = rest.split(":", 1)[0]
+            return f"cb:{prefix}:{view}" if view and not view.lstrip("-").isdigit() else f"cb:{prefix}"
+        return "cb:" + _TRAILING_IDS.sub("", callback_data)
+    if update.message:
+        message = update.message
+        if message.text and message.text.startswith("/"):
+            return "cmd:" + message.text.split()[0].split("@")[0]
+        if data.get("raw_state"):
+            return "state:" + data["raw_state"]
+        return "message:" + message.content_type
+    return "update:" + update.event_type
+
+
+# Время обработки и запросы к БД на каждое обновление.
+# Регистрируется первым, чтобы учитывать и загрузку пользователя в UserMiddleware
+class MetricsMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        key = handler_key(event, data)
+        stats = UpdateStats()
+        token = current_update.set(stats)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            handler_errors.inc(key)
+            raise
+        finally:
+            current_update.reset(token)
+            handler_latency.observe(time.perf_counter() - started, key)
+            update_db_queries.observe(stats.queries, key)
+            update_db_time.observe(stats.db_time, key)
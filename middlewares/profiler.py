@@ -0,0 +1,89 @@
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from config import PROFILE_SAMPLE_RATE, PROFILE_THRESHOLD, PROFILE_DIR, PROFILE_KEEP
+from middlewares.metrics import handler_key
+from utils.metrics import current_update
+
+logger = logging.getLogger(__name__)
+
+# Символы ключа хендлера, недопустимые в имени файла
+_UNSAFE = re.compile(r"[^\w-]")
+
+
+def _dump(profiler: cProfile.Profile, statements: list, name: str, header: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, name)
+    # .prof открывается snakeviz / pstats, .txt — для чтения глазами
+    profiler.dump_stats(base + ".prof")
+
+    report = io.StringIO()
+    report.write(header + "\n\n")
+    report.write(f"SQL: {len(statements)} запросов, {sum(s[0] for s in statements) * 1000:.1f} мс\n")
+    for elapsed, statement, parameters in statements:
+        report.write(f"\n-- {elapsed * 1000:.2f} мс\n{statement.strip()}\n-- {str(parameters)[:500]}\n")
+    report.write("\n\nПрофиль (по cumulative):\n")
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(60)
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(report.getvalue())
+
+    # Храним только PROFILE_KEEP последних дампов
+    dumps = sorted(entry for entry in os.listdir(PROFILE_DIR) if entry.endswith(".prof"))
+    for old in dumps[:-PROFILE_KEEP]:
+        for suffix in (".prof", ".txt"):
+            path = os.path.join(PROFILE_DIR, old[:-len(".prof")] + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# Профилирует долю PROFILE_SAMPLE_RATE обновлений и сохраняет профиль и SQL,
+# если обработка заняла дольше PROFILE_THRESHOLD. Подключается только при
+# PROFILE_ENABLED=1. cProfile видит весь поток, поэтому в профиль попадают и
+# задачи, выполнявшиеся параллельно; одновременно профилируется одно обновление.
+class ProfilerMiddleware(BaseMiddleware):
+    def __init__(self):
+        self._active = False
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        stats = current_update.get()
+        if self._active or stats is None or random.random() >= PROFILE_SAMPLE_RATE:
+            return await handler(event, data)
+
+        self._active = True
+        stats.statements = []
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            return await handler(event, data)
+        finally:
+            profiler.disable()
+            self._active = False
+            elapsed = time.perf_counter() - started
+            if elapsed >= PROFILE_THRESHOLD:
+                key = handler_key(event, data)
+                name = f"{datetime.now():%Y%m%d-%H%M%S}-{event.update_id}-{_UNSAFE.sub('_', key)}"
+                header = f"{key} · update {event.update_id} · {elapsed * 1000:.0f} мс"
+                logger.warning("Slow update %s, profile: %s", header, os.path.join(PROFILE_DIR, name))
+                loop = asyncio.get_running_loop()
+                try:
+                    await loop.run_in_executor(None, _dump, profiler, stats.statements, name, header)
+                except Exception:
+                    logger.exception("Profile dump failed")
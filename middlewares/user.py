@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from config import ADMIN_IDS, DEAN_IDS, USER_CACHE_SIZE, USER_CACHE_TTL
+from database.db import async_session, get_user_async
+from utils import cluster
+from utils.cache import TTLCache
+
+
+# Снимок пользователя для хендлеров — не привязан к сессии SQLAlchemy,
+# поэтому его можно безопасно хранить в кэше между апдейтами
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    telegram_id: int
+    full_name: str
+    group_id: Optional[int]
+    group_name: Optional[str]
+    role: str
+
+
+# telegram_id → CachedUser (или None для незарегистрированных)
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+_NOT_FOUND = object()
+
+# Увеличивается при каждой инвалидации: запрос, во время которого пользователя
+# сбросили (смена роли, удаление), мог прочитать строку до изменения
+_generation = 0
+
+
+async def resolve_user(telegram_id: int) -> Optional[CachedUser]:
+    cached = user_cache.get(telegram_id, _NOT_FOUND)
+    if cached is not _NOT_FOUND:
+        return cached
+
+    generation = _generation
+    async with async_session() as session:
+        user = await get_user_async(session, telegram_id)
+
+    result = None
+    if user:
+        result = CachedUser(
+            id=user.id,
+            telegram_id=user.telegram_id,
+            full_name=user.full_name,
+            group_id=user.group_id,
+            group_name=user.group.name if user.group else None,
+            role=user.role or "student",
+        )
+    # Кэшируем и отсутствие пользователя — сбрасывается при регистрации.
+    # Если во время запроса пришла инвалидация — результат уже мог устареть, не сохраняем
+    if generation == _generation:
+        user_cache.set(telegram_id, result)
+    return result
+
+
+def invalidate_user(telegram_id: int):
+    _drop(telegram_id)
+    cluster.publish("user", telegram_id)  # и в остальных процессах бота
+
+
+def _drop(telegram_id: int):
+    global _generation
+    _generation += 1
+    user_cache.invalidate(telegram_id)
+
+
+cluster.subscribe("user", _drop)
+
+
+# Итоговая роль: роль из БД, повышенная списками ADMIN_IDS / DEAN_IDS из .env
+def get_role(telegram_id: int, user: Optional[CachedUser]) -> Optional[str]:
+    if telegram_id in ADMIN_IDS:
+        return "admin"
+    role = user.role if user else None
+    if telegram_id in DEAN_IDS and role != "admin":
+        return "dean"
+    return role
+
+
+# Определяет пользователя один раз на апдейт и передаёт в хендлеры
+# аргументы user (CachedUser или None) и role
+class UserMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        if from_user is None:
+            data["user"] = None
+            data["role"] = None
+        else:
+            user = await resolve_user(from_user.id)
+            data["user"] = user
+            data["role"] = get_role(from_user.id, user)
+        return await handler(event, data)
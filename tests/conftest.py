@@ -0,0 +1,59 @@
+"""Тесты работают с временной SQLite-базой, схема — из миграций."""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# До импорта config: своя база и без сети
+_tmp = tempfile.mkdtemp(prefix="bot-tests-")
+os.environ["DB_PATH"] = os.path.join(_tmp, "bot.db")
+os.environ["BOT_TOKEN"] = "42:TEST"
+os.environ.setdefault("ADMIN_IDS", "1")
+os.environ.setdefault("DEAN_IDS", "2")
+os.environ["METRICS_PORT"] = "0"
+os.environ["PROFILE_ENABLED"] = "0"
+
+
+def _remove(path):
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+@pytest.fixture
+def db():
+    """Пустая база бота с актуальной схемой; возвращает синхронный движок."""
+    from config import DB_PATH
+    from database.db import engine
+    from database.migrate import migration_engine, upgrade
+
+    engine.dispose()
+    _remove(DB_PATH)
+    migrations = migration_engine(f"sqlite:///{DB_PATH}")
+    upgrade(migrations, log=lambda *_: None)
+    migrations.dispose()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def run():
+    """Выполняет корутину в новом цикле событий и закрывает соединения aiosqlite."""
+    from database.db import async_engine
+
+    def _run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+
+    return _run
+
+
+@pytest.fixture
+def tmp_db(tmp_path):
+    """URL отдельной пустой базы — для тестов самих миграций."""
+    return f"sqlite:///{tmp_path / 'scratch.db'}"
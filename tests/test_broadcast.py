@@ -0,0 +1,58 @@
+import asyncio
+
+from sqlalchemy import insert, select
+
+from database.db import Broadcast, BroadcastRecipient, User
+from utils.broadcast import broadcasts
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        if chat_id != 2:  # сообщение о ходе рассылки декану
+            self.sent.append(chat_id)
+        return self
+
+    async def edit_text(self, text):
+        pass
+
+
+async def wait_all():
+    while broadcasts._tasks:
+        await asyncio.sleep(0.01)
+
+
+def test_chunk_interrupted_by_restart_is_reconciled(db, run):
+    with db.begin() as conn:
+        conn.execute(insert(User), [
+            {"telegram_id": 500 + i, "full_name": f"Студент {i}", "role": "student"} for i in range(10)
+        ])
+        conn.execute(insert(Broadcast).values(
+            id=1, text="Квиз в пятницу", target="Все студенты", status="running",
+            total=10, sent=3, blocked=0, failed=0, cursor=6, chat_id=2,
+        ))
+        # 1–3 доставлены, 4–6 — пачка, на которой бот остановился
+        conn.execute(insert(BroadcastRecipient), [
+            {"id": i, "broadcast_id": 1, "user_id": i, "telegram_id": 499 + i,
+             "status": "sent" if i <= 3 else "pending"}
+            for i in range(1, 11)
+        ])
+
+    bot = FakeBot()
+
+    async def resume():
+        await broadcasts.resume(bot)
+        await wait_all()
+
+    run(resume())
+
+    assert bot.sent == [506, 507, 508, 509]  # прерванной пачке повторно не шлём
+    with db.connect() as conn:
+        b = conn.execute(select(Broadcast.status, Broadcast.sent, Broadcast.blocked, Broadcast.failed, Broadcast.total)).one()
+        pending = conn.scalar(select(BroadcastRecipient.id).filter_by(status="pending").limit(1))
+    assert b.status == "done"
+    assert (b.sent, b.failed) == (7, 3)
+    assert b.sent + b.blocked + b.failed == b.total
+    assert pending is None
@@ -0,0 +1,72 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from handlers.dean import render_application
+
+
+def application(user):
+    return SimpleNamespace(id=1, user=user, content="Справка с места учёбы", status="Новая",
+                           created_at=datetime(2024, 9, 2, 10, 30))
+
+
+def test_render_application_links_author():
+    user = SimpleNamespace(full_name="Иванов Иван Иванович", telegram_id=500)
+    text = render_application(application(user))
+    assert "Иванов Иван Иванович" in text and "tg://user?id=500" in text
+
+
+def test_render_application_without_author():
+    # Студент удалил аккаунт — user_id заявки обнулён
+    text = render_application(application(None))
+    assert "удалённый пользователь" in text and "tg://user" not in text
+
+
+class FakeMessage:
+    reply_markup = None
+
+    def __init__(self):
+        self.texts = []
+
+    async def edit_text(self, text, reply_markup=None):
+        self.texts.append(text)
+
+
+class FakeCallback:
+    def __init__(self, data):
+        self.data = data
+        self.message = FakeMessage()
+        self.answers = []
+
+    async def answer(self, text=None, show_alert=False):
+        self.answers.append(text)
+
+
+def test_change_status_of_orphaned_application(db, run, monkeypatch):
+    from sqlalchemy import insert, select
+    from database.db import Application, OutboxMessage, User
+    from handlers import dean
+
+    wakes = []
+    monkeypatch.setattr(dean.outbox, "wake", lambda: wakes.append(True))
+    with db.begin() as conn:
+        conn.execute(insert(User).values(id=1, telegram_id=500, full_name="Иванов Иван Иванович"))
+        conn.execute(insert(Application), [
+            {"id": 1, "user_id": None, "content": "Справка", "status": "Новая"},
+            {"id": 2, "user_id": 1, "content": "Справка", "status": "Новая"},
+        ])
+
+    orphan = FakeCallback("status_accept_1")
+    run(dean.change_status(orphan))
+    assert orphan.answers == ["✅ Статус изменён на «Принята»"]
+    assert "удалённый пользователь" in orphan.message.texts[0]
+    assert wakes == []
+
+    student = FakeCallback("status_accept_2")
+    run(dean.change_status(student))
+    assert wakes == [True]
+
+    with db.connect() as conn:
+        assert conn.execute(select(Application.id, Application.status).order_by(Application.id)).all() == [
+            (1, "Принята"), (2, "Принята"),
+        ]
+        assert conn.execute(select(OutboxMessage.chat_id, OutboxMessage.dedup_key)).all() == [(500, "application:2")]
@@ -0,0 +1,197 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert, select, func
+
+from database.db import (
+    Event, EventParticipant, OutboxMessage, User,
+    register_for_event_stmt, register_for_event_async, cancel_event_registration_async,
+    set_event_capacity_async, promote_waitlist, release_user_events, async_session,
+)
+
+
+def make_users(engine, count: int) -> list:
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"telegram_id": 1000 + i, "full_name": f"Студент {i}", "role": "student"} for i in range(count)
+        ])
+        return conn.scalars(select(User.id).order_by(User.id)).all()
+
+
+def make_event(engine, capacity=None, is_active=1) -> int:
+    with engine.begin() as conn:
+        return conn.scalar(
+            insert(Event).values(title="Квиз", capacity=capacity, is_active=is_active).returning(Event.id)
+        )
+
+
+def participants(engine, event_id: int) -> list:
+    with engine.connect() as conn:
+        return conn.execute(
+            select(EventParticipant.user_id, EventParticipant.status)
+            .filter_by(event_id=event_id).order_by(EventParticipant.id)
+        ).all()
+
+
+def counter(engine, event_id: int) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(Event.participants_count).filter_by(id=event_id))
+
+
+async def gather(calls):
+    return await asyncio.gather(*calls)
+
+
+def registered(engine, event_id: int) -> list:
+    return [user_id for user_id, status in participants(engine, event_id) if status == "registered"]
+
+
+def test_concurrent_taps_do_not_overbook(db, run):
+    users = make_users(db, 120)
+    event_id = make_event(db, capacity=15)
+
+    results = run(gather(register_for_event_async(user_id, event_id) for user_id in users))
+
+    statuses = [status for status, created in results]
+    assert statuses.count("registered") == 15
+    assert statuses.count("waitlist") == 105
+    assert all(created for _, created in results)
+    assert len(registered(db, event_id)) == 15
+    assert counter(db, event_id) == 15
+
+
+def test_concurrent_connections_do_not_overbook(db):
+    # Отдельные соединения из потоков — как несколько процессов бота
+    users = make_users(db, 200)
+    event_id = make_event(db, capacity=20)
+
+    def register(user_id):
+        with db.begin() as conn:
+            return conn.scalar(register_for_event_stmt(user_id, event_id))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(register, users))
+
+    assert statuses.count("registered") == 20
+    assert statuses.count("waitlist") == 180
+    assert counter(db, event_id) == 20
+
+
+def test_double_tap_creates_one_registration(db, run):
+    [user_id] = make_users(db, 1)
+    event_id = make_event(db, capacity=3)
+
+    results = run(gather(register_for_event_async(user_id, event_id) for _ in range(5)))
+
+    assert sorted(results, key=lambda r: r[1]) == [("registered", False)] * 4 + [("registered", True)]
+    assert participants(db, event_id) == [(user_id, "registered")]
+    assert counter(db, event_id) == 1
+
+
+def test_inactive_event_is_not_registered(db, run):
+    [user_id] = make_users(db, 1)
+    event_id = make_event(db, is_active=0)
+
+    assert run(register_for_event_async(user_id, event_id)) == (None, False)
+    assert run(register_for_event_async(user_id, 999)) == (None, False)
+    assert participants(db, event_id) == []
+
+
+def test_cancel_promotes_first_in_waitlist(db, run):
+    users = make_users(db, 5)
+    event_id = make_event(db, capacity=2)
+    for user_id in users:
+        run(register_for_event_async(user_id, event_id))
+
+    assert run(cancel_event_registration_async(users[0], event_id)) == ("registered", 1)
+    assert registered(db, event_id) == [users[1], users[2]]
+    assert counter(db, event_id) == 2
+
+    # Уход из листа ожидания никого не переводит
+    assert run(cancel_event_registration_async(users[4], event_id)) == ("waitlist", 0)
+    assert run(cancel_event_registration_async(users[4], event_id)) == (None, 0)
+
+    with db.connect() as conn:
+        outbox = conn.execute(select(OutboxMessage.chat_id, OutboxMessage.dedup_key)).all()
+    assert outbox == [(1002, f"waitlist:{event_id}:1002")]
+
+
+def test_raising_capacity_promotes_in_queue_order(db, run):
+    users = make_users(db, 6)
+    event_id = make_event(db, capacity=1)
+    for user_id in users:
+        run(register_for_event_async(user_id, event_id))
+
+    assert run(set_event_capacity_async(event_id, 3)) == 2
+    assert registered(db, event_id) == users[:3]
+    # Уменьшение лимита записанных не выселяет
+    assert run(set_event_capacity_async(event_id, 1)) == 0
+    assert registered(db, event_id) == users[:3]
+    assert run(set_event_capacity_async(event_id, None)) == 3
+    assert registered(db, event_id) == users
+    assert counter(db, event_id) == 6
+    assert run(set_event_capacity_async(999, 5)) is None
+
+
+def test_promotion_skips_inactive_event(db, run):
+    users = make_users(db, 3)
+    event_id = make_event(db, capacity=1)
+    for user_id in users:
+        run(register_for_event_async(user_id, event_id))
+    with db.begin() as conn:
+        conn.execute(Event.__table__.update().values(is_active=0, capacity=None))
+
+    async def promote():
+        async with async_session() as session:
+            return await promote_waitlist(session, event_id)
+
+    assert run(promote()) == 0
+    assert registered(db, event_id) == users[:1]
+
+
+def test_release_user_events_frees_seats(db, run):
+    users = make_users(db, 3)
+    first, second = make_event(db, capacity=1), make_event(db, capacity=1)
+    for event_id in (first, second):
+        for user_id in users:
+            run(register_for_event_async(user_id, event_id))
+
+    async def release():
+        async with async_session() as session:
+            promoted = await release_user_events(session, users[0])
+            await session.commit()
+            return promoted
+
+    assert run(release()) == 2
+    assert registered(db, first) == registered(db, second) == [users[1]]
+
+
+def test_participants_count_follows_rows(db):
+    # Триггеры миграции 13: вставка, смена статуса и удаление в обход кода бота
+    users = make_users(db, 4)
+    event_id = make_event(db)
+    table = EventParticipant.__table__
+    with db.begin() as conn:
+        conn.execute(insert(table), [
+            {"event_id": event_id, "user_id": users[0], "status": "registered"},
+            {"event_id": event_id, "user_id": users[1], "status": "registered"},
+            {"event_id": event_id, "user_id": users[2], "status": "waitlist"},
+            {"event_id": event_id, "user_id": users[3], "status": "waitlist"},
+        ])
+    assert counter(db, event_id) == 2
+
+    with db.begin() as conn:
+        conn.execute(table.update().where(table.c.user_id == users[2]).values(status="registered"))
+        conn.execute(table.update().where(table.c.user_id == users[0]).values(status="waitlist"))
+        conn.execute(table.update().where(table.c.user_id == users[1]).values(status="registered"))
+    assert counter(db, event_id) == 2
+
+    with db.begin() as conn:
+        conn.execute(table.delete().where(table.c.user_id.in_([users[1], users[3]])))
+    assert counter(db, event_id) == 1
+
+    with db.connect() as conn:
+        actual = conn.scalar(
+            select(func.count()).select_from(table).where(table.c.event_id == event_id, table.c.status == "registered")
+        )
+    assert counter(db, event_id) == actual
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import select, update
+
+from database import fsm_storage
+from database.db import FsmRecord
+from database.fsm_storage import SQLiteStorage
+
+KEY = StorageKey(bot_id=42, chat_id=500, user_id=500)
+OTHER = StorageKey(bot_id=42, chat_id=501, user_id=501)
+
+
+def rows(engine) -> list:
+    with engine.connect() as conn:
+        return conn.execute(
+            select(FsmRecord.chat_id, FsmRecord.state, FsmRecord.data).order_by(FsmRecord.chat_id)
+        ).all()
+
+
+def test_state_survives_restart(db, run):
+    async def scenario():
+        storage = SQLiteStorage(flush_delay=60)
+        await storage.set_state(KEY, "ApplicationForm:description")
+        await storage.update_data(KEY, {"subject": "Справка"})
+        await storage.close()  # close дописывает накопленное
+
+        restarted = SQLiteStorage()
+        return await restarted.get_state(KEY), await restarted.get_data(KEY), await restarted.get_state(OTHER)
+
+    assert run(scenario()) == ("ApplicationForm:description", {"subject": "Справка"}, None)
+
+
+def test_changes_are_batched_into_one_delayed_flush(db, run):
+    async def scenario():
+        storage = SQLiteStorage(flush_delay=0.05)
+        await storage.set_state(KEY, "EventCreation:title")
+        for i in range(5):
+            await storage.update_data(KEY, {"step": i})
+        await storage.set_state(OTHER, "EventCreation:capacity")
+        before = rows(db)
+        await asyncio.sleep(0.2)
+        return before, rows(db)
+
+    before, after = run(scenario())
+    assert before == []  # до задержки в БД ничего не пишется
+    assert after == [(500, "EventCreation:title", '{"step": 4}'), (501, "EventCreation:capacity", "{}")]
+
+
+def test_cleared_state_is_deleted(db, run):
+    async def scenario():
+        storage = SQLiteStorage(flush_delay=60)
+        await storage.set_state(KEY, "ApplicationForm:subject")
+        await storage.set_state(OTHER, "ApplicationForm:subject")
+        await storage.flush()
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+        await storage.flush()
+
+    run(scenario())
+    assert rows(db) == [(501, "ApplicationForm:subject", "{}")]
+
+
+def test_expired_state_is_ignored_and_purged(db, run):
+    async def write():
+        storage = SQLiteStorage(flush_delay=60)
+        await storage.set_state(KEY, "ApplicationForm:subject")
+        await storage.set_state(OTHER, "ApplicationForm:subject")
+        await storage.close()
+
+    run(write())
+    with db.begin() as conn:
+        conn.execute(
+            update(FsmRecord).filter_by(chat_id=500).values(updated_at=datetime.utcnow() - timedelta(seconds=120))
+        )
+
+    async def read():
+        storage = SQLiteStorage(ttl=60, flush_delay=60)
+        state = await storage.get_state(KEY), await storage.get_state(OTHER)
+        # Первая запись заодно удаляет устаревшие строки
+        await storage.set_data(OTHER, {"subject": "Справка"})
+        await storage.flush()
+        return state
+
+    assert run(read()) == (None, "ApplicationForm:subject")
+    assert [row.chat_id for row in rows(db)] == [501]
+
+
+def test_failed_flush_keeps_changes(db, run, monkeypatch):
+    def broken_session():
+        raise RuntimeError("database is locked")
+
+    async def scenario():
+        storage = SQLiteStorage(flush_delay=60)
+        await storage.set_state(KEY, "ApplicationForm:subject")
+        with monkeypatch.context() as patch:
+            patch.setattr(fsm_storage, "async_session", broken_session)
+            with pytest.raises(RuntimeError):
+                await storage.flush()
+        # Пока запись не удалась, пришло новое изменение — оно новее сохранённого
+        await storage.set_state(KEY, "ApplicationForm:description")
+        await storage.close()
+
+    run(scenario())
+    assert rows(db) == [(500, "ApplicationForm:description", "{}")]
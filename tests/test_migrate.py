@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect, text
+
+from database import migrate
+
+
+def failing_migration(version):
+    def upgrade(conn):
+        conn.execute(text("CREATE TABLE half_applied (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("ALTER TABLE users ADD COLUMN half_applied INTEGER"))
+        raise RuntimeError("сбой посреди миграции")
+    return SimpleNamespace(VERSION=version, DESCRIPTION="падает", upgrade=upgrade)
+
+
+def fixed_migration(version):
+    def upgrade(conn):
+        conn.execute(text("CREATE TABLE half_applied (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("ALTER TABLE users ADD COLUMN half_applied INTEGER"))
+    return SimpleNamespace(VERSION=version, DESCRIPTION="исправлена", upgrade=upgrade)
+
+
+def current_version(engine):
+    with engine.connect() as conn:
+        return migrate.get_current_version(conn)
+
+
+def test_upgrade_applies_all_migrations(tmp_db):
+    engine = migrate.migration_engine(tmp_db)
+    applied = migrate.upgrade(engine, log=lambda *_: None)
+
+    assert applied == len(migrate.load_migrations())
+    assert current_version(engine) == migrate.load_migrations()[-1].VERSION
+    assert migrate.upgrade(engine, log=lambda *_: None) == 0
+    engine.dispose()
+
+
+def test_failed_migration_leaves_schema_unchanged(tmp_db, monkeypatch):
+    engine = migrate.migration_engine(tmp_db)
+    migrate.upgrade(engine, log=lambda *_: None)
+    real = migrate.load_migrations()
+    version = real[-1].VERSION
+    users_columns = {c["name"] for c in inspect(engine).get_columns("users")}
+
+    monkeypatch.setattr(migrate, "load_migrations", lambda: real + [failing_migration(version + 1)])
+    with pytest.raises(RuntimeError):
+        migrate.upgrade(engine, log=lambda *_: None)
+
+    # Ни таблицы, ни колонки, ни записи о версии
+    assert not inspect(engine).has_table("half_applied")
+    assert {c["name"] for c in inspect(engine).get_columns("users")} == users_columns
+    assert current_version(engine) == version
+
+    # Исправленная миграция применяется повторно без «duplicate column»
+    monkeypatch.setattr(migrate, "load_migrations", lambda: real + [fixed_migration(version + 1)])
+    assert migrate.upgrade(engine, log=lambda *_: None) == 1
+    assert inspect(engine).has_table("half_applied")
+    assert current_version(engine) == version + 1
+    engine.dispose()
+
+
+def test_allowed_user_key_copy_matches_app():
+    # Ключ в коде бота поменялся — нужна новая миграция, пересчитывающая lookup_key
+    from database.db import allowed_user_key
+    from database.migrations.m0006_allowed_users_lookup_key import allowed_user_key as frozen_key
+
+    for full_name, group_name in [("Иванов  Иван Иванович", "21-ивт-01"), ("ЛЁВИН Пётр Ильич", " 22-СПО-ИСиП-02 ")]:
+        assert frozen_key(full_name, group_name) == allowed_user_key(full_name, group_name)
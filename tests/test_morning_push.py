@@ -0,0 +1,67 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from database.db import Group, User
+from utils import morning_push
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingBot:
+    # Бот «падает» на отправке crash_on-го сообщения
+    def __init__(self, crash_on=None):
+        self.sent = []
+        self.crash_on = crash_on
+
+    async def send_message(self, chat_id, text):
+        if len(self.sent) + 1 == self.crash_on:
+            raise Crash
+        self.sent.append(chat_id)
+
+
+@pytest.fixture
+def subscribers(db, monkeypatch):
+    async def get_day(group_name, week, day):
+        return "🕒 08:30 - Математика"
+
+    monkeypatch.setattr(morning_push.schedule_cache, "get_day", get_day)
+    with db.begin() as conn:
+        conn.execute(insert(Group).values(id=1, name="21-ИВТ-01"))
+        conn.execute(insert(User), [
+            {"telegram_id": 500 + i, "full_name": f"Студент {i}", "group_id": 1, "morning_push": 1}
+            for i in range(5)
+        ])
+    return db
+
+
+def test_restart_loses_at_most_the_message_in_flight(subscribers, run):
+    bot = CrashingBot(crash_on=3)
+    with pytest.raises(Crash):
+        run(morning_push.send_morning_schedule(bot, datetime.now()))
+    assert bot.sent == [500, 501]
+
+    with subscribers.connect() as conn:
+        claimed = conn.scalars(select(User.telegram_id).filter_by(morning_push_sent=date.today())).all()
+    assert sorted(claimed) == [500, 501, 502]  # третий отмечен, но не получил
+
+    restarted = CrashingBot()
+    assert run(morning_push.send_morning_schedule(restarted, datetime.now())) == 2
+    assert restarted.sent == [503, 504]
+    assert run(morning_push.send_morning_schedule(restarted, datetime.now())) == 0
+
+
+def test_unsubscribed_during_push_is_skipped(subscribers, run):
+    class UnsubscribingBot(CrashingBot):
+        async def send_message(self, chat_id, text):
+            await super().send_message(chat_id, text)
+            if chat_id == 500:
+                with subscribers.begin() as conn:
+                    conn.execute(update(User).filter_by(telegram_id=503).values(morning_push=0))
+
+    bot = UnsubscribingBot()
+    assert run(morning_push.send_morning_schedule(bot, datetime.now())) == 4
+    assert bot.sent == [500, 501, 502, 504]
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError
+from aiogram.methods import SendMessage
+from sqlalchemy import select, update
+
+from database.db import OutboxMessage, async_session, enqueue_notification_stmt
+from utils import outbox
+
+
+class FakeBot:
+    def __init__(self, error=None, during_send=None):
+        self.sent = []
+        self.error = error
+        self.during_send = during_send
+
+    async def send_message(self, chat_id, text):
+        if self.during_send is not None:
+            await self.during_send()
+        if self.error is not None:
+            raise self.error
+        self.sent.append((chat_id, text))
+
+
+async def enqueue(chat_id, text, dedup_key=None):
+    async with async_session() as session:
+        await session.execute(enqueue_notification_stmt(chat_id, text, dedup_key=dedup_key))
+        await session.commit()
+
+
+def messages(engine) -> list:
+    with engine.connect() as conn:
+        return conn.execute(
+            select(OutboxMessage.text, OutboxMessage.status, OutboxMessage.revision, OutboxMessage.attempts)
+            .order_by(OutboxMessage.id)
+        ).all()
+
+
+def test_pending_message_is_replaced_not_duplicated(db, run):
+    async def scenario():
+        await enqueue(500, "Статус: Принята", "application:1")
+        await enqueue(500, "Статус: В процессе", "application:1")
+        await enqueue(500, "Другая заявка", "application:2")
+        await enqueue(500, "Без ключа")
+        await enqueue(500, "Без ключа")
+
+    run(scenario())
+    assert messages(db) == [
+        ("Статус: В процессе", "pending", 1, 0),
+        ("Другая заявка", "pending", 0, 0),
+        ("Без ключа", "pending", 0, 0),
+        ("Без ключа", "pending", 0, 0),
+    ]
+
+
+def test_sent_message_does_not_block_new_one(db, run):
+    bot = FakeBot()
+
+    async def scenario():
+        await enqueue(500, "Статус: Принята", "application:1")
+        await outbox.deliver_batch(bot)
+        await enqueue(500, "Статус: Выполнена", "application:1")
+        await outbox.deliver_batch(bot)
+
+    run(scenario())
+    assert bot.sent == [(500, "Статус: Принята"), (500, "Статус: Выполнена")]
+    assert [row.status for row in messages(db)] == ["sent", "sent"]
+
+
+def test_text_replaced_during_send_is_sent_again(db, run):
+    async def replace():
+        # Декан снова сменил статус, пока сообщение уходило
+        if not replaced:
+            replaced.append(True)
+            await enqueue(500, "Статус: Отклонена", "application:1")
+
+    replaced = []
+    bot = FakeBot(during_send=replace)
+
+    async def scenario():
+        await enqueue(500, "Статус: Принята", "application:1")
+        first = await outbox.deliver_batch(bot)
+        state = messages(db)
+        second = await outbox.deliver_batch(bot)
+        return first, state, second
+
+    first, state, second = run(scenario())
+    assert first == second == 1
+    # Отметка первой отправки не затёрла новый текст (revision вырос)
+    assert state == [("Статус: Отклонена", "pending", 1, 0)]
+    assert bot.sent == [(500, "Статус: Принята"), (500, "Статус: Отклонена")]
+    assert messages(db) == [("Статус: Отклонена", "sent", 1, 1)]
+
+
+def test_temporary_error_is_retried_later(db, run):
+    bot = FakeBot(error=TelegramNetworkError(method=SendMessage(chat_id=500, text="x"), message="timeout"))
+
+    async def scenario():
+        await enqueue(500, "Статус: Принята", "application:1")
+        await outbox.deliver_batch(bot)
+        # Повтор ещё не наступил
+        return await outbox.deliver_batch(bot)
+
+    assert run(scenario()) == 0
+    with db.connect() as conn:
+        row = conn.execute(select(OutboxMessage.status, OutboxMessage.attempts, OutboxMessage.next_attempt_at)).one()
+    assert row.status == "pending" and row.attempts == 1
+    assert row.next_attempt_at > datetime.utcnow()
+
+
+def test_permanent_errors_and_exhausted_retries_fail(db, run):
+    blocked = FakeBot(error=TelegramForbiddenError(method=SendMessage(chat_id=500, text="x"), message="bot was blocked"))
+    flaky = FakeBot(error=TelegramNetworkError(method=SendMessage(chat_id=501, text="x"), message="timeout"))
+
+    async def scenario():
+        await enqueue(500, "Заблокировал бота", "application:1")
+        await outbox.deliver_batch(blocked)
+        await enqueue(501, "Сеть", "application:2")
+        async with async_session() as session:
+            await session.execute(
+                update(OutboxMessage).filter_by(dedup_key="application:2").values(attempts=outbox.OUTBOX_MAX_ATTEMPTS - 1)
+            )
+            await session.commit()
+        await outbox.deliver_batch(flaky)
+
+    run(scenario())
+    assert [(row.text, row.status) for row in messages(db)] == [("Заблокировал бота", "failed"), ("Сеть", "failed")]
@@ -0,0 +1,48 @@
+from sqlalchemy import insert, select
+
+from config import PAGE_SIZE
+from database.db import Event, async_session
+from utils.pagination import ListView, PageCallback, render_page
+
+VIEW = ListView(
+    name="events",
+    key=Event.id,
+    query=lambda arg: select(Event),
+    render_item=lambda event: event.title,
+)
+
+
+def make_events(engine, count: int):
+    with engine.begin() as conn:
+        conn.execute(insert(Event), [{"title": f"Мероприятие {i}"} for i in range(1, count + 1)])
+
+
+def render(run, data: PageCallback):
+    async def page():
+        async with async_session() as session:
+            return await render_page(session, VIEW, data)
+    return run(page())
+
+
+def test_client_page_size_is_clamped(db, run):
+    make_events(db, PAGE_SIZE * 3)
+
+    text, markup = render(run, PageCallback(view="events", size=100_000))
+    assert text.count("Мероприятие") == PAGE_SIZE
+    [next_button] = markup.inline_keyboard[-1]
+    assert PageCallback.unpack(next_button.callback_data).size == PAGE_SIZE
+
+
+def test_zero_page_size_still_moves_forward(db, run):
+    make_events(db, 3)
+
+    seen = []
+    data = PageCallback(view="events", size=0)
+    while True:
+        text, markup = render(run, data)
+        seen.append(text)
+        buttons = {button.text: button for button in markup.inline_keyboard[-1]} if markup else {}
+        if "▶" not in buttons:
+            break
+        data = PageCallback.unpack(buttons["▶"].callback_data)
+    assert seen == ["Мероприятие 1", "Мероприятие 2", "Мероприятие 3"]
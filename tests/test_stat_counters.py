@@ -0,0 +1,114 @@
+import random
+
+from sqlalchemy import text
+
+from database.db import async_session
+from utils.stats import read_counters
+
+
+def counters(engine) -> dict:
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT name, value FROM stat_counters")).all()
+    return {name: value for name, value in rows if value}
+
+
+def recount(engine) -> dict:
+    # Те же счётчики, посчитанные по таблицам
+    queries = [
+        "SELECT 'users', count(*) FROM users",
+        "SELECT 'users:' || COALESCE(role, ''), count(*) FROM users GROUP BY 1",
+        "SELECT 'applications', count(*) FROM applications",
+        "SELECT 'applications:' || COALESCE(status, ''), count(*) FROM applications GROUP BY 1",
+        "SELECT 'events', count(*) FROM events",
+        "SELECT 'events:active', COALESCE(sum(COALESCE(is_active, 0)), 0) FROM events",
+        "SELECT 'event_participants', count(*) FROM event_participants WHERE status = 'registered'",
+    ]
+    result = {}
+    with engine.connect() as conn:
+        for query in queries:
+            result.update(conn.execute(text(query)).all())
+    return {name: value for name, value in result.items() if value}
+
+
+def random_changes(db):
+    # Вставки, смены ролей и статусов, удаления — в обход кода бота
+    rng = random.Random(7)
+    roles = ["student", "dean", "admin", None]
+    statuses = ["Новая", "Принята", "В процессе", "Отклонена", "Выполнена"]
+
+    with db.begin() as conn:
+        for i in range(40):
+            conn.execute(text("INSERT INTO users (telegram_id, full_name, role) VALUES (:t, :n, :r)"),
+                         {"t": 1000 + i, "n": f"Студент {i}", "r": rng.choice(roles)})
+        for i in range(5):
+            conn.execute(text("INSERT INTO events (title, is_active, participants_count) VALUES (:t, :a, 0)"),
+                         {"t": f"Мероприятие {i}", "a": rng.choice([0, 1, None])})
+    assert counters(db) == recount(db)
+
+    for step in range(300):
+        with db.begin() as conn:
+            user_ids = conn.scalars(text("SELECT id FROM users")).all()
+            action = rng.randrange(8)
+            if action == 0:
+                conn.execute(text("INSERT INTO applications (user_id, content, status) VALUES (:u, 'текст', :s)"),
+                             {"u": rng.choice(user_ids), "s": rng.choice(statuses)})
+            elif action == 1:
+                conn.execute(text("UPDATE applications SET status = :s WHERE id = (SELECT id FROM applications ORDER BY random() LIMIT 1)"),
+                             {"s": rng.choice(statuses + [None])})
+            elif action == 2:
+                conn.execute(text("DELETE FROM applications WHERE id = (SELECT id FROM applications ORDER BY random() LIMIT 1)"))
+            elif action == 3:
+                conn.execute(text("UPDATE users SET role = :r WHERE id = :u"),
+                             {"r": rng.choice(roles), "u": rng.choice(user_ids)})
+            elif action == 4:
+                conn.execute(text("UPDATE events SET is_active = :a WHERE id = :e"),
+                             {"a": rng.choice([0, 1, None]), "e": rng.randint(1, 5)})
+            elif action == 5:
+                conn.execute(text(
+                    "INSERT OR IGNORE INTO event_participants (event_id, user_id, status) VALUES (:e, :u, :s)"
+                ), {"e": rng.randint(1, 5), "u": rng.choice(user_ids), "s": rng.choice(["registered", "waitlist"])})
+            elif action == 6:
+                conn.execute(text(
+                    "UPDATE event_participants SET status = :s "
+                    "WHERE id = (SELECT id FROM event_participants ORDER BY random() LIMIT 1)"
+                ), {"s": rng.choice(["registered", "waitlist"])})
+            else:
+                conn.execute(text("DELETE FROM event_participants WHERE id = (SELECT id FROM event_participants ORDER BY random() LIMIT 1)"))
+        if step % 50 == 0:
+            assert counters(db) == recount(db), step
+
+    with db.begin() as conn:
+        # Удаление пользователя вместе с его заявками и записями (как при удалении аккаунта)
+        conn.execute(text("DELETE FROM applications WHERE user_id IN (SELECT id FROM users WHERE id % 3 = 0)"))
+        conn.execute(text("DELETE FROM event_participants WHERE user_id IN (SELECT id FROM users WHERE id % 3 = 0)"))
+        conn.execute(text("DELETE FROM users WHERE id % 3 = 0"))
+        conn.execute(text("DELETE FROM events WHERE id = 1"))
+    assert counters(db) == recount(db)
+
+
+def test_counters_follow_random_changes(db):
+    random_changes(db)
+
+
+def test_backfill_matches_triggers(db, run):
+    # Повторный прогон заполнения из миграции 12 даёт те же значения, что и триггеры
+    random_changes(db)
+    before = counters(db)
+
+    from database.migrations import m0012_stat_counters
+    backfill = m0012_stat_counters.STATEMENTS[m0012_stat_counters.STATEMENTS.index("DELETE FROM stat_counters"):]
+    with db.begin() as conn:
+        for statement in backfill:
+            conn.execute(text(statement))
+        # Миграция 13 считает записи на мероприятия без листа ожидания
+        conn.execute(text(
+            "UPDATE stat_counters SET value = (SELECT count(*) FROM event_participants WHERE status = 'registered') "
+            "WHERE name = 'event_participants'"
+        ))
+    assert counters(db) == before
+
+    async def read():
+        async with async_session() as session:
+            return await read_counters(session)
+
+    assert {name: value for name, value in run(read()).items() if value} == before
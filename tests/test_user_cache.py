@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+from middlewares import user as user_middleware
+
+
+def test_lookup_raced_by_invalidation_is_not_cached(monkeypatch, run):
+    stale = SimpleNamespace(id=1, telegram_id=500, full_name="Иванов Иван Иванович",
+                            group_id=None, group=None, role="admin")
+
+    async def get_user(session, telegram_id):
+        # Роль сменили, пока запрос был в пути
+        user_middleware.invalidate_user(telegram_id)
+        return stale
+
+    monkeypatch.setattr(user_middleware, "get_user_async", get_user)
+    user = run(user_middleware.resolve_user(500))
+
+    assert user.role == "admin"  # ответ этого апдейта — как прочитано
+    assert user_middleware.user_cache.get(500, None) is None
+
+
+def test_lookup_is_cached(monkeypatch, run):
+    calls = []
+
+    async def get_user(session, telegram_id):
+        calls.append(telegram_id)
+        return None
+
+    monkeypatch.setattr(user_middleware, "get_user_async", get_user)
+    user_middleware.invalidate_user(501)
+    assert run(user_middleware.resolve_user(501)) is None
+    assert run(user_middleware.resolve_user(501)) is None
+    assert calls == [501]
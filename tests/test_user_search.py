@@ -0,0 +1,67 @@
+from sqlalchemy import delete, insert, select, text, update
+
+from database.db import Group, User, async_session
+from database.user_search import match_expression, search_users
+
+
+def find(run, query: str) -> list:
+    async def search():
+        async with async_session() as session:
+            total, users = await search_users(session, query, limit=50)
+        return [user.telegram_id for user in users]
+    return run(search())
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Group), [{"id": 1, "name": "21-ИВТ-01"}, {"id": 2, "name": "22-СПО-ИСИП-02"}])
+        conn.execute(insert(User), [
+            {"id": 1, "telegram_id": 101, "full_name": "Иванов Иван Иванович", "group_id": 1, "role": "student"},
+            {"id": 2, "telegram_id": 102, "full_name": "Сёмин Пётр Ильич", "group_id": 2, "role": "student"},
+            {"id": 3, "telegram_id": 103, "full_name": "Петрова Анна Сергеевна", "group_id": 2, "role": "dean"},
+        ])
+
+
+def test_match_expression():
+    assert match_expression("Иван 21-СПО") == '"иван"* "21"* "спо"*'
+    assert match_expression("  ,. ") is None
+
+
+def test_search_by_name_group_and_prefix(db, run):
+    seed(db)
+    assert find(run, "иванов") == [101]
+    assert find(run, "ИВАН") == [101]
+    assert find(run, "семин") == [102]   # ё в ФИО ищется через е
+    assert find(run, "пётр ильич") == [102]
+    assert sorted(find(run, "пётр")) == [102, 103]  # префикс: и «Петрова»
+    assert sorted(find(run, "22-спо")) == [102, 103]
+    assert find(run, "анна 22") == [103]
+    assert find(run, "103") == [103]      # Telegram ID
+
+
+def test_index_follows_user_changes(db, run):
+    seed(db)
+    with db.begin() as conn:
+        conn.execute(update(User).filter_by(id=1).values(full_name="Смирнов Павел Павлович"))
+        conn.execute(update(User).filter_by(id=2).values(group_id=1))
+        conn.execute(update(Group).filter_by(id=2).values(name="23-СПО-ИСИП-01"))
+        conn.execute(delete(User).filter_by(id=3))
+        conn.execute(insert(User).values(id=4, telegram_id=104, full_name="Орлов Олег Олегович", group_id=2))
+
+    assert find(run, "иванов") == []
+    assert find(run, "смирнов") == [101]
+    assert sorted(find(run, "21-ивт")) == [101, 102]
+    assert find(run, "22-спо") == []
+    assert find(run, "23-спо") == [104]
+    assert find(run, "петрова") == []
+    assert find(run, "орлов") == [104]
+
+    # Индекс совпадает с тем, что построила бы миграция с нуля
+    with db.connect() as conn:
+        indexed = conn.execute(text("SELECT rowid, full_name, group_name, role FROM users_fts ORDER BY rowid")).all()
+        expected = conn.execute(
+            select(User.id, User.full_name, Group.name, User.role).outerjoin(Group).order_by(User.id)
+        ).all()
+    assert [tuple(row) for row in indexed] == [
+        (user_id, full_name.replace("ё", "е"), group, role) for user_id, full_name, group, role in expected
+    ]
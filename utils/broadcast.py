@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from sqlalchemy import bindparam, func, insert, literal, select, update
+
+from database.db import async_session, Broadcast, BroadcastRecipient, User
+from utils.sender import bulk_sending
+
+logger = logging.getLogger(__name__)
+
+# Сколько получателей отправляется параллельно и фиксируется одной транзакцией
+CHUNK_SIZE = 20
+
+# Как часто (сек) обновлять сообщение о ходе рассылки
+PROGRESS_INTERVAL = 5
+
+BROADCAST_STATUS_NAMES = {
+    "running": "⏳ Идёт",
+    "done": "✅ Завершена",
+}
+
+
+def render_progress(broadcast: Broadcast, rate: float | None = None) -> str:
+    processed = broadcast.sent + broadcast.blocked + broadcast.failed
+    text = (
+        f"📢 <b>Рассылка #{broadcast.id}</b> · {broadcast.target}\n"
+        f"{BROADCAST_STATUS_NAMES.get(broadcast.status, broadcast.status)}: "
+        f"обработано {processed} из {broadcast.total}\n"
+        f"✉ Доставлено: {broadcast.sent} · 🚫 Заблокировали бота: {broadcast.blocked} · ⚠ Ошибки: {broadcast.failed}"
+    )
+    if rate is not None:
+        text += f"\n⚡ Скорость: {rate:.1f} сообщ./сек"
+    return text
+
+
+# Рассылки идут в фоне. Получатели выбираются одним запросом при создании
+# и сохраняются в broadcast_recipients; курсор (id последнего получателя)
+# сдвигается до отправки очередной пачки, поэтому после перезапуска рассылка
+# продолжается с места остановки и никому не приходит дважды.
+class BroadcastEngine:
+    def __init__(self):
+        self._tasks = {}  # id рассылки → задача
+
+    async def start(self, bot, text: str, target: str, created_by: int, chat_id: int,
+                    event_id: int | None = None, group_ids: list | None = None) -> Broadcast:
+        """Создаёт рассылку студентам (всем или групп group_ids) и запускает её."""
+        async with async_session() as session:
+            broadcast = Broadcast(
+                event_id=event_id, text=text, target=target, status="running",
+                total=0, sent=0, blocked=0, failed=0, cursor=0,
+                created_by=created_by, chat_id=chat_id,
+            )
+            session.add(broadcast)
+            await session.flush()
+
+            students = select(literal(broadcast.id), User.id, User.telegram_id).where(User.role == "student")
+            if group_ids is not None:
+                students = students.where(User.group_id.in_(group_ids))
+            await session.execute(
+                insert(BroadcastRecipient).from_select(["broadcast_id", "user_id", "telegram_id"], students)
+            )
+            broadcast.total = await session.scalar(
+                select(func.count()).select_from(BroadcastRecipient).filter_by(broadcast_id=broadcast.id)
+            )
+            await session.commit()
+
+        self._spawn(bot, broadcast.id)
+        return broadcast
+
+    async def resume(self, bot):
+        # Рассылки, прерванные перезапуском бота
+        async with async_session() as session:
+            ids = (await session.scalars(select(Broadcast.id).filter_by(status="running"))).all()
+        for broadcast_id in ids:
+            self._spawn(bot, broadcast_id)
+
+    def _spawn(self, bot, broadcast_id: int):
+        if broadcast_id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(bot, broadcast_id))
+        self._tasks[broadcast_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(broadcast_id, None))
+
+    async def _send(self, bot, telegram_id: int, text: str, markup) -> tuple[str, str | None]:
+        try:
+            await bot.send_message(telegram_id, text, reply_markup=markup)
+            return "sent", None
+        except TelegramForbiddenError:
+            return "blocked", None
+        except TelegramAPIError as e:
+            return "failed", str(e)[:500]
+
+    async def _progress(self, call):
+        # Сообщение о ходе рассылки — по возможности: если декан удалил его или
+        # Telegram вернул ошибку, доставка студентам продолжается
+        try:
+            return await call
+        except TelegramAPIError as e:
+            logger.warning("Broadcast progress message failed: %s", e)
+            return None
+
+    async def _run(self, bot, broadcast_id: int):
+        try:
+            await self._deliver(bot, broadcast_id)
+        except Exception:
+            logger.exception("Broadcast %s failed", broadcast_id)
+
+    async def _deliver(self, bot, broadcast_id: int):
+        async with async_session() as session:
+            broadcast = await session.get(Broadcast, broadcast_id)
+            # Пачка, прерванная перезапуском: курсор уже за ней, а итоги не записаны.
+            # Повторно не отправляем (сообщения могли уйти) — считаем их ошибками,
+            # чтобы доставлено + заблокировали + ошибки сошлись с total
+            interrupted = (await session.execute(
+                update(BroadcastRecipient)
+                .where(
+                    BroadcastRecipient.broadcast_id == broadcast_id,
+                    BroadcastRecipient.id <= broadcast.cursor,
+                    BroadcastRecipient.status == "pending",
+                )
+                .values(status="failed", error="Прервано перезапуском бота")
+            )).rowcount
+            if interrupted:
+                await session.execute(
+                    update(Broadcast).filter_by(id=broadcast_id).values(failed=Broadcast.failed + interrupted)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+                broadcast.failed += interrupted
+                logger.warning("Broadcast %s: %s recipients interrupted by restart", broadcast_id, interrupted)
+        markup = None
+        if broadcast.event_id:
+            markup = InlineKeyboardMarkup(inline_keyboard=[[
+                InlineKeyboardButton(text="📥 Записаться", callback_data=f"register_event_{broadcast.event_id}")
+            ]])
+
+        progress_msg = await self._progress(bot.send_message(broadcast.chat_id, render_progress(broadcast)))
+        started = time.monotonic()
+        processed = 0
+        shown_at = started
+
+        with bulk_sending():
+            while True:
+                async with async_session() as session:
+                    rows = (await session.execute(
+                        select(BroadcastRecipient.id, BroadcastRecipient.telegram_id)
+                        .where(BroadcastRecipient.broadcast_id == broadcast_id, BroadcastRecipient.id > broadcast.cursor)
+                        .order_by(BroadcastRecipient.id)
+                        .limit(CHUNK_SIZE)
+                    )).all()
+                    if not rows:
+                        break
+                    broadcast.cursor = rows[-1].id
+                    await session.execute(update(Broadcast).filter_by(id=broadcast_id).values(cursor=broadcast.cursor))
+                    await session.commit()
+
+                results = await asyncio.gather(*(
+                    self._send(bot, row.telegram_id, broadcast.text, markup) for row in rows
+                ))
+
+                counts = {"sent": 0, "blocked": 0, "failed": 0}
+                for status, _ in results:
+                    counts[status] += 1
+                async with async_session() as session:
+                    recipients = BroadcastRecipient.__table__
+                    await session.execute(
+                        update(recipients)
+                        .where(recipients.c.id == bindparam("row_id"))
+                        .values(status=bindparam("new_status"), error=bindparam("new_error")),
+                        [
+                            {"row_id": row.id, "new_status": status, "new_error": error}
+                            for row, (status, error) in zip(rows, results)
+                        ],
+                    )
+                    await session.execute(update(Broadcast).filter_by(id=broadcast_id).values(
+                        sent=Broadcast.sent + counts["sent"],
+                        blocked=Broadcast.blocked + counts["blocked"],
+                        failed=Broadcast.failed + counts["failed"],
+                    ))
+                    await session.commit()
+                broadcast.sent += counts["sent"]
+                broadcast.blocked += counts["blocked"]
+                broadcast.failed += counts["failed"]
+                processed += len(rows)
+
+                if progress_msg is not None and time.monotonic() - shown_at >= PROGRESS_INTERVAL:
+                    shown_at = time.monotonic()
+                    await self._progress(progress_msg.edit_text(render_progress(broadcast, processed / (shown_at - started))))
+
+        broadcast.status = "done"
+        async with async_session() as session:
+            await session.execute(
+                update(Broadcast).filter_by(id=broadcast_id).values(status="done", finished_at=datetime.utcnow())
+            )
+            await session.commit()
+
+        elapsed = time.monotonic() - started
+        if progress_msg is not None:
+            await self._progress(progress_msg.edit_text(render_progress(broadcast, processed / elapsed if elapsed else None)))
+
+
+broadcasts = BroadcastEngine()
@@ -0,0 +1,48 @@
+import time
+from collections import OrderedDict
+
+
+# LRU-кэш с ограничением размера и временем жизни записей (TTL).
+# Используется внутри одного процесса, поэтому без блокировок:
+# все обращения идут из цикла событий asyncio.
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # ключ → (время истечения, значение)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            # Запись устарела — удаляем
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)  # отмечаем как недавно использованную
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        # Вытесняем самые старые записи при переполнении
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_MISSING = object()
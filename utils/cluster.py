@@ -0,0 +1,181 @@
+"""Многопроцессный режим: приём обновлений в одном процессе, обработка в BOT_WORKERS.
+
+Главный процесс получает обновления (polling или webhook) и по chat.id
+отправляет каждое в один и тот же процесс-обработчик, поэтому обновления
+одного чата обрабатываются по порядку и одним процессом. FSM-состояния
+лежат в общей БД, а ключ состояния содержит чат — у каждого состояния
+один владелец. Сброс кэшей (пользователи, расписание) рассылается всем
+процессам через главный.
+"""
+import asyncio
+import logging
+import multiprocessing
+
+from aiogram import Dispatcher
+from aiogram.methods import TelegramMethod
+
+from config import BOT_MODE, BOT_WORKER_CONCURRENCY, FLOOD_GLOBAL_RATE, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+# Рассылка сброса кэшей между процессами.
+# В однопроцессном режиме _publisher не задан и publish ничего не делает.
+_publisher = None
+_subscribers = {}  # вид → функция, сбрасывающая локальный кэш
+
+
+def subscribe(kind: str, handler):
+    _subscribers[kind] = handler
+
+
+def publish(kind: str, *args):
+    if _publisher is not None:
+        _publisher(kind, args)
+
+
+def _apply(kind: str, args):
+    handler = _subscribers.get(kind)
+    if handler is not None:
+        handler(*args)
+
+
+def partition(chat_id: int, workers: int) -> int:
+    return chat_id % workers
+
+
+# Процесс-обработчик
+
+class Worker:
+    def __init__(self, index: int, inbox, outbox):
+        self.index = index
+        self.inbox = inbox
+        self.outbox = outbox
+        self._tails = {}  # чат → задача его последнего обновления
+        self._semaphore = asyncio.Semaphore(BOT_WORKER_CONCURRENCY)
+
+    def _publish(self, kind, args):
+        self.outbox.put(("invalidate", self.index, kind, args))
+
+    async def _process(self, bot, dp, previous, update):
+        # Следующее обновление чата ждёт предыдущее — порядок внутри чата сохраняется
+        if previous is not None:
+            await asyncio.wait({previous})
+        async with self._semaphore:
+            try:
+                result = await dp.feed_raw_update(bot, update)
+                if isinstance(result, TelegramMethod):
+                    await dp.silent_call_request(bot=bot, result=result)
+            except Exception:
+                logger.exception("Worker %s: update failed", self.index)
+
+    def _schedule(self, bot, dp, chat_key, update):
+        task = asyncio.create_task(self._process(bot, dp, self._tails.get(chat_key), update))
+        self._tails[chat_key] = task
+
+        def forget(done, key=chat_key):
+            if self._tails.get(key) is done:
+                del self._tails[key]
+        task.add_done_callback(forget)
+
+    async def run(self, workers: int):
+        global _publisher
+        # Импорт здесь: модуль bot создаёт бота и диспетчер при импорте
+        from bot import bot, dp, prepare_dispatcher, start_background_tasks
+        from utils.sender import flood_control, PriorityLimiter
+        from utils.import_jobs import import_jobs
+        from utils import export
+        from utils.metrics import start_metrics_server
+
+        # Общий лимит Telegram на бота делим между процессами
+        rate = FLOOD_GLOBAL_RATE / workers
+        flood_control.global_limiter = PriorityLimiter(rate, rate)
+        _publisher = self._publish
+
+        await prepare_dispatcher()
+        await start_metrics_server(METRICS_PORT + 1 + self.index if METRICS_PORT else 0)
+        if self.index == 0:
+            start_background_tasks(bot)
+        loop = asyncio.get_running_loop()
+        logger.info("Worker %s started", self.index)
+        try:
+            while True:
+                message = await loop.run_in_executor(None, self.inbox.get)
+                if message[0] == "update":
+                    _, chat_key, update = message
+                    self._schedule(bot, dp, chat_key, update)
+                elif message[0] == "invalidate":
+                    _, kind, args = message
+                    _apply(kind, args)
+                elif message[0] == "stop":
+                    break
+            if self._tails:
+                await asyncio.wait(set(self._tails.values()))
+        finally:
+            await dp.storage.close()
+            await bot.session.close()
+            import_jobs.shutdown()
+            export.shutdown()
+
+
+def run_worker(index: int, workers: int, inbox, outbox):
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(Worker(index, inbox, outbox).run(workers))
+
+
+# Главный процесс
+
+async def _relay(outbox, inboxes):
+    # Сброс кэша из одного процесса пересылаем остальным
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await loop.run_in_executor(None, outbox.get)
+        if message is None:
+            return
+        _, sender, kind, args = message
+        for index, inbox in enumerate(inboxes):
+            if index != sender:
+                inbox.put(("invalidate", kind, args))
+
+
+async def run_cluster(bot, workers: int):
+    from utils.webhook import run_webhook
+
+    context = multiprocessing.get_context("spawn")
+    inboxes = [context.Queue() for _ in range(workers)]
+    outbox = context.Queue()
+    processes = [
+        context.Process(target=run_worker, args=(index, workers, inboxes[index], outbox), name=f"bot-worker-{index}")
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # Диспетчер приёма: без хендлеров, только пересылка в процесс чата
+    receiver = Dispatcher()
+
+    @receiver.update.outer_middleware()
+    async def forward(handler, event, data):
+        chat = data.get("event_chat")
+        user = data.get("event_from_user")
+        chat_key = chat.id if chat else (user.id if user else 0)
+        inboxes[partition(chat_key, workers)].put(
+            ("update", chat_key, event.model_dump(mode="json", exclude_none=True))
+        )
+
+    relay = asyncio.create_task(_relay(outbox, inboxes))
+    try:
+        if BOT_MODE == "webhook":
+            await run_webhook(receiver, bot)
+        else:
+            await bot.delete_webhook()
+            # Последовательно: пересылка дешёвая, а порядок обновлений не меняется
+            await receiver.start_polling(bot, handle_as_tasks=False)
+    finally:
+        for inbox in inboxes:
+            inbox.put(("stop",))
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        outbox.put(None)
+        await relay
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+
+from sqlalchemy import select, and_
+
+from database.db import Event, EventParticipant
+from utils import cluster
+
+
+# Неизменяемая часть активного мероприятия — то, что показывается в карусели
+@dataclass(frozen=True)
+class ActiveEvent:
+    id: int
+    title: str
+    description: str | None
+    requirements: str | None
+    capacity: int | None
+
+
+# Мероприятие глазами студента: счётчик записанных и его статус (None — не записан)
+@dataclass(frozen=True)
+class EventView:
+    event: ActiveEvent
+    participants_count: int
+    status: str | None
+
+
+def _user_status(user_id: int):
+    # LEFT JOIN записи этого студента: не больше одной строки на мероприятие
+    return and_(EventParticipant.event_id == Event.id, EventParticipant.user_id == user_id)
+
+
+# Список активных мероприятий. Меняется только при создании, удалении и смене
+# лимита мест — деканат после них вызывает invalidate(), и версия растёт.
+# Счётчики и статус студента в кэше не хранятся: их отдаёт один запрос по
+# списку id, поэтому просмотр мероприятий — всегда один SQL-запрос.
+class ActiveEventsCache:
+    def __init__(self):
+        self._events = None   # tuple[ActiveEvent]; None — не загружено
+        self.version = 0      # увеличивается при инвалидации
+
+    async def for_user(self, session, user_id: int) -> list[EventView]:
+        events = self._events
+        if events is None:
+            return await self._load(session, user_id, self.version)
+        if not events:
+            return []
+
+        rows = await session.execute(
+            select(Event.id, Event.participants_count, EventParticipant.status)
+            .outerjoin(EventParticipant, _user_status(user_id))
+            .where(Event.id.in_([event.id for event in events]), Event.is_active == 1)
+        )
+        counters = {event_id: (count, status) for event_id, count, status in rows}
+        # Мероприятие, снятое в другом процессе до сброса кэша, просто не показываем
+        return [EventView(event, *counters[event.id]) for event in events if event.id in counters]
+
+    async def _load(self, session, user_id: int, version: int) -> list[EventView]:
+        # Промах: те же поля плюс статус студента — тоже одним запросом
+        rows = await session.execute(
+            select(
+                Event.id, Event.title, Event.description, Event.requirements, Event.capacity,
+                Event.participants_count, EventParticipant.status,
+            )
+            .outerjoin(EventParticipant, _user_status(user_id))
+            .where(Event.is_active == 1)
+            .order_by(Event.id)
+        )
+        views = [EventView(ActiveEvent(*row[:5]), row[5], row[6]) for row in rows]
+        self._store(tuple(view.event for view in views), version)
+        return views
+
+    def _store(self, events: tuple, version: int):
+        # Если во время загрузки мероприятия поменялись — результат уже устарел
+        if version == self.version:
+            self._events = events
+
+    def invalidate(self):
+        self._drop()
+        cluster.publish("events")  # и в остальных процессах бота
+
+    def _drop(self):
+        self.version += 1
+        self._events = None
+
+
+events_cache = ActiveEventsCache()
+cluster.subscribe("events", events_cache._drop)
@@ -0,0 +1,276 @@
+"""Выгрузка заявок, пользователей и участников мероприятия в Excel или CSV.
+
+Строки читаются курсором порциями по EXPORT_BATCH (yield_per) и сразу пишутся
+в файл: openpyxl в режиме write-only не держит ячейки в памяти, поэтому
+память не растёт с числом строк. Запрос и запись выполняются в пуле процессов
+(синхронная сессия): openpyxl пишет XML на чистом Python, и в процессе бота
+выгрузка 100 тыс. строк десятки секунд занимала бы GIL.
+
+Фильтры — в тексте команды:
+    /export applications from=01.09.2024 to=31.12.2024 status=new group=21-ИВТ-01
+    /export users group=21-ИВТ-01,21-ИВТ-02 csv
+    /export event 5
+"""
+import asyncio
+import csv
+import html
+import io
+import multiprocessing
+import re
+import shlex
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+import openpyxl
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select
+
+from config import EXPORT_BATCH, EXPORT_WORKERS
+from database.db import get_db_session, Application, User, Group, Event, EventParticipant
+
+# Короткие названия статусов заявки для фильтра status=
+STATUS_ALIASES = {
+    "new": "Новая",
+    "accept": "Принята",
+    "process": "В процессе",
+    "reject": "Отклонена",
+    "done": "Выполнена",
+}
+
+PARTICIPANT_STATUS_NAMES = {"registered": "Участник", "waitlist": "Лист ожидания"}
+
+# Больше Bot API не принимает от бота
+MAX_DOCUMENT_SIZE = 50 * 1024 * 1024
+
+EXPORT_HELP = (
+    "📤 <b>Выгрузка в Excel/CSV</b>\n\n"
+    "<code>/export applications</code> — заявки\n"
+    "<code>/export event 5</code> — участники мероприятия №5\n"
+    "<code>/export users</code> — пользователи (только администратор)\n\n"
+    "Фильтры (необязательные):\n"
+    "<code>from=01.09.2024 to=31.12.2024</code> — период (дата заявки, регистрации или записи)\n"
+    "<code>status=new</code> — статус заявки: new, accept, process, reject, done "
+    "или название, например <code>status=\"В процессе\"</code>\n"
+    "<code>group=21-ИВТ-01,21-ИВТ-02</code> — группы\n"
+    "<code>csv</code> — CSV вместо Excel"
+)
+
+_TAGS = re.compile(r"<[^>]+>")
+
+
+@dataclass
+class ExportRequest:
+    kind: str                      # applications / users / event
+    event_id: int | None = None
+    date_from: date | None = None
+    date_to: date | None = None    # включительно
+    status: str | None = None
+    groups: list = field(default_factory=list)
+    fmt: str = "xlsx"              # xlsx / csv
+
+
+def _parse_date(value: str) -> date:
+    for pattern in ("%d.%m.%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, pattern).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Не понимаю дату «{value}», нужна ДД.ММ.ГГГГ.")
+
+
+def parse_export_request(args: str) -> ExportRequest:
+    """Разбирает аргументы /export; при ошибке — ValueError с текстом для пользователя."""
+    try:
+        tokens = shlex.split(args)
+    except ValueError:
+        raise ValueError("Незакрытая кавычка.")
+    if not tokens:
+        raise ValueError("Укажите, что выгрузить.")
+
+    kind = tokens.pop(0).lower()
+    if kind not in ("applications", "users", "event"):
+        raise ValueError(f"Неизвестная выгрузка «{kind}».")
+    request = ExportRequest(kind=kind)
+    if kind == "event":
+        if not tokens or not tokens[0].isdigit():
+            raise ValueError("Укажите номер мероприятия: /export event 5")
+        request.event_id = int(tokens.pop(0))
+
+    for token in tokens:
+        key, _, value = token.partition("=")
+        key = key.lower()
+        if token.lower() in ("csv", "xlsx"):
+            request.fmt = token.lower()
+        elif key == "from" and value:
+            request.date_from = _parse_date(value)
+        elif key == "to" and value:
+            request.date_to = _parse_date(value)
+        elif key == "status" and value:
+            if kind != "applications":
+                raise ValueError("Фильтр status есть только у заявок.")
+            request.status = STATUS_ALIASES.get(value.lower(), value)
+        elif key == "group" and value:
+            request.groups = [name.strip().upper() for name in value.split(",") if name.strip()]
+        else:
+            raise ValueError(f"Не понимаю «{token}».")
+
+    if request.date_from and request.date_to and request.date_from > request.date_to:
+        raise ValueError("Начало периода позже конца.")
+    return request
+
+
+def _filter(stmt, request: ExportRequest, date_column, group_column):
+    if request.date_from:
+        stmt = stmt.where(date_column >= datetime.combine(request.date_from, datetime.min.time()))
+    if request.date_to:
+        stmt = stmt.where(date_column < datetime.combine(request.date_to + timedelta(days=1), datetime.min.time()))
+    if request.groups:
+        # Названия групп хранятся в верхнем регистре; upper() в SQLite кириллицу не переводит
+        stmt = stmt.where(group_column.in_(select(Group.id).where(Group.name.in_(request.groups))))
+    return stmt
+
+
+def _plain(content: str) -> str:
+    # Текст заявки хранится с HTML-разметкой для Telegram
+    return html.unescape(_TAGS.sub("", content or ""))
+
+
+# Описание выгрузки: заголовок листа, колонки, запрос и преобразование строки
+@dataclass
+class Export:
+    title: str
+    columns: list    # [(название, ширина)]
+    stmt: object
+    row: object = tuple
+
+
+def build_export(session, request: ExportRequest) -> Export | None:
+    if request.kind == "applications":
+        stmt = (
+            select(Application.id, Application.created_at, Application.status, User.full_name, Group.name,
+                   User.telegram_id, Application.content)
+            .select_from(Application)
+            .outerjoin(User, User.id == Application.user_id)
+            .outerjoin(Group, Group.id == User.group_id)
+            .order_by(Application.id)
+        )
+        stmt = _filter(stmt, request, Application.created_at, User.group_id)
+        if request.status:
+            stmt = stmt.where(Application.status == request.status)
+        return Export(
+            title="Заявки",
+            columns=[("№", 8), ("Дата", 18), ("Статус", 14), ("ФИО", 34), ("Группа", 16), ("Telegram ID", 14), ("Заявка", 80)],
+            stmt=stmt,
+            row=lambda r: (r[0], r[1], r[2], r[3], r[4], r[5], _plain(r[6])),
+        )
+
+    if request.kind == "users":
+        stmt = (
+            select(User.id, User.full_name, Group.name, User.role, User.telegram_id, User.registered_at)
+            .outerjoin(Group, Group.id == User.group_id)
+            .order_by(User.id)
+        )
+        return Export(
+            title="Пользователи",
+            columns=[("№", 8), ("ФИО", 34), ("Группа", 16), ("Роль", 10), ("Telegram ID", 14), ("Регистрация", 18)],
+            stmt=_filter(stmt, request, User.registered_at, User.group_id),
+        )
+
+    title = session.scalar(select(Event.title).filter_by(id=request.event_id))
+    if title is None:
+        return None
+    stmt = (
+        select(User.full_name, Group.name, User.telegram_id, EventParticipant.registered_at, EventParticipant.status)
+        .select_from(EventParticipant)
+        .join(User, User.id == EventParticipant.user_id)
+        .outerjoin(Group, Group.id == User.group_id)
+        .where(EventParticipant.event_id == request.event_id)
+        # Сначала записанные, затем лист ожидания в порядке очереди
+        .order_by(EventParticipant.status, EventParticipant.id)
+    )
+    return Export(
+        title=title,
+        columns=[("ФИО", 34), ("Группа", 16), ("Telegram ID", 14), ("Записан", 18), ("Статус", 16)],
+        stmt=_filter(stmt, request, EventParticipant.registered_at, User.group_id),
+        row=lambda r: (r[0], r[1], r[2], r[3], PARTICIPANT_STATUS_NAMES.get(r[4], r[4])),
+    )
+
+
+def _cell(value):
+    if isinstance(value, str):
+        value = ILLEGAL_CHARACTERS_RE.sub("", value)
+        # Строка с = + - @ в начале открылась бы в Excel как формула
+        if value[:1] in ("=", "+", "-", "@"):
+            value = "'" + value
+    return value
+
+
+def _write_xlsx(export: Export, rows) -> tuple[bytes, int]:
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(re.sub(r"[\[\]:*?/\\]", " ", export.title)[:31] or "Лист")
+    for index, (_, width) in enumerate(export.columns, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+    ws.append([name for name, _ in export.columns])
+    count = 0
+    for row in rows:
+        ws.append([_cell(value) for value in export.row(row)])
+        count += 1
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue(), count
+
+
+def _write_csv(export: Export, rows) -> tuple[bytes, int]:
+    # BOM и «;» — чтобы Excel с русской локалью открыл файл без мастера импорта
+    buffer = io.BytesIO()
+    stream = io.TextIOWrapper(buffer, encoding="utf-8-sig", newline="")
+    writer = csv.writer(stream, delimiter=";")
+    writer.writerow([name for name, _ in export.columns])
+    count = 0
+    for row in rows:
+        writer.writerow([
+            value.strftime("%Y-%m-%d %H:%M") if isinstance(value, datetime) else _cell(value)
+            for value in export.row(row)
+        ])
+        count += 1
+    stream.flush()
+    data = buffer.getvalue()
+    stream.detach()
+    return data, count
+
+
+def run_export(request: ExportRequest) -> tuple[str, bytes, int] | None:
+    """Строит файл выгрузки: (имя файла, содержимое, число строк); None — мероприятие не найдено."""
+    with get_db_session() as session:
+        export = build_export(session, request)
+        if export is None:
+            return None
+        rows = session.execute(export.stmt.execution_options(yield_per=EXPORT_BATCH))
+        writer = _write_csv if request.fmt == "csv" else _write_xlsx
+        data, count = writer(export, rows)
+
+    name = request.kind if request.kind != "event" else f"event_{request.event_id}"
+    return f"{name}_{datetime.now():%Y%m%d_%H%M}.{request.fmt}", data, count
+
+
+_pool = None
+
+
+def _ensure_pool():
+    global _pool
+    if _pool is None:
+        # spawn — дочерние процессы не наследуют цикл событий и соединения с БД
+        _pool = ProcessPoolExecutor(max_workers=EXPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def export_file(request: ExportRequest):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_ensure_pool(), run_export, request)
+
+
+def shutdown():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,208 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+
+from aiogram.exceptions import TelegramAPIError
+from sqlalchemy import update
+
+from config import IMPORT_WORKERS, IMPORT_PROGRESS_EVERY
+from database.db import async_session, ImportJob
+from utils.schedule_cache import schedule_cache
+
+logger = logging.getLogger(__name__)
+
+# Как часто (сек) обновлять сообщение о ходе импорта
+PROGRESS_INTERVAL = 3
+
+# Тип импорта → "модуль:функция". Функция вызывается в дочернем процессе
+# как importer(file_path, progress, progress_every) и возвращает dataclass с итогами
+IMPORTERS = {
+    "schedule": "database.schedule_import:import_schedule",
+    "students": "database.students_import:import_students",
+}
+
+JOB_KIND_NAMES = {
+    "schedule": "📅 Расписание",
+    "students": "📤 Список студентов",
+}
+
+JOB_STATUS_NAMES = {
+    "queued": "🕓 В очереди",
+    "running": "⏳ Выполняется",
+    "done": "✅ Завершена",
+    "failed": "❌ Ошибка",
+}
+
+
+def summarize_schedule(result: dict) -> str:
+    return (
+        f"Занятия: +{result['inserted']} новых, ~{result['updated']} изменено, "
+        f"−{result['removed']} удалено, {result['unchanged']} без изменений.\n"
+        f"Затронуто групп: {len(result['changed_groups'])}, новых групп: {result['groups_created']}.\n"
+        f"Семестры: создано {result['semesters_created']}, обновлено {result['semesters_updated']}. "
+        f"Пропущено строк: {result['skipped']}."
+    )
+
+
+def summarize_students(result: dict) -> str:
+    return (
+        f"Добавлено студентов: {result['added']}, уже были в списке: {result['existing']}.\n"
+        f"Повторов в файле: {result['duplicates']}, пропущено пустых строк: {result['skipped']}."
+    )
+
+
+# Итоговое сообщение для админа по типу импорта
+SUMMARIES = {
+    "schedule": summarize_schedule,
+    "students": summarize_students,
+}
+
+# Что сделать в боте после успешного импорта
+ON_DONE = {
+    # Сбрасываем кэш только у групп, расписание которых изменилось
+    "schedule": lambda result: schedule_cache.invalidate(result["changed_groups"]),
+}
+
+
+def run_import_job(job_id: int, kind: str, file_path: str, progress) -> dict:
+    # Выполняется в дочернем процессе: разбор файла и запись в БД
+    module_name, func_name = IMPORTERS[kind].split(":")
+    importer = getattr(importlib.import_module(module_name), func_name)
+
+    def on_progress(rows):
+        progress[job_id] = rows
+
+    on_progress(0)  # задача получила процесс — бот отметит её выполняющейся
+    result = importer(file_path, on_progress, IMPORT_PROGRESS_EVERY)
+    return asdict(result)
+
+
+# Запускает импорт Excel в пуле процессов и ведёт таблицу import_jobs.
+# Бот не ждёт импорт: хендлер сразу отвечает, а итог приходит отдельным сообщением.
+class ImportJobManager:
+    def __init__(self):
+        self._pool = None
+        self._manager = None
+        self.progress = {}  # job_id → прочитано строк (общий словарь с дочерними процессами)
+        self._tasks = set()
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            # spawn — дочерние процессы не наследуют цикл событий и соединения с БД
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self.progress = self._manager.dict()
+            self._pool = ProcessPoolExecutor(max_workers=IMPORT_WORKERS, mp_context=context)
+
+    def rows_processed(self, job: ImportJob) -> int:
+        if job.status == "running":
+            return self.progress.get(job.id, 0)
+        return job.rows_processed or 0
+
+    async def recover(self):
+        # Задачи, которые выполнялись при остановке бота, уже не завершатся
+        async with async_session() as session:
+            await session.execute(
+                update(ImportJob)
+                .where(ImportJob.status.in_(["queued", "running"]))
+                .values(status="failed", errors="Прервано перезапуском бота", finished_at=datetime.utcnow())
+            )
+            await session.commit()
+
+    async def submit(self, bot, kind: str, file_path: str, file_name: str, user_id: int, chat_id: int) -> ImportJob:
+        async with async_session() as session:
+            job = ImportJob(
+                kind=kind,
+                file_name=file_name,
+                status="queued",
+                rows_processed=0,
+                created_by=user_id,
+                chat_id=chat_id,
+            )
+            session.add(job)
+            await session.commit()
+
+        task = asyncio.create_task(self._run(bot, job.id, kind, file_path, chat_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _update(self, job_id: int, **values):
+        async with async_session() as session:
+            await session.execute(update(ImportJob).filter_by(id=job_id).values(**values))
+            await session.commit()
+
+    async def _notify(self, call):
+        # Сообщения о ходе импорта — по возможности: если админ удалил сообщение
+        # или Telegram вернул ошибку, импорт всё равно доводится до конца
+        try:
+            return await call
+        except TelegramAPIError as e:
+            logger.warning("Import job message failed: %s", e)
+            return None
+
+    async def _run(self, bot, job_id: int, kind: str, file_path: str, chat_id: int):
+        try:
+            self._ensure_pool()
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._pool, run_import_job, job_id, kind, file_path, self.progress)
+            progress_msg = await self._notify(bot.send_message(chat_id, f"⏳ Импорт #{job_id}: в очереди..."))
+
+            # Пока процесс работает — показываем, сколько строк обработано.
+            # Пока свободного процесса нет, задача остаётся в очереди.
+            started, shown = False, None
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=PROGRESS_INTERVAL)
+                if done:
+                    break
+                rows = self.progress.get(job_id)
+                if rows is None:
+                    continue
+                if not started:
+                    started = True
+                    await self._update(job_id, status="running")
+                if rows != shown and progress_msg is not None:
+                    shown = rows
+                    await self._notify(progress_msg.edit_text(f"⏳ Импорт #{job_id}: обработано {rows} строк..."))
+
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.exception("Import job %s failed", job_id)
+                await self._update(job_id, status="failed", errors=str(e)[:1000], finished_at=datetime.utcnow())
+                await self._notify(
+                    bot.send_message(chat_id, f"❌ Импорт #{job_id} завершился с ошибкой. Проверьте формат файла.")
+                )
+                return
+
+            summary = SUMMARIES[kind](result)
+            await self._update(
+                job_id, status="done", rows_processed=result["rows"], result=summary, finished_at=datetime.utcnow()
+            )
+            if kind in ON_DONE:
+                ON_DONE[kind](result)
+
+            if progress_msg is not None:
+                await self._notify(progress_msg.edit_text(f"✅ Импорт #{job_id}: обработано {result['rows']} строк."))
+            await self._notify(bot.send_message(chat_id, f"✅ Импорт #{job_id} завершён.\n{summary}"))
+        except Exception as e:
+            # Сбой самого бота (БД, пул процессов) — задача не должна висеть «в очереди»
+            logger.exception("Import job %s crashed", job_id)
+            await self._update(job_id, status="failed", errors=str(e)[:1000], finished_at=datetime.utcnow())
+        finally:
+            self.progress.pop(job_id, None)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+
+
+import_jobs = ImportJobManager()
@@ -0,0 +1,214 @@
+"""Метрики бота в текстовом формате Prometheus.
+
+Что собирается:
+- время обработки обновления по хендлерам (ключ — префикс callback_data,
+  команда или состояние FSM; см. middlewares/metrics.py);
+- число запросов к БД и время в БД на одно обновление — по ним видно N+1;
+- вызовы Bot API и ошибки по методам;
+- очередь отправки (utils/sender.py).
+
+Сервер метрик слушает METRICS_HOST:METRICS_PORT (в многопроцессном режиме
+процесс-обработчик N — METRICS_PORT + 1 + N), путь /metrics.
+"""
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from aiohttp import web
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramAPIError
+from sqlalchemy import event
+
+from config import METRICS_HOST
+from utils.sender import flood_control, PRIORITY_INTERACTIVE, PRIORITY_BULK
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name, self.doc, self.label_names = name, doc, labels
+        self.values = {}  # значения меток → число
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.doc, self.label_names = name, doc, labels
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.values = {}  # значения меток → [счётчики по корзинам, сумма, количество]
+
+    def observe(self, value: float, *labels):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    # Значение считывается в момент запроса метрик
+    def __init__(self, name: str, doc: str, read):
+        self.name, self.doc, self.read = name, doc, read
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} gauge", f"{self.name} {_number(self.read())}"]
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+handler_latency = register(Histogram(
+    "bot_handler_latency_seconds", "Время обработки обновления", ("handler",)
+))
+handler_errors = register(Counter(
+    "bot_handler_errors_total", "Обновления, завершившиеся исключением", ("handler",)
+))
+update_db_queries = register(Histogram(
+    "bot_update_db_queries", "Запросов к БД за одно обновление", ("handler",), QUERY_COUNT_BUCKETS
+))
+update_db_time = register(Histogram(
+    "bot_update_db_seconds", "Время в БД за одно обновление", ("handler",)
+))
+db_queries = register(Counter("bot_db_queries_total", "Все запросы к БД"))
+db_time = register(Counter("bot_db_seconds_total", "Суммарное время запросов к БД"))
+api_calls = register(Counter("bot_api_calls_total", "Вызовы Bot API", ("method",)))
+api_errors = register(Counter("bot_api_errors_total", "Ошибки Bot API", ("method", "error")))
+api_latency = register(Histogram("bot_api_latency_seconds", "Время запроса к Bot API", ("method",)))
+register(Gauge(
+    "bot_send_queue_interactive", "Ответы пользователям, ждущие лимита Telegram",
+    lambda: flood_control.global_limiter.depth(PRIORITY_INTERACTIVE),
+))
+register(Gauge(
+    "bot_send_queue_bulk", "Сообщения рассылок, ждущие лимита Telegram",
+    lambda: flood_control.global_limiter.depth(PRIORITY_BULK),
+))
+register(Gauge("bot_api_flood_retries", "Повторы после 429 от Telegram", lambda: flood_control.stats.retries))
+
+
+# Запросы к БД текущего обновления; задаётся middleware на время обработки
+@dataclass
+class UpdateStats:
+    queries: int = 0
+    db_time: float = 0.0
+    statements: list | None = None  # (время, SQL, параметры) — только при профилировании
+
+
+current_update: ContextVar[UpdateStats | None] = ContextVar("current_update", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    db_queries.inc()
+    db_time.inc(amount=elapsed)
+    stats = current_update.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if stats.statements is not None:
+            stats.statements.append((elapsed, statement, parameters))
+
+
+def _handle_error(context):
+    # Запрос завершился ошибкой — after_cursor_execute не будет
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+
+def instrument_engine(engine):
+    """Подключает подсчёт запросов к синхронному движку (для async — engine.sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# Middleware сессии бота: каждый запрос к Bot API (включая повторы после 429)
+class ApiMetrics(BaseRequestMiddleware):
+    async def __call__(self, make_request, bot, method):
+        name = type(method).__name__
+        api_calls.inc(name)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except TelegramAPIError as e:
+            api_errors.inc(name, type(e).__name__)
+            raise
+        finally:
+            api_latency.observe(time.perf_counter() - started, name)
+
+
+async def start_metrics_server(port: int) -> web.AppRunner | None:
+    if not port:
+        return None
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(body=render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, port).start()
+    logger.info("Metrics on http://%s:%s/metrics", METRICS_HOST, port)
+    return runner
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
+from sqlalchemy import func, or_, select, update
+
+from config import MORNING_PUSH_TIME, MORNING_PUSH_WINDOW
+from database.db import async_session, User, Group, get_current_week_number, get_today_day_name
+from utils.schedule_cache import schedule_cache
+from utils.sender import bulk_sending
+
+logger = logging.getLogger(__name__)
+
+# Сколько подписчиков выбирать из БД за раз
+FETCH_BATCH = 50
+
+
+def _pending(today: date):
+    # Подписчики с группой, которым сегодня ещё не отправляли
+    return (
+        select(User.id, User.telegram_id, Group.name.label("group_name"))
+        .join(Group, User.group_id == Group.id)
+        .where(User.morning_push == 1, or_(User.morning_push_sent.is_(None), User.morning_push_sent < today))
+    )
+
+
+async def send_morning_schedule(bot, deadline: datetime) -> int:
+    """Рассылает расписание на сегодня подписчикам, растягивая отправку до deadline.
+
+    Расписание каждой группы рендерится один раз (через schedule_cache).
+    Каждый подписчик отмечается отправленным непосредственно перед своим сообщением,
+    поэтому после перезапуска рассылка продолжается с оставшихся и никому не приходит
+    дважды. Доставка — не более одного раза: если бот остановится между отметкой
+    и отправкой, этот один подписчик в этот день расписание не получит.
+    """
+    today = date.today()
+    week, day = get_current_week_number(), get_today_day_name()
+
+    async with async_session() as session:
+        remaining = await session.scalar(select(func.count()).select_from(_pending(today).subquery()))
+    if not remaining:
+        return 0
+
+    texts = {}  # группа → текст рассылки (None — занятий нет)
+    sent = 0
+    with bulk_sending():
+        while True:
+            async with async_session() as session:
+                rows = (await session.execute(_pending(today).order_by(User.id).limit(FETCH_BATCH))).all()
+            if not rows:
+                break
+
+            for row in rows:
+                async with async_session() as session:
+                    claimed = (await session.execute(
+                        update(User)
+                        .where(
+                            User.id == row.id, User.morning_push == 1,
+                            or_(User.morning_push_sent.is_(None), User.morning_push_sent < today),
+                        )
+                        .values(morning_push_sent=today)
+                    )).rowcount
+                    await session.commit()
+                if not claimed:
+                    continue  # отписался или уже отправлено
+
+                if row.group_name not in texts:
+                    formatted = await schedule_cache.get_day(row.group_name, week, day)
+                    texts[row.group_name] = f"☀ <b>Расписание на сегодня:</b>\n{formatted}" if formatted else None
+
+                if texts[row.group_name]:
+                    try:
+                        await bot.send_message(row.telegram_id, texts[row.group_name])
+                        sent += 1
+                    except TelegramForbiddenError:
+                        # Бот заблокирован — подписку снимаем
+                        async with async_session() as session:
+                            await session.execute(update(User).filter_by(id=row.id).values(morning_push=0))
+                            await session.commit()
+                    except TelegramAPIError as e:
+                        logger.warning("Morning push to %s failed: %s", row.telegram_id, e)
+
+                # Оставшееся окно делим поровну между оставшимися подписчиками
+                remaining -= 1
+                left = (deadline - datetime.now()).total_seconds()
+                if remaining > 0 and left > 0:
+                    await asyncio.sleep(left / remaining)
+
+    logger.info("Morning push: %s messages sent", sent)
+    return sent
+
+
+async def morning_push_loop(bot):
+    # Каждый день в MORNING_PUSH_TIME; если бот перезапустился внутри окна — досылает оставшимся
+    push_time = time.fromisoformat(MORNING_PUSH_TIME)
+    while True:
+        now = datetime.now()
+        start = datetime.combine(now.date(), push_time)
+        deadline = start + timedelta(seconds=MORNING_PUSH_WINDOW)
+
+        if now < start:
+            await asyncio.sleep((start - now).total_seconds())
+            continue
+        if now < deadline:
+            try:
+                await send_morning_schedule(bot, deadline)
+            except Exception:
+                logger.exception("Morning push failed")
+
+        await asyncio.sleep(max(0.0, (start + timedelta(days=1) - datetime.now()).total_seconds()))
@@ -0,0 +1,155 @@
+"""Отправка уведомлений из outbox.
+
+Хендлер записывает уведомление в ту же транзакцию, что и само изменение
+(enqueue_notification_stmt), и после commit вызывает wake() — ответ
+пользователю не ждёт Telegram. Фоновая задача забирает сообщения пачками,
+отправляет их и повторяет неудачные с растущей задержкой. Сообщение
+может уйти повторно, только если бот остановился между отправкой и отметкой.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramForbiddenError
+from sqlalchemy import and_, bindparam, delete, select, update
+
+from config import (
+    OUTBOX_BATCH, OUTBOX_POLL_INTERVAL, OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_DELAY, OUTBOX_RETENTION_DAYS,
+)
+from database.db import async_session, OutboxMessage
+from utils import cluster
+
+logger = logging.getLogger(__name__)
+
+# Как часто (сек) удалять старые обработанные сообщения
+PURGE_INTERVAL = 3600
+
+_wakeup = asyncio.Event()
+
+
+def _wake_local():
+    _wakeup.set()
+
+
+def wake():
+    """Будит отправку после commit; в многопроцессном режиме — в процессе, где она запущена."""
+    _wake_local()
+    cluster.publish("outbox")
+
+
+cluster.subscribe("outbox", _wake_local)
+
+
+async def _send(bot, message) -> tuple[str, str | None]:
+    try:
+        await bot.send_message(message.chat_id, message.text)
+        return "sent", None
+    except (TelegramForbiddenError, TelegramBadRequest) as e:
+        # Бот заблокирован или чат не существует — повтор не поможет
+        return "failed", str(e)[:500]
+    except TelegramAPIError as e:
+        return "retry", str(e)[:500]
+    except Exception as e:
+        logger.exception("Outbox message %s failed", message.id)
+        return "retry", repr(e)[:500]
+
+
+def _outcome(message, status: str, error: str | None, now: datetime) -> dict:
+    values = {
+        "row_id": message.id, "row_revision": message.revision,
+        "new_status": "sent", "new_attempts": message.attempts + 1, "new_next": message.next_attempt_at,
+        "new_error": error, "new_sent_at": now,
+    }
+    if status == "retry":
+        if values["new_attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            values.update(new_status="failed", new_sent_at=None)
+        else:
+            delay = OUTBOX_RETRY_DELAY * 2 ** message.attempts
+            values.update(new_status="pending", new_next=now + timedelta(seconds=delay), new_sent_at=None)
+    elif status == "failed":
+        values.update(new_status="failed", new_sent_at=None)
+    return values
+
+
+async def deliver_batch(bot) -> int:
+    """Отправляет одну пачку сообщений, которые пора отправить; возвращает её размер."""
+    now = datetime.utcnow()
+    async with async_session() as session:
+        batch = (await session.execute(
+            select(
+                OutboxMessage.id, OutboxMessage.chat_id, OutboxMessage.text, OutboxMessage.revision,
+                OutboxMessage.attempts, OutboxMessage.next_attempt_at,
+            )
+            .where(OutboxMessage.status == "pending", OutboxMessage.next_attempt_at <= now)
+            .order_by(OutboxMessage.id)
+            .limit(OUTBOX_BATCH)
+        )).all()
+    if not batch:
+        return 0
+
+    results = await asyncio.gather(*(_send(bot, message) for message in batch))
+
+    now = datetime.utcnow()
+    outbox = OutboxMessage.__table__
+    async with async_session() as session:
+        # Если текст заменили, пока шла отправка (revision вырос), строка остаётся
+        # ждущей и уходит следующей пачкой уже с новым текстом
+        await session.execute(
+            update(outbox)
+            .where(and_(outbox.c.id == bindparam("row_id"), outbox.c.revision == bindparam("row_revision")))
+            .values(
+                status=bindparam("new_status"), attempts=bindparam("new_attempts"),
+                next_attempt_at=bindparam("new_next"), last_error=bindparam("new_error"),
+                sent_at=bindparam("new_sent_at"),
+            ),
+            [_outcome(message, status, error, now) for message, (status, error) in zip(batch, results)],
+        )
+        await session.commit()
+    return len(batch)
+
+
+async def _next_due() -> float:
+    # Через сколько секунд наступит ближайшая повторная попытка
+    async with async_session() as session:
+        due = await session.scalar(
+            select(OutboxMessage.next_attempt_at)
+            .where(OutboxMessage.status == "pending")
+            .order_by(OutboxMessage.next_attempt_at)
+            .limit(1)
+        )
+    if due is None:
+        return OUTBOX_POLL_INTERVAL
+    return min(OUTBOX_POLL_INTERVAL, max(0.0, (due - datetime.utcnow()).total_seconds()))
+
+
+async def _purge():
+    border = datetime.utcnow() - timedelta(days=OUTBOX_RETENTION_DAYS)
+    async with async_session() as session:
+        await session.execute(
+            delete(OutboxMessage).where(OutboxMessage.status != "pending", OutboxMessage.created_at < border)
+        )
+        await session.commit()
+
+
+async def outbox_loop(bot):
+    purged_at = 0.0
+    while True:
+        # Сбрасываем до выборки: wake() во время отправки не потеряется
+        _wakeup.clear()
+        try:
+            # Пачка заполнена — сразу берём следующую
+            while await deliver_batch(bot) == OUTBOX_BATCH:
+                pass
+            if time.monotonic() - purged_at > PURGE_INTERVAL:
+                await _purge()
+                purged_at = time.monotonic()
+            timeout = await _next_due()
+        except Exception:
+            logger.exception("Outbox delivery failed")
+            timeout = OUTBOX_POLL_INTERVAL
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
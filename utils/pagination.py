@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from config import PAGE_SIZE
+
+
+# Страница списка. Курсор — значение ключа (индексированной колонки)
+# на границе страницы, поэтому страница выбирается по индексу без OFFSET:
+#   dir="next" — элементы после key, dir="prev" — перед key, dir="at" — начиная с key
+class PageCallback(CallbackData, prefix="pg"):
+    view: str
+    key: int = 0
+    dir: str = "next"
+    size: int = PAGE_SIZE
+    arg: int = 0  # параметр списка, например id мероприятия для участников
+
+
+# Карточка элемента списка; back — первый ключ страницы, на которую вернуться
+class ItemCallback(CallbackData, prefix="it"):
+    view: str
+    id: int
+    back: int = 0
+    size: int = PAGE_SIZE
+    arg: int = 0
+
+    def back_to_page(self) -> PageCallback:
+        return PageCallback(view=self.view, key=self.back, dir="at" if self.back else "next", size=self.size, arg=self.arg)
+
+
+# Описание списка: запрос, ключ и отрисовка строк
+@dataclass
+class ListView:
+    name: str
+    key: Any                             # колонка-курсор, например Application.id
+    query: Callable[[int], Any]          # arg → select(...) без сортировки и лимита
+    render_item: Callable[[Any], str]
+    options: tuple = ()                  # опции загрузки связей, например selectinload(...)
+    header: Callable[[Any, int], Awaitable[str]] | str = ""  # строка или async (session, arg) → str
+    empty_text: str = "❌ Список пуст."
+    descending: bool = False             # True — сначала новые
+    item_button: Optional[Callable[[Any], str]] = None  # текст кнопки карточки элемента
+
+
+@dataclass
+class Page:
+    items: list
+    has_prev: bool
+    has_next: bool
+
+
+def _after(view: ListView, key: int):
+    return view.key < key if view.descending else view.key > key
+
+
+def _before(view: ListView, key: int):
+    return view.key > key if view.descending else view.key < key
+
+
+def page_size(size: int) -> int:
+    # Размер приходит из callback_data клиента: не больше PAGE_SIZE и не меньше 1
+    return min(max(size, 1), PAGE_SIZE)
+
+
+async def fetch_page(session, view: ListView, data: PageCallback) -> Page:
+    forward = data.dir != "prev"
+    size = page_size(data.size)
+    stmt = view.query(data.arg)
+
+    if data.key:
+        if data.dir == "next":
+            stmt = stmt.where(_after(view, data.key))
+        elif data.dir == "prev":
+            stmt = stmt.where(_before(view, data.key))
+        else:
+            stmt = stmt.where(~_before(view, data.key))
+
+    ascending = forward != view.descending
+    stmt = stmt.options(*view.options).order_by(view.key.asc() if ascending else view.key.desc()).limit(size + 1)
+    items = list((await session.scalars(stmt)).all())
+
+    more = len(items) > size
+    items = items[:size]
+    if not forward:
+        items.reverse()
+
+    if forward:
+        has_next = more
+        if not data.key or not items:
+            has_prev = False
+        elif data.dir == "next":
+            has_prev = True
+        else:
+            # Открыли страницу «с элемента» — проверяем, есть ли что-то перед ним
+            first_key = _key_value(view, items[0])
+            has_prev = await session.scalar(
+                view.query(data.arg).with_only_columns(view.key).where(_before(view, first_key)).limit(1)
+            ) is not None
+    else:
+        has_prev = more
+        has_next = True
+
+    return Page(items=items, has_prev=has_prev, has_next=has_next)
+
+
+def _key_value(view: ListView, item) -> int:
+    return getattr(item, view.key.key)
+
+
+async def render_page(session, view: ListView, data: PageCallback):
+    """Возвращает (текст, клавиатура) одной страницы списка."""
+    data = data.model_copy(update={"size": page_size(data.size)})
+    page = await fetch_page(session, view, data)
+
+    # Страница назад оказалась пустой (элементы удалили) — показываем начало
+    if not page.items and data.key:
+        page = await fetch_page(session, view, PageCallback(view=view.name, size=data.size, arg=data.arg))
+
+    header = view.header if isinstance(view.header, str) else await view.header(session, data.arg)
+    if not page.items:
+        return f"{header}\n\n{view.empty_text}" if header else view.empty_text, None
+
+    body = "\n\n".join(view.render_item(item) for item in page.items)
+    text = f"{header}\n\n{body}" if header else body
+
+    rows = []
+    first_key = _key_value(view, page.items[0])
+    last_key = _key_value(view, page.items[-1])
+
+    if view.item_button:
+        for item in page.items:
+            rows.append([InlineKeyboardButton(
+                text=view.item_button(item),
+                callback_data=ItemCallback(
+                    view=view.name, id=_key_value(view, item), back=first_key, size=data.size, arg=data.arg
+                ).pack(),
+            )])
+
+    nav = []
+    if page.has_prev:
+        nav.append(InlineKeyboardButton(
+            text="◀",
+            callback_data=PageCallback(view=view.name, key=first_key, dir="prev", size=data.size, arg=data.arg).pack(),
+        ))
+    if page.has_next:
+        nav.append(InlineKeyboardButton(
+            text="▶",
+            callback_data=PageCallback(view=view.name, key=last_key, dir="next", size=data.size, arg=data.arg).pack(),
+        ))
+    if nav:
+        rows.append(nav)
+
+    return text, InlineKeyboardMarkup(inline_keyboard=rows) if rows else None
+
+
+def back_button(item: ItemCallback) -> InlineKeyboardButton:
+    return InlineKeyboardButton(text="⬅ К списку", callback_data=item.back_to_page().pack())
@@ -0,0 +1,167 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from database.db import async_session, Group, build_today_schedule, build_two_weeks_schedule
+from utils import cluster
+
+
+# Функция для формирования расписания в текстовом формате
+def format_schedule(schedule, two_weeks=False):
+    if not schedule:
+        return "Расписание не найдено"
+    
+    formatted_schedule = ""
+    
+    if two_weeks:
+        # Определяем порядок дней недели
+        day_order = {
+            'MONDAY': 1,
+            'TUESDAY': 2,
+            'WEDNESDAY': 3,
+            'THURSDAY': 4,
+            'FRIDAY': 5,
+            'SATURDAY': 6,
+            'SUNDAY': 7
+        }
+        
+        day_names = {
+            'MONDAY': 'Понедельник',
+            'TUESDAY': 'Вторник',
+            'WEDNESDAY': 'Среда',
+            'THURSDAY': 'Четверг',
+            'FRIDAY': 'Пятница',
+            'SATURDAY': 'Суббота',
+            'SUNDAY': 'Воскресенье'
+        }
+
+        # Форматирование для двух недель
+        for week, days in schedule.items():
+            formatted_schedule += f"\n📌 <b>{week}:</b>\n"
+            
+            # Сортируем дни по порядку
+            sorted_days = sorted(days.items(), key=lambda x: x[1][0]['day_order'])
+            
+            for day, classes in sorted_days:
+                day_name = day_names.get(day, day)
+                formatted_schedule += f"\n<b>📅 {day_name}:</b>\n"
+                for class_info in classes:
+                    formatted_schedule += (
+                        f"🕒 {class_info['time']} - {class_info['subject']}\n"
+                        f"   🏫 {class_info['auditorium']} | 👨‍🏫 {class_info['teacher']}\n"
+                    )
+    else:
+        # Форматирование для одного дня 
+        for day, classes in schedule.items():
+            formatted_schedule += f"\n<b>📅 {day}:</b>\n"
+            for class_info in classes:
+                formatted_schedule += (
+                    f"🕒 {class_info['time']} - {class_info['subject']}\n"
+                    f"   🏫 {class_info['auditorium']} | 👨‍🏫 {class_info['teacher']}\n"
+                )
+
+    return formatted_schedule
+
+# Готовое расписание одной группы
+@dataclass
+class GroupSchedule:
+    days: dict = field(default_factory=dict)  # (неделя, день) → HTML расписания на день
+    two_weeks: str | None = None              # HTML расписания на две недели
+    semesters: list = field(default_factory=list)  # [(date_start, date_end), ...]
+
+    def current_semester(self):
+        today = date.today()
+        for date_start, date_end in self.semesters:
+            if date_start <= today <= date_end:
+                return date_start, date_end
+        return None
+
+
+def render_group(group) -> GroupSchedule:
+    result = GroupSchedule()
+
+    by_day = {}
+    for item in group.schedule:
+        by_day.setdefault((item.week_number, item.day_of_week), []).append(item)
+    for (week, day), items in by_day.items():
+        result.days[(week, day)] = format_schedule(build_today_schedule(day, items))
+
+    if group.schedule:
+        result.two_weeks = format_schedule(build_two_weeks_schedule(group.schedule), two_weeks=True)
+
+    result.semesters = [(s.date_start, s.date_end) for s in group.semesters]
+    return result
+
+
+# Кэш отрендеренного расписания: группа → GroupSchedule.
+# Расписание меняется только при импорте Excel, поэтому записи живут
+# до явной инвалидации; повторные нажатия кнопок обходятся без SQL.
+class ScheduleCache:
+    def __init__(self):
+        self._groups = {}
+        self._loading = {}    # группа → задача загрузки (чтобы не грузить одно и то же параллельно)
+        self._generation = 0  # увеличивается при инвалидации
+
+    async def get(self, group_name: str) -> GroupSchedule:
+        cached = self._groups.get(group_name)
+        if cached is not None:
+            return cached
+
+        task = self._loading.get(group_name)
+        if task is None:
+            task = asyncio.ensure_future(self._load(group_name, self._generation))
+            self._loading[group_name] = task
+            task.add_done_callback(lambda _: self._loading.pop(group_name, None))
+        return await asyncio.shield(task)
+
+    async def get_day(self, group_name: str, week_number: int, day: str) -> str | None:
+        return (await self.get(group_name)).days.get((week_number, day))
+
+    async def _load(self, group_name: str, generation: int) -> GroupSchedule:
+        async with async_session() as session:
+            group = await session.scalar(
+                select(Group)
+                .options(selectinload(Group.schedule), selectinload(Group.semesters))
+                .filter_by(name=group_name)
+            )
+        rendered = render_group(group) if group else GroupSchedule()
+
+        # Если во время загрузки прошёл импорт — результат уже устарел, не сохраняем
+        if generation == self._generation:
+            self._groups[group_name] = rendered
+        return rendered
+
+    async def warm(self):
+        # Рендер всех групп за три запроса — используется при старте бота
+        generation = self._generation
+        async with async_session() as session:
+            groups = (await session.scalars(
+                select(Group).options(selectinload(Group.schedule), selectinload(Group.semesters))
+            )).all()
+        rendered = {group.name: render_group(group) for group in groups}
+
+        if generation == self._generation:
+            self._groups = rendered
+
+    def invalidate(self, group_names=None):
+        self._drop(group_names)
+        cluster.publish("schedule", group_names)  # и в остальных процессах бота
+
+    def _drop(self, group_names=None):
+        # Без аргументов сбрасывается весь кэш. Замена словаря целиком атомарна
+        # для цикла событий: читатели видят либо старое, либо новое состояние.
+        self._generation += 1
+        if group_names is None:
+            self._groups = {}
+        else:
+            groups = dict(self._groups)
+            for name in group_names:
+                groups.pop(name, None)
+            self._groups = groups
+
+
+schedule_cache = ScheduleCache()
+cluster.subscribe("schedule", schedule_cache._drop)
@@ -0,0 +1,218 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+from config import FLOOD_GLOBAL_RATE, FLOOD_CHAT_RATE, FLOOD_GROUP_RATE_PER_MIN, FLOOD_MAX_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты исходящих запросов: ответы пользователю идут раньше массовой рассылки
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+_priority: ContextVar[int] = ContextVar("send_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def bulk_sending():
+    # Все запросы внутри блока уходят с низким приоритетом:
+    #     with bulk_sending():
+    #         for item in items:
+    #             await message.answer(...)
+    token = _priority.set(PRIORITY_BULK)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# Ведро токенов: rate токенов в секунду, не больше capacity в запасе.
+# reserve() может уводить баланс в минус — так запросы встают в очередь
+# без отдельной блокировки, каждый ждёт свою долю времени.
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def time_until_token(self) -> float:
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    def reserve(self) -> float:
+        # Забирает токен и возвращает, сколько нужно подождать перед запросом
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def penalize(self, seconds: float):
+        # После retry_after от Telegram не отправляем в этот чат seconds секунд
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+    @property
+    def is_idle(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+# Глобальный лимит с очередью по приоритетам: когда токенов не хватает,
+# ожидающие запросы выпускаются по одному, сначала с меньшим номером приоритета
+class PriorityLimiter:
+    def __init__(self, rate: float, capacity: float):
+        self.bucket = TokenBucket(rate, capacity)
+        self._waiters = []  # куча (приоритет, порядковый номер, future)
+        self._seq = itertools.count()
+        self._pump_task = None
+
+    def depth(self, priority: int | None = None) -> int:
+        return sum(
+            1 for p, _, fut in self._waiters
+            if not fut.done() and (priority is None or p == priority)
+        )
+
+    async def acquire(self, priority: int):
+        if not self._waiters and self.bucket.time_until_token() == 0:
+            self.bucket.take()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self):
+        while self._waiters:
+            # Отменённые ожидания токен не расходуют
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = self.bucket.time_until_token()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            self.bucket.take()
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
+
+
+# Простые метрики отправки; экспортируются наружу через snapshot()
+class SenderStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.latency_total = 0.0  # ожидание в очереди + сам запрос, сек
+        self.latency_max = 0.0
+        self.wait_total = 0.0     # только ожидание лимитов, сек
+
+    def observe(self, latency: float, wait: float):
+        self.requests += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.wait_total += wait
+
+
+# Методы, которые отправляют новые сообщения — на них действует лимит на чат
+def _is_send_method(method) -> bool:
+    name = type(method).__name__
+    return name.startswith(("Send", "Forward", "Copy"))
+
+
+# Middleware сессии бота: через него проходит каждый запрос к Bot API,
+# поэтому лимиты действуют для всех хендлеров без изменения их кода
+class FloodControl(BaseRequestMiddleware):
+    # Держим не больше стольких вёдер чатов, простаивающие удаляем
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(self):
+        self.global_limiter = PriorityLimiter(FLOOD_GLOBAL_RATE, FLOOD_GLOBAL_RATE)
+        self.chat_buckets = {}
+        self.stats = SenderStats()
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self.chat_buckets = {k: b for k, b in self.chat_buckets.items() if not b.is_idle}
+            # В группах Telegram разрешает 20 сообщений в минуту, в личке ~1 в секунду
+            if isinstance(chat_id, int) and chat_id < 0:
+                bucket = TokenBucket(FLOOD_GROUP_RATE_PER_MIN / 60, 3)
+            else:
+                bucket = TokenBucket(FLOOD_CHAT_RATE, 3)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    def snapshot(self) -> dict:
+        return {
+            "queue_depth_interactive": self.global_limiter.depth(PRIORITY_INTERACTIVE),
+            "queue_depth_bulk": self.global_limiter.depth(PRIORITY_BULK),
+            "requests": self.stats.requests,
+            "retries": self.stats.retries,
+            "errors": self.stats.errors,
+            "latency_avg": self.stats.latency_total / self.stats.requests if self.stats.requests else 0.0,
+            "latency_max": self.stats.latency_max,
+            "wait_total": self.stats.wait_total,
+        }
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            # getUpdates, answerCallbackQuery и т.п. не ограничиваем
+            return await make_request(bot, method)
+
+        started = time.monotonic()
+        priority = _priority.get()
+        attempt = 0
+        while True:
+            if _is_send_method(method):
+                delay = self._chat_bucket(chat_id).reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+            await self.global_limiter.acquire(priority)
+            sent_at = time.monotonic()
+
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                self.stats.retries += 1
+                logger.warning("Flood control: %s, chat %s, retry in %s s", type(method).__name__, chat_id, e.retry_after)
+                if attempt > FLOOD_MAX_RETRIES:
+                    self.stats.errors += 1
+                    raise
+                self._chat_bucket(chat_id).penalize(e.retry_after)
+                await asyncio.sleep(e.retry_after)
+                continue
+            except Exception:
+                self.stats.errors += 1
+                raise
+
+            finished = time.monotonic()
+            self.stats.observe(finished - started, sent_at - started)
+            return response
+
+
+flood_control = FloodControl()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from config import STATS_REFRESH_INTERVAL, STATS_DAYS, STATS_REPORT_ROWS
+from database.db import async_session, StatCounter, User, Group, Application, Event
+
+logger = logging.getLogger(__name__)
+
+# Статусы заявок в порядке показа в отчётах
+APPLICATION_STATUSES = ["Новая", "Принята", "В процессе", "Отклонена", "Выполнена"]
+
+
+# Счётчики из stat_counters (поддерживаются триггерами БД): несколько строк,
+# поэтому чтение не зависит от размера таблиц
+async def read_counters(session) -> dict:
+    rows = await session.execute(select(StatCounter.name, StatCounter.value))
+    return dict(rows.all())
+
+
+def order_statuses(by_status: dict) -> list:
+    # [(статус, число)] в порядке APPLICATION_STATUSES, затем прочие по алфавиту
+    rest = dict(by_status)
+    ordered = [(status, rest.pop(status)) for status in APPLICATION_STATUSES if status in rest]
+    return ordered + sorted(rest.items(), key=lambda item: item[0] or "")
+
+
+def statuses_from_counters(counters: dict) -> list:
+    return order_statuses({
+        name.split(":", 1)[1]: value for name, value in counters.items()
+        if name.startswith("applications:") and value
+    })
+
+
+# Отчёты, построенные группирующими запросами (по одному на отчёт)
+@dataclass
+class StatsSnapshot:
+    built_at: datetime
+    by_group: list = field(default_factory=list)       # [(группа, всего, {статус: число})] — самые активные
+    groups_total: int = 0                               # сколько групп подавали заявки
+    registrations: list = field(default_factory=list)  # [(день, число)] за STATS_DAYS дней
+    participation: list = field(default_factory=list)  # [(название, участников, лимит)] активных мероприятий
+
+
+async def applications_by_group(session) -> tuple[list, int]:
+    rows = await session.execute(
+        select(Group.name, Application.status, func.count())
+        .select_from(Application)
+        .join(User, User.id == Application.user_id)
+        .outerjoin(Group, Group.id == User.group_id)
+        .group_by(User.group_id, Application.status)
+    )
+    groups = {}
+    for name, status, count in rows:
+        groups.setdefault(name or "—", {})[status] = count
+    ranked = sorted(
+        ((name, sum(statuses.values()), statuses) for name, statuses in groups.items()),
+        key=lambda row: (-row[1], row[0]),
+    )
+    return ranked[:STATS_REPORT_ROWS], len(ranked)
+
+
+async def registrations_per_day(session) -> list:
+    # registered_at хранится в UTC; у пользователей до миграции 12 дата не известна
+    since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=STATS_DAYS - 1)
+    day = func.date(User.registered_at)
+    rows = await session.execute(
+        select(day, func.count()).where(User.registered_at >= since).group_by(day)
+    )
+    counts = dict(rows.all())
+    days = [since.date() + timedelta(days=i) for i in range(STATS_DAYS)]
+    return [(day, counts.get(day.isoformat(), 0)) for day in days]
+
+
+async def event_participation(session) -> list:
+    # participants_count — денормализованный счётчик записанных (миграция 13)
+    rows = await session.execute(
+        select(Event.title, Event.participants_count, Event.capacity)
+        .where(Event.is_active == 1)
+        .order_by(Event.participants_count.desc(), Event.id)
+        .limit(STATS_REPORT_ROWS)
+    )
+    return rows.all()
+
+
+# Снимок отчётов живёт STATS_REFRESH_INTERVAL секунд. Устаревший снимок
+# отдаётся сразу, а новый строится в фоне — админ не ждёт запросов по всей
+# таблице заявок; ждать приходится только первого построения и «Обновить».
+class StatsCache:
+    def __init__(self):
+        self._snapshot = None
+        self._expires_at = 0.0
+        self._loading = None  # задача построения (одна на процесс)
+
+    async def get(self, force: bool = False) -> StatsSnapshot:
+        if self._snapshot is not None and not force:
+            if self._expires_at <= time.monotonic():
+                self._refresh()
+            return self._snapshot
+        return await asyncio.shield(self._refresh())
+
+    def _refresh(self):
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._build())
+            self._loading.add_done_callback(self._built)
+        return self._loading
+
+    def _built(self, task):
+        self._loading = None
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error("Stats snapshot failed", exc_info=task.exception())
+            return
+        self._snapshot = task.result()
+        self._expires_at = time.monotonic() + STATS_REFRESH_INTERVAL
+
+    async def _build(self) -> StatsSnapshot:
+        async with async_session() as session:
+            by_group, groups_total = await applications_by_group(session)
+            return StatsSnapshot(
+                built_at=datetime.now(),
+                by_group=by_group,
+                groups_total=groups_total,
+                registrations=await registrations_per_day(session),
+                participation=await event_participation(session),
+            )
+
+
+stats_cache = StatsCache()
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from aiohttp import web
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config import (
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT,
+    WEBHOOK_CONCURRENCY, WEBHOOK_MAX_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATH = "/health"
+
+
+# Обработчик webhook: Telegram получает ответ сразу, а обновление
+# обрабатывается в фоне — но не больше concurrency одновременно
+class LimitedRequestHandler(SimpleRequestHandler):
+    def __init__(self, dispatcher, bot, concurrency: int, **kwargs):
+        super().__init__(dispatcher, bot, handle_in_background=True, **kwargs)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.processed = 0
+
+    async def _background_feed_update(self, bot, update):
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                await super()._background_feed_update(bot, update)
+            finally:
+                self.in_flight -= 1
+                self.processed += 1
+
+    async def health(self, request: web.Request) -> web.Response:
+        # Для балансировщика: процесс жив и принимает обновления
+        return web.json_response({
+            "status": "ok",
+            "in_flight": self.in_flight,
+            "queued": len(self._background_feed_update_tasks) - self.in_flight,
+            "processed": self.processed,
+            "concurrency": self.concurrency,
+        })
+
+
+def build_app(dp, bot) -> tuple[web.Application, LimitedRequestHandler]:
+    app = web.Application()
+    handler = LimitedRequestHandler(dp, bot, WEBHOOK_CONCURRENCY, secret_token=WEBHOOK_SECRET or None)
+    handler.register(app, path=WEBHOOK_PATH)
+    app.router.add_get(HEALTH_PATH, handler.health)
+    # startup/shutdown диспетчера вызываются вместе с запуском и остановкой сервера
+    setup_application(app, dp, bot=bot)
+    return app, handler
+
+
+async def run_webhook(dp, bot):
+    """Запускает встроенный aiohttp-сервер и при заданном WEBHOOK_URL регистрирует webhook.
+
+    Локально: BOT_MODE=webhook без WEBHOOK_URL и POST JSON обновления на
+    http://localhost:WEBHOOK_PORT/webhook (с заголовком секрета, если он задан).
+    """
+    app, _ = build_app(dp, bot)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+    logger.info("Webhook server listening on %s:%s%s", WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+
+    if WEBHOOK_URL:
+        await bot.set_webhook(
+            WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET or None,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()